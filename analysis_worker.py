@@ -0,0 +1,92 @@
+import threading
+
+
+# ==========================================
+# AnalysisWorker - thread วิเคราะห์ตำแหน่งตัวเดียวที่ทำงานตลอดอายุเกม
+# ==========================================
+# แทนการสร้าง Thread ใหม่ทุกครั้งที่เดิน/ย้อน/แก้กระดาน:
+# - คิวแบบ latest-request-wins: เก็บแค่ตำแหน่งล่าสุด ตำแหน่งที่ผู้ใช้เลื่อนผ่านไปแล้วจะถูกทิ้ง
+# - ถ้ามีการค้นหาค้างอยู่ตอนตำแหน่งเปลี่ยน จะสั่ง stop() ทันที
+# - ผลลัพธ์ถูกส่งกลับพร้อม FEN ของตำแหน่งที่วิเคราะห์ ให้ผู้รับตรวจว่ายังตรงกับกระดานปัจจุบันหรือไม่
+# - Streaming: ส่งผลทุกครั้งที่ Engine ค้นหาได้ลึกขึ้น (infinite analysis) จนกว่าตำแหน่งจะเปลี่ยน
+# - ถ้า engine มี eval_cache จะส่งผลที่เคยวิเคราะห์ไว้ทันที แล้วส่งต่อเฉพาะผลที่ลึกกว่า
+class AnalysisWorker:
+    def __init__(self, engine, on_result, max_time=None):
+        self.engine = engine
+        self.on_result = on_result
+        self.max_time = max_time  # เพดานเวลาต่อตำแหน่ง (None = ไม่จำกัด)
+
+        self._cond = threading.Condition()
+        self._pending = None
+        self._current = None
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="analysis-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, board):
+        """ขอวิเคราะห์ board (แทนที่คำขอเก่าที่ยังไม่เริ่ม และยกเลิกตัวที่กำลังค้นหาอยู่)"""
+        request = (board.fen(), board.copy())
+        with self._cond:
+            self._pending = request
+            current = self._current
+            self._cond.notify()
+        if current: current.stop()
+
+    def cancel(self):
+        with self._cond:
+            self._pending = None
+            current = self._current
+        if current: current.stop()
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._pending = None
+            current = self._current
+            self._cond.notify()
+        if current: current.stop()
+        self._thread.join(timeout=1.0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running: return
+                fen, board = self._pending
+                self._pending = None
+
+            cached_depth = 0
+            eval_cache = getattr(self.engine, "eval_cache", None)
+            cached = eval_cache.get(board) if eval_cache is not None else None
+            if cached:
+                cached_depth = cached["depth"] or 0
+                self._emit(fen, cached)
+
+            stream = self.engine.start_analysis(board, think_time=self.max_time, infinite=True)
+            if stream is None: continue
+
+            with self._cond:
+                self._current = stream
+                superseded = self._pending is not None or not self._running
+            if superseded: stream.stop()
+
+            for info in stream:
+                if self._superseded():
+                    stream.stop()
+                    break
+                if not info.get("tablebase") and (info["depth"] or 0) <= cached_depth: continue
+                self._emit(fen, info)
+
+            with self._cond:
+                self._current = None
+
+    def _emit(self, fen, info):
+        try:
+            self.on_result(fen, info)
+        except Exception as e:
+            print(f"Warning: analysis callback failed: {e}")
+
+    def _superseded(self):
+        with self._cond:
+            return self._pending is not None or not self._running
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import threading
+from pathlib import Path
+
+import chess
+import chess.engine
+
+from engine_client import BasePlayer, _elo_config, _instant_move, _parse_info, _parse_multipv
+from eval_cache import CACHE_MIN_DEPTH
+
+
+# ==========================================
+# EngineLoop - event loop เดียวที่ใช้ร่วมกันทุก AsyncEngineClient
+# ==========================================
+# SimpleEngine สร้าง thread + event loop ของตัวเองต่อ Engine หนึ่งตัว และ Game ยังสร้าง Thread ใหม่ทุกครั้งที่ให้ AI คิด
+# ที่นี่ Engine ทุกตัวที่สร้างเป็น AsyncEngineClient ทำงานบน loop เดียวใน thread เดียว
+# หมายเหตุ: ตอนนี้มีแค่ bench_async_engine.py ที่ใช้ ตัวเกมยังใช้ PooledEngine + Thread ต่อหนึ่งตาเดินของ AI
+# ทุกคำสั่งคืน concurrent.futures.Future ที่รอผล (result()) หรือผูก callback (add_done_callback) ได้จาก thread ไหนก็ได้
+class EngineLoop:
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="engine-loop", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """ส่ง coroutine ไปทำบน loop คืน concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+# ==========================================
+# AsyncEngineClient - Engine แบบ asyncio (popen_uci coroutine)
+# ==========================================
+# Polymorphism: เป็น BasePlayer เหมือน EngineClient choose_move(board) จึงใช้แทนกันได้
+# - *_async() คืน Future ทันที ไม่ต้องสร้าง Thread ต่อคำสั่ง
+# - choose_move()/analyse_position() แบบเดิมแค่รอ Future ให้เสร็จ (สำหรับโค้ดที่ต้องการผลแบบ blocking)
+class AsyncEngineClient(BasePlayer):
+    def __init__(self, engine_path=None, elo=1200, think_time=0.2, eval_cache=None, options=None, loop=None,
+                 book=None, tablebase=None, time_manager=None):
+        super().__init__("Stockfish Engine AI (async)")
+
+        if engine_path is None:
+            base_dir = Path(__file__).resolve().parent
+            engine_path = base_dir / "engine/stockfish/stockfish.exe"
+
+        self.engine_path = str(engine_path)
+        self.think_time = float(think_time)
+        self.elo = int(elo)
+        self.eval_cache = eval_cache
+        self.options = dict(options or {})
+        self.book = book
+        self.tablebase = tablebase
+        self.time_manager = time_manager
+
+        # Encapsulation: สถานะภายในทั้งหมดถูกใช้บน event loop เท่านั้น
+        self._loop = loop or EngineLoop.shared()
+        self._protocol = None
+        self._lock = None       # asyncio.Lock: Engine หนึ่งตัวรับได้ทีละคำสั่ง
+        self._opening = None
+
+        if not os.path.exists(self.engine_path):
+            raise FileNotFoundError(f"Engine not found at: {self.engine_path}")
+        self.open()
+
+    # ---------- Lifecycle ----------
+    def open(self):
+        """เริ่มเปิด Engine บน loop (ไม่ block) คืน Future ที่เสร็จเมื่อ Engine พร้อม"""
+        self._opening = self._loop.submit(self._open())
+        return self._opening
+
+    def close(self):
+        try:
+            self._loop.submit(self._close()).result(timeout=5.0)
+        except Exception:
+            pass
+
+    def set_elo(self, elo):
+        self.elo = int(elo)
+        return self._loop.submit(self._configure_elo())
+
+    # ---------- Future API ----------
+    def choose_move_async(self, board, clock=None):
+        return self._loop.submit(self._play(board.copy(), clock))
+
+    def analyse_position_async(self, board, think_time=None, min_depth=CACHE_MIN_DEPTH, multipv=1):
+        return self._loop.submit(self._analyse(board.copy(), think_time, min_depth, multipv))
+
+    # ---------- Polymorphism: blocking API เหมือน EngineClient ----------
+    def choose_move(self, board, clock=None):
+        try:
+            return self.choose_move_async(board, clock).result()
+        except Exception:
+            return None
+
+    def analyse_position(self, board, think_time=None, min_depth=CACHE_MIN_DEPTH, multipv=1):
+        try:
+            return self.analyse_position_async(board, think_time, min_depth, multipv).result()
+        except Exception:
+            return None
+
+    # ==========================================
+    # Coroutines (ทำงานบน EngineLoop เท่านั้น)
+    # ==========================================
+    async def _open(self):
+        if self._lock is None: self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._protocol is not None: return
+            try:
+                _, self._protocol = await chess.engine.popen_uci(self.engine_path)
+            except Exception as e:
+                print(f"Failed to start engine: {e}")
+                return
+            supported = {k: v for k, v in self.options.items() if k in self._protocol.options}
+            config = dict(supported, **_elo_config(self._protocol.options, self.elo))
+            try:
+                if config: await self._protocol.configure(config)
+            except Exception as e:
+                print(f"Warning: Could not configure engine: {e}")
+
+    async def _close(self):
+        if self._protocol is None: return
+        try:
+            await self._protocol.quit()
+        except Exception:
+            pass
+        self._protocol = None
+
+    async def _ensure_open(self):
+        if self._protocol is None or self._protocol.returncode.done():
+            self._protocol = None
+            await self._open()
+        return self._protocol
+
+    async def _configure_elo(self):
+        protocol = await self._ensure_open()
+        if protocol is None: return
+        config = _elo_config(protocol.options, self.elo)
+        if not config: return
+        async with self._lock:
+            try:
+                await protocol.configure(config)
+            except Exception as e:
+                print(f"Warning: Could not configure engine Elo: {e}")
+
+    async def _play(self, board, clock=None):
+        if board.is_game_over(): return None
+        move = _instant_move(board, self.elo, self.book, self.tablebase, self.time_manager)
+        if move: return move
+        if self.time_manager is not None:
+            _, limit = self.time_manager.plan(board, self.elo, clock)
+        else:
+            limit = chess.engine.Limit(time=self.think_time)
+        for _ in range(2):
+            protocol = await self._ensure_open()
+            if protocol is None: return None
+            try:
+                async with self._lock:
+                    return (await protocol.play(board, limit)).move
+            except chess.engine.EngineTerminatedError:
+                self._protocol = None
+        return None
+
+    async def _analyse(self, board, think_time, min_depth, multipv):
+        if self.tablebase is not None:
+            resolved = self.tablebase.analyse(board, multipv)
+            if resolved: return resolved
+        if self.eval_cache is not None:
+            cached = self.eval_cache.get(board, min_depth, multipv)
+            if cached: return cached
+
+        limit = chess.engine.Limit(time=think_time or self.think_time)
+        result = None
+        for _ in range(2):
+            protocol = await self._ensure_open()
+            if protocol is None: return None
+            try:
+                async with self._lock:
+                    if multipv > 1:
+                        infos = await protocol.analyse(board, limit, multipv=multipv, info=chess.engine.INFO_ALL)
+                        result = _parse_multipv(infos)
+                    else:
+                        info = await protocol.analyse(board, limit, info=chess.engine.INFO_ALL)
+                        result = _parse_info(info)
+                break
+            except chess.engine.EngineTerminatedError:
+                # Engine ตายกลางทาง: เปิดใหม่แล้วลองอีกครั้ง (เหมือน _play)
+                self._protocol = None
+            except Exception:
+                return None
+        if result and self.eval_cache is not None: self.eval_cache.put(board, result)
+        return result
@@ -0,0 +1,173 @@
+"""Batch Game Review: รีวิวเกมจากไฟล์ PGN (ขนาดเท่าไหร่ก็ได้) แล้วเขียนผลเป็น JSON Lines
+
+    python batch_review.py games.pgn -o review.jsonl
+    python batch_review.py games.pgn -o review.jsonl --workers 32 --think-time 0.1
+
+- อ่านเกมทีละเกมด้วย chess.pgn.read_game (ไม่โหลดทั้งไฟล์) หน่วยความจำคงที่ไม่ขึ้นกับขนาดไฟล์
+- เขียนผลทีละเกม (1 บรรทัด = 1 เกม) และ flush ทันที
+- เก็บ checkpoint (ตำแหน่งในไฟล์ PGN + ขนาดไฟล์ผลลัพธ์) หลังทุก batch: รันคำสั่งเดิมซ้ำจะทำต่อจากจุดที่ค้าง
+"""
+import argparse
+import json
+import os
+import sys
+
+import chess
+import chess.pgn
+
+from engine_client import EngineClient
+from eval_cache import EvalCache
+from opening_book import OpeningBook, BOOK_MAX_PLY
+from review import GameReviewer, ParallelGameReviewer, REVIEW_THINK_TIME, REVIEW_ENGINE_OPTIONS
+
+SUMMARY_HEADERS = ("Event", "Site", "Date", "Round", "White", "Black", "Result", "WhiteElo", "BlackElo", "ECO")
+
+
+# ==========================================
+# Checkpoint - บันทึกความคืบหน้าแบบ atomic (เขียนไฟล์ชั่วคราวแล้ว os.replace)
+# ==========================================
+def load_checkpoint(path, pgn_path):
+    if not path or not os.path.exists(path): return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read checkpoint {path}: {e}")
+        return None
+    if data.get("pgn") != os.path.abspath(pgn_path):
+        print(f"Warning: checkpoint {path} belongs to {data.get('pgn')}, starting over")
+        return None
+    return data
+
+
+def save_checkpoint(path, pgn_path, offset, output_size, games_done):
+    data = {"pgn": os.path.abspath(pgn_path), "offset": offset, "output_size": output_size, "games": games_done}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# ==========================================
+# อ่าน PGN แบบ Streaming
+# ==========================================
+def read_batches(pgn_file, batch_size):
+    """คืน (games, offset) ทีละ batch; offset = ตำแหน่งในไฟล์หลังเกมสุดท้ายของ batch (ใช้ seek กลับมาได้)"""
+    batch = []
+    while True:
+        game = chess.pgn.read_game(pgn_file)
+        if game is None: break
+        batch.append(game)
+        if len(batch) >= batch_size:
+            yield batch, pgn_file.tell()
+            batch = []
+    if batch:
+        yield batch, pgn_file.tell()
+
+
+def game_record(index, game, review):
+    """แปลงผลรีวิวหนึ่งเกมเป็น dict สำหรับเขียน 1 บรรทัด JSON"""
+    board = game.board()
+    moves = []
+    counts = {"white": {}, "black": {}}
+    for ply, item in enumerate(review):
+        side = "white" if board.turn == chess.WHITE else "black"
+        best = item["best_move"]
+        moves.append({
+            "ply": ply + 1,
+            "san": board.san(item["move"]),
+            "uci": item["move"].uci(),
+            "class": item["class"],
+            "score": item["score"],
+            "loss": item["loss"],
+            "best": board.san(best) if best and board.is_legal(best) else None,
+        })
+        counts[side][item["class"]] = counts[side].get(item["class"], 0) + 1
+        board.push(item["move"])
+
+    return {
+        "index": index,
+        "headers": {key: game.headers[key] for key in SUMMARY_HEADERS if key in game.headers},
+        "fen": game.board().fen() if "FEN" in game.headers else None,
+        "moves": moves,
+        "summary": counts,
+        "errors": [str(e) for e in game.errors],
+    }
+
+
+def build_reviewer(args, eval_cache):
+    book = OpeningBook(args.book, max_ply=args.book_plies) if args.book else None
+    if args.workers > 1:
+        return ParallelGameReviewer(workers=args.workers, engine_path=args.engine, eval_cache=eval_cache,
+                                    think_time=args.think_time, book=book)
+    engine = EngineClient(args.engine, elo=3000, think_time=args.think_time, eval_cache=eval_cache,
+                          options=REVIEW_ENGINE_OPTIONS)
+    return GameReviewer(engine, args.think_time, book)
+
+
+def close_reviewer(reviewer):
+    if isinstance(reviewer, ParallelGameReviewer):
+        reviewer.close()
+    elif reviewer.engine:
+        reviewer.engine.close()
+
+
+def run(args):
+    checkpoint_path = args.checkpoint or args.output + ".ckpt"
+    checkpoint = None if args.restart else load_checkpoint(checkpoint_path, args.pgn)
+
+    # ทิ้งบรรทัดที่เขียนไม่จบ/ยังไม่ถูก checkpoint จากรอบก่อน แล้วเขียนต่อท้าย
+    if checkpoint:
+        with open(args.output, "ab") as out:
+            out.truncate(checkpoint["output_size"])
+        print(f"Resuming after game {checkpoint['games']}")
+    elif os.path.exists(args.output):
+        open(args.output, "wb").close()
+
+    eval_cache = EvalCache(path=args.cache) if args.cache else EvalCache()
+    reviewer = build_reviewer(args, eval_cache)
+    games_done = checkpoint["games"] if checkpoint else 0
+
+    try:
+        with open(args.pgn, encoding="utf-8-sig", errors="replace") as pgn_file, open(args.output, "ab") as out:
+            if checkpoint: pgn_file.seek(checkpoint["offset"])
+
+            for games, offset in read_batches(pgn_file, args.batch):
+                reviews = reviewer.analyze_games([list(g.mainline_moves()) for g in games],
+                                                 [g.board() for g in games])
+                for game, review in zip(games, reviews):
+                    games_done += 1
+                    line = json.dumps(game_record(games_done, game, review), ensure_ascii=False)
+                    out.write(line.encode("utf-8") + b"\n")
+                out.flush()
+                save_checkpoint(checkpoint_path, args.pgn, offset, out.tell(), games_done)
+                print(f"Reviewed {games_done} games", file=sys.stderr)
+                if args.limit and games_done >= args.limit: break
+    finally:
+        close_reviewer(reviewer)
+        if args.cache: eval_cache.save()
+
+    print(f"Done: {games_done} games -> {args.output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Review every game in a PGN file and write JSON Lines results.")
+    parser.add_argument("pgn", help="input PGN file (may contain many games)")
+    parser.add_argument("-o", "--output", default="review.jsonl", help="output JSON Lines file")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.ckpt)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint and start over")
+    parser.add_argument("--engine", help="path to a UCI engine (default: bundled Stockfish)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of engine processes")
+    parser.add_argument("--batch", type=int, default=4, help="games reviewed together per checkpoint")
+    parser.add_argument("--think-time", type=float, default=REVIEW_THINK_TIME, help="seconds per position")
+    parser.add_argument("--book", help="Polyglot opening book: book moves are labelled without engine search")
+    parser.add_argument("--book-plies", type=int, default=BOOK_MAX_PLY, help="only look up the book for this many plies")
+    parser.add_argument("--cache", help="eval cache file shared between runs (optional)")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many games in total (0 = all)")
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import random
+import threading
+import time
+
+import chess
+
+from async_engine_client import AsyncEngineClient
+from engine_client import EngineClient
+
+# Benchmark: วิเคราะห์สั้นๆ 1,000 ครั้งกระจายบน Engine 3 ตัว (play, analysis, review)
+# เทียบแบบเดิม (SimpleEngine + สร้าง Thread ใหม่ทุกคำสั่ง) กับ AsyncEngineClient (event loop เดียว + Future)
+#   python bench_async_engine.py --engine path/to/stockfish
+ANALYSES = 1000
+ENGINES = 3
+THINK_TIME = 0.001
+
+
+def random_positions(count, seed=0):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = chess.Board()
+        for _ in range(rng.randint(0, 40)):
+            legal = list(board.legal_moves)
+            if not legal: break
+            board.push(rng.choice(legal))
+        if not board.is_game_over(): positions.append(board)
+    return positions
+
+
+def bench_threads(engine_path, positions, engines, think_time):
+    clients = [EngineClient(engine_path, elo=3000, think_time=think_time) for _ in range(engines)]
+    # SimpleEngine ยกเลิกคำสั่งที่ค้างอยู่เมื่อมีคำสั่งใหม่เข้ามา: แต่ละ Thread ต้องรอ lock ของ Engine ตัวนั้นก่อน
+    locks = [threading.Lock() for _ in range(engines)]
+    threads_peak = threading.active_count()
+    results = [None] * len(positions)
+
+    def task(i, board):
+        with locks[i % engines]:
+            results[i] = clients[i % engines].analyse_position(board, think_time=think_time)
+
+    t0 = time.perf_counter()
+    workers = []
+    for i, board in enumerate(positions):
+        worker = threading.Thread(target=task, args=(i, board), daemon=True)
+        worker.start()
+        workers.append(worker)
+        threads_peak = max(threads_peak, threading.active_count())
+    for worker in workers: worker.join()
+    elapsed = time.perf_counter() - t0
+
+    for client in clients: client.close()
+    return elapsed, threads_peak, sum(r is not None for r in results)
+
+
+def bench_async(engine_path, positions, engines, think_time):
+    clients = [AsyncEngineClient(engine_path, elo=3000, think_time=think_time) for _ in range(engines)]
+    for client in clients: client.open().result()
+    threads_peak = threading.active_count()
+
+    t0 = time.perf_counter()
+    futures = [clients[i % engines].analyse_position_async(board, think_time=think_time)
+               for i, board in enumerate(positions)]
+    threads_peak = max(threads_peak, threading.active_count())
+    results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - t0
+
+    for client in clients: client.close()
+    return elapsed, threads_peak, sum(r is not None for r in results)
+
+
+def report(name, elapsed, threads_peak, ok, count):
+    print(f"{name:<18} {elapsed:7.2f} s   {count / elapsed:8.1f} analyses/s   "
+          f"peak threads {threads_peak:5d}   ok {ok}/{count}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", help="path to a UCI engine (default: bundled Stockfish)")
+    parser.add_argument("--count", type=int, default=ANALYSES)
+    parser.add_argument("--engines", type=int, default=ENGINES)
+    parser.add_argument("--think-time", type=float, default=THINK_TIME)
+    args = parser.parse_args()
+
+    positions = random_positions(args.count)
+    print(f"{args.count} analyses of {args.think_time * 1000:.0f} ms on {args.engines} engines")
+    report("thread-per-call", *bench_threads(args.engine, positions, args.engines, args.think_time), args.count)
+    report("AsyncEngineClient", *bench_async(args.engine, positions, args.engines, args.think_time), args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import random
+import statistics
+import time
+
+import chess
+
+from history import PositionHistory
+
+# Benchmark: เดินหน้า-ถอยหลังทีละตาในเกมยาว 500 ply แล้ววัด latency ต่อก้าว
+# เทียบวิธีเดิม (replay จาก start_fen ทุกครั้ง) กับ PositionHistory.seek
+PLIES = 500
+
+
+def random_game(plies):
+    seed = 0
+    while True:
+        rng = random.Random(seed)
+        board = chess.Board()
+        moves = []
+        while len(moves) < plies:
+            legal = list(board.legal_moves)
+            if not legal: break
+            move = rng.choice(legal)
+            board.push(move)
+            moves.append(move)
+        if len(moves) == plies: return moves
+        seed += 1
+
+
+def walk(step_fn, moves):
+    path = list(range(1, len(moves) + 1)) + list(range(len(moves) - 1, -1, -1))
+    latencies = []
+    for idx in path:
+        t0 = time.perf_counter()
+        step_fn(idx)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def report(name, latencies):
+    us = sorted(t * 1e6 for t in latencies)
+    p99 = us[int(len(us) * 0.99) - 1]
+    print(f"{name:<18} mean {statistics.mean(us):8.1f} us   p99 {p99:8.1f} us   max {us[-1]:8.1f} us")
+
+
+def main():
+    moves = random_game(PLIES)
+
+    def replay_step(idx):
+        board = chess.Board()
+        for i in range(idx):
+            board.push(moves[i])
+
+    positions = PositionHistory()
+    state = {"board": chess.Board()}
+    positions.reset(chess.STARTING_FEN, state["board"])
+
+    def seek_step(idx):
+        state["board"] = positions.seek(state["board"], moves, idx)
+
+    print(f"Walking a {len(moves)}-ply game forward and back ({2 * len(moves)} steps)")
+    report("replay from start", walk(replay_step, moves))
+    report("PositionHistory", walk(seek_step, moves))
+
+    # กระโดดสุ่ม (เช่นคลิกในรายการ PGN) ต้องใช้เวลาจำกัดเช่นกัน
+    rng = random.Random(1)
+    jumps = [rng.randint(0, len(moves)) for _ in range(1000)]
+    latencies = []
+    for idx in jumps:
+        t0 = time.perf_counter()
+        state["board"] = positions.seek(state["board"], moves, idx)
+        latencies.append(time.perf_counter() - t0)
+    report("random jumps", latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import random
+import statistics
+import time
+
+import chess
+
+from game_session import GameSession
+
+# Benchmark: latency จากคลิกหมากจนได้ช่องที่ต้องไฮไลต์ (และคลิกช่องปลายทางจนได้ Move ที่ถูกกติกา)
+# ในตำแหน่งกลางเกมที่มีตาเดินมาก เทียบวิธีเดิม (ไล่ board.legal_moves ใหม่ทุกคลิก) กับ GameSession.legal_index
+# - "first click" = คลิกแรกหลังตำแหน่งเปลี่ยน (รวมเวลาสร้าง index) "later clicks" = คลิกหมากตัวอื่นในตำแหน่งเดิม
+MIN_LEGAL_MOVES = 40
+
+
+def middlegames(count, seed=1):
+    """ตำแหน่งจากเกมสุ่ม ply 20-60 ที่ไม่ถูกรุกและมีตาเดินอย่างน้อย MIN_LEGAL_MOVES"""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = chess.Board()
+        for ply in range(rng.randint(20, 60)):
+            legal = list(board.legal_moves)
+            if not legal: break
+            captures = [m for m in legal if board.is_capture(m)]
+            # เกมสุ่มล้วนๆ เสียหมากเร็วเกินไป: กินหมากแค่บางครั้งเพื่อให้กระดานยังแน่น
+            board.push(rng.choice(captures if captures and rng.random() < 0.2 else legal))
+        if not board.is_game_over() and not board.is_check() and board.legal_moves.count() >= MIN_LEGAL_MOVES:
+            positions.append(board.fen())
+    return positions
+
+
+def old_click(board, src):
+    return [m.to_square for m in board.legal_moves if m.from_square == src]
+
+
+def old_execute(board, src, dst):
+    move = chess.Move(src, dst)
+    return move if move in board.legal_moves else None
+
+
+def measure(fens, repeat):
+    sessions = [GameSession(fen) for fen in fens]
+    old, first, later = [], [], []
+    for _ in range(repeat):
+        for session in sessions:
+            board = session.board
+            sources = sorted({m.from_square for m in board.legal_moves})
+            dst_of = {src: old_click(board, src)[0] for src in sources}
+
+            # วิธีเดิม: ทุกคลิกสร้างตาเดินใหม่ทั้งกระดาน
+            for src in sources:
+                t0 = time.perf_counter()
+                old_click(board, src)
+                old_execute(board, src, dst_of[src])
+                old.append(time.perf_counter() - t0)
+
+            # legal index: ตำแหน่งเปลี่ยน (check_status ล้าง index) แล้วคลิกหมากทุกตัวในตำแหน่งเดิม
+            session.check_status()
+            for i, src in enumerate(sources):
+                t0 = time.perf_counter()
+                session.legal_targets(src)
+                session.legal_index.find(src, dst_of[src])
+                (first if i == 0 else later).append(time.perf_counter() - t0)
+    return old, first, later
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Click-to-highlight latency: legal_moves scan vs legal-move index.")
+    parser.add_argument("--positions", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    fens = middlegames(args.positions)
+    avg_legal = statistics.mean(chess.Board(fen).legal_moves.count() for fen in fens)
+    old, first, later = measure(fens, args.repeat)
+
+    def row(name, samples):
+        us = sorted(t * 1e6 for t in samples)
+        print(f"{name:<22} median {statistics.median(us):7.1f} us   p99 {us[int(len(us) * 0.99)]:7.1f} us   "
+              f"({len(us)} clicks)")
+
+    print(f"{len(fens)} middlegame positions, {avg_legal:.1f} legal moves on average")
+    row("legal_moves scan", old)
+    row("index: first click", first)
+    row("index: later clicks", later)
+    per_position = (sum(old) / len(old)) * (len(first) + len(later)) / len(first)
+    with_index = (sum(first) + sum(later)) / len(first)
+    print(f"clicking every movable piece once per position: {per_position * 1e6:.0f} us -> {with_index * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from board import Board
+from game_session import GameSession
+from renderer import GameRenderer
+
+# Benchmark: เวลาต่อเฟรมของเลเยอร์ไฮไลท์ (move hints + ลูกศร + ช่องไฮไลท์) ที่หลายขนาดหน้าต่าง
+# before = สร้าง Surface SRCALPHA เต็มหน้าต่าง 2 แผ่นทุกเฟรม (แบบเดิม), after = GameRenderer._draw_highlights_layer
+WINDOW_SIZES = [(1200, 800), (1600, 900), (1920, 1080), (2560, 1440)]
+FRAMES = 200
+
+
+def make_state(window_size):
+    # คำนวณ layout แบบเดียวกับ Game.recalculate_layout
+    w, h = window_size
+    margin, panel_w = 45, 360
+    sq = max(32, min((w - margin * 2 - panel_w - 25) // 8, (h - margin * 2) // 8))
+    board_x = max(margin, (w - sq * 8 - panel_w - 25) // 2)
+    board_visual = Board(sq)
+    state = SimpleNamespace(
+        square_size=sq, board_x=board_x, board_y=margin, board_flipped=False, board_visual=board_visual,
+        edit_mode=False, session=GameSession(), selected_square=(7, 6), valid_moves=[(5, 5), (5, 7)],
+        user_highlights=[(4, 4), (3, 3)], user_arrows=[((6, 4), (4, 4)), ((7, 1), (5, 2))],
+        right_click_start=None,
+    )
+    state.screen_to_board = lambda x, y: ((y - state.board_y) // sq, (x - state.board_x) // sq)
+    return state
+
+
+def legacy_highlights_layer(renderer, game):
+    screen = renderer.screen
+    s = game.square_size
+    overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+    for r, c in game.valid_moves:
+        x, y = game.board_visual.to_screen(r, c, game.board_x, game.board_y, game.board_flipped)
+        pygame.draw.circle(overlay, renderer.theme["move_hint"], (x + s // 2, y + s // 2), s // 6)
+    screen.blit(overlay, (0, 0))
+    overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+    for r, c in game.user_highlights:
+        x, y = game.board_visual.to_screen(r, c, game.board_x, game.board_y, game.board_flipped)
+        pygame.draw.rect(overlay, renderer.theme["highlight_green"], (x, y, s, s))
+    # แบบเดิมวาดลูกศรลงบน overlay เต็มหน้าต่างโดยตรง: subsurface ชี้ไปที่พิกเซลของ overlay เดิม (ไม่สร้าง buffer ใหม่)
+    # เพราะ _draw_arrow ตอนนี้ใช้พิกัดของกระดาน (มุมซ้ายบนของกระดาน = 0, 0)
+    board_area = overlay.subsurface((game.board_x, game.board_y, s * 8, s * 8))
+    for start, end in game.user_arrows:
+        renderer._draw_arrow(board_area, game, start, end, renderer.theme["arrow_green"])
+    screen.blit(overlay, (0, 0))
+
+
+def time_frames(fn):
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        fn()
+    return (time.perf_counter() - t0) / FRAMES * 1000
+
+
+def main():
+    pygame.init()
+    print(f"{'window':>11}  {'before (ms)':>11}  {'after (ms)':>10}")
+    for size in WINDOW_SIZES:
+        screen = pygame.display.set_mode(size)
+        renderer = GameRenderer(screen)
+        state = make_state(size)
+        before = time_frames(lambda: legacy_highlights_layer(renderer, state))
+        after = time_frames(lambda: renderer._draw_highlights_layer(state))
+        print(f"{size[0]:>5}x{size[1]:<5}  {before:11.3f}  {after:10.3f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
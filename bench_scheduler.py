@@ -0,0 +1,101 @@
+import argparse
+import random
+import threading
+import time
+
+import chess
+
+from engine_client import EngineClient
+from engine_scheduler import EngineScheduler, INTERACTIVE, BATCH, LATENCY_BUDGET
+from review import ParallelGameReviewer, REVIEW_ENGINE_OPTIONS
+
+# Benchmark: ผู้เล่นรอ AI ตอบตาเดินทุก --interval วินาที ขณะที่ Game Review 100 เกมใช้ Engine ชุดเดียวกันอยู่
+# เทียบ "fifo" (ทุกงานต่อคิวเดียวกัน ไม่มีความสำคัญ = เรียก Engine ตรงๆ แบบเดิม)
+# กับ "priority" (EngineScheduler: interactive มาก่อน และแย่ง Engine จากงานรีวิวด้วย stop)
+
+
+def random_games(count, plies, seed=1):
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        board = chess.Board()
+        moves = []
+        while len(moves) < plies and not board.is_game_over():
+            move = rng.choice(list(board.legal_moves))
+            board.push(move)
+            moves.append(move)
+        games.append(moves)
+    return games
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else float("nan")
+
+
+def run(mode, args, games):
+    engines = [EngineClient(args.engine, elo=3000, think_time=args.review_time, options=REVIEW_ENGINE_OPTIONS)
+               for _ in range(args.engines)]
+    scheduler = EngineScheduler(engines, preempt=(mode == "priority"))
+    # fifo: ตาเดินของผู้เล่นต่อคิวเดียวกับงานรีวิว ไม่มี deadline ให้ลัดคิว (เหมือนไม่มี scheduler)
+    player = scheduler.player(INTERACTIVE if mode == "priority" else BATCH, elo=1500, think_time=args.move_time)
+    # รีวิว 100 เกมจากนักเรียนหลายคนพร้อมกัน (server สร้าง reviewer หนึ่งตัวต่อคำขอ review)
+    reviewers = [ParallelGameReviewer(scheduler=scheduler, think_time=args.review_time) for _ in range(args.reviewers)]
+    review_time = {}
+
+    def review_all():
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=r.analyze_games, args=(games[i::len(reviewers)],), daemon=True)
+                   for i, r in enumerate(reviewers)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        review_time["seconds"] = time.perf_counter() - t0
+        done.set()
+
+    done = threading.Event()
+    threading.Thread(target=review_all, daemon=True).start()
+
+    latencies = []
+    board = chess.Board()
+    while not done.is_set():
+        time.sleep(args.interval)
+        t0 = time.perf_counter()
+        move = player.choose_move(board)
+        latencies.append(time.perf_counter() - t0)
+        if move: board.push(move)
+        if move is None or board.is_game_over(): board.reset()
+
+    metrics = scheduler.metrics()
+    for reviewer in reviewers: reviewer.close()
+    scheduler.close(close_engines=True)
+
+    budget = LATENCY_BUDGET[INTERACTIVE]
+    ms = [t * 1000 for t in latencies]
+    over = sum(1 for t in latencies if t > budget)
+    print(f"{mode:<9} moves {len(ms):4d}  p50 {percentile(ms, 0.5):7.0f} ms  p99 {percentile(ms, 0.99):7.0f} ms  "
+          f"max {max(ms, default=float('nan')):7.0f} ms  over {budget:g}s budget: {over:3d}  "
+          f"review {review_time.get('seconds', float('nan')):6.1f} s  "
+          f"max batch queue {metrics['batch']['max_queue']}  preemptions {metrics['preemptions']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Interactive move latency while a batch review runs.")
+    parser.add_argument("--engine", help="path to a UCI engine (default: bundled Stockfish)")
+    parser.add_argument("--engines", type=int, default=2)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--reviewers", type=int, default=8, help="concurrent review requests sharing the games")
+    parser.add_argument("--plies", type=int, default=30)
+    parser.add_argument("--review-time", type=float, default=0.05, help="seconds per reviewed position")
+    parser.add_argument("--move-time", type=float, default=0.3, help="seconds per interactive engine move")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between interactive moves")
+    parser.add_argument("--modes", nargs="+", default=["fifo", "priority"])
+    args = parser.parse_args(argv)
+
+    games = random_games(args.games, args.plies)
+    print(f"{args.engines} engines, {len(games)} games x {args.plies} plies reviewed by {args.reviewers} clients, "
+          f"interactive move every {args.interval:g} s")
+    for mode in args.modes: run(mode, args, games)
+
+
+if __name__ == "__main__":
+    main()
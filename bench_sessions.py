@@ -0,0 +1,69 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+import chess
+
+from game_session import GameSession
+
+# Benchmark: เปิด GameSession หลายพันเกมใน process เดียว (ไม่ต้องมี SDL/หน้าจอ) แล้วเดินสลับกันทีละเกม
+# วัด moves/second ของแกนเกม (ตรวจกติกา + SAN + history + ตรวจจบเกม) และหน่วยความจำต่อ session
+# sessions/core = moves/second หารด้วยความถี่ที่ผู้เล่นหนึ่งคนเดิน (ผู้เล่น 1 ตา + AI 1 ตา ทุก --move-interval วินาที)
+MAX_PLIES = 200          # เกมที่ยาวเกินนี้เริ่มใหม่ (ผู้ฝึกส่วนใหญ่ไม่เล่นยาวกว่านี้)
+UNDO_EVERY = 25          # ทุกๆ กี่ ply จะกด Undo หนึ่งครั้ง (ผู้ฝึกย้อนตาบ่อย)
+
+
+def play_round(sessions, rng, stats):
+    for session in sessions:
+        if session.game_over or len(session.move_history_obj) >= MAX_PLIES:
+            session.reset()
+            stats["games"] += 1
+            continue
+        if session.move_history_obj and len(session.move_history_obj) % UNDO_EVERY == 0 and rng.random() < 0.5:
+            session.undo(2)
+            stats["undos"] += 1
+        src = rng.choice([m.from_square for m in session.board.legal_moves])
+        dst = rng.choice(session.legal_targets(src))   # เหมือนผู้ใช้คลิกหมาก แล้วคลิกช่องที่ไฮไลต์
+        move = chess.Move(src, dst)
+        if not session.board.is_legal(move): move = chess.Move(src, dst, promotion=chess.QUEEN)
+        session.push(move)
+        stats["moves"] += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark headless GameSession throughput.")
+    parser.add_argument("--sessions", type=int, default=1000, help="concurrent game sessions in this process")
+    parser.add_argument("--seconds", type=float, default=5.0, help="how long to run")
+    parser.add_argument("--move-interval", type=float, default=10.0,
+                        help="seconds between a player's moves in a real training session")
+    args = parser.parse_args(argv)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [GameSession() for _ in range(args.sessions)]
+    rng = random.Random(1)
+    stats = {"moves": 0, "games": 0, "undos": 0}
+    for _ in range(20): play_round(sessions, rng, stats)   # ให้ทุกเกมมีประวัติก่อนวัดหน่วยความจำ
+    per_session_kb = (tracemalloc.get_traced_memory()[0] - before) / args.sessions / 1024
+    tracemalloc.stop()
+
+    stats = {"moves": 0, "games": 0, "undos": 0}
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < args.seconds:
+        play_round(sessions, rng, stats)
+    elapsed = time.perf_counter() - t0
+
+    moves_per_sec = stats["moves"] / elapsed
+    # แต่ละ session ต้องการ 2 ตาต่อ move_interval (ผู้เล่น + AI)
+    sessions_per_core = moves_per_sec / (2 / args.move_interval)
+    print(f"{args.sessions} sessions, {stats['moves']} moves, {stats['undos']} undos, "
+          f"{stats['games']} games restarted in {elapsed:.1f} s")
+    print(f"moves/second (1 core): {moves_per_sec:10.0f}")
+    print(f"memory per session   : {per_session_kb:10.1f} KiB")
+    print(f"sessions per core    : {sessions_per_core:10.0f}  (one move every {args.move_interval:g} s per side, "
+          f"engine time not included)")
+
+
+if __name__ == "__main__":
+    main()
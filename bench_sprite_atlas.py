@@ -0,0 +1,67 @@
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import chess
+import pygame
+
+from board import Board
+from piece import SpriteAtlas
+
+# Benchmark: นับจำนวนครั้งที่อ่านไฟล์ PNG จากดิสก์ต่อการกด jump_to_move หนึ่งครั้ง
+# จำลองสิ่งที่ Game._hard_reset_board ทำกับกระดานภาพ (load_from_fen) ขณะเลื่อนดูประวัติด้วยลูกศร
+PLIES = 120
+SEED = 1
+
+
+def random_game(plies, seed):
+    rng = random.Random(seed)
+    board = chess.Board()
+    moves = []
+    for _ in range(plies):
+        legal = list(board.legal_moves)
+        if not legal: break
+        move = rng.choice(legal)
+        board.push(move)
+        moves.append(move)
+    return moves
+
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    # นับทุกการเรียก pygame.image.load (คือการอ่านดิสก์จริง)
+    disk_reads = [0]
+    original_load = pygame.image.load
+
+    def counting_load(*args, **kwargs):
+        disk_reads[0] += 1
+        return original_load(*args, **kwargs)
+
+    pygame.image.load = counting_load
+
+    moves = random_game(PLIES, SEED)
+    steps = list(range(len(moves), -1, -1)) + list(range(len(moves) + 1))
+
+    board_visual = Board()
+    t0 = time.perf_counter()
+    for idx in steps:
+        board_logic = chess.Board()
+        for m in moves[:idx]:
+            board_logic.push(m)
+        board_visual.load_from_fen(board_logic.board_fen())
+    elapsed = time.perf_counter() - t0
+
+    pygame.image.load = original_load
+    print(f"jump_to_move steps: {len(steps)}")
+    print(f"PNG disk reads:     {disk_reads[0]} ({disk_reads[0] / len(steps):.2f} per jump)")
+    print(f"Atlas decodes:      {SpriteAtlas.disk_reads}")
+    print(f"Total time:         {elapsed * 1000:.1f} ms ({elapsed / len(steps) * 1e6:.0f} us per jump)")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
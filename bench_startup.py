@@ -0,0 +1,66 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Benchmark: เวลาตั้งแต่เริ่ม process จนวาดเฟรมแรก (time-to-first-frame) ของ Game
+# รันใน process ใหม่ทุกรอบเพื่อรวมเวลา import และใช้ SDL dummy driver (ไม่ต้องมีหน้าจอ)
+#   python bench_startup.py [runs]
+RUNS = 5
+
+CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import pygame
+from game import Game
+t_import = time.perf_counter()
+game = Game()
+t_init = time.perf_counter()
+game._poll_startup()   # ลำดับเดียวกับ Game.run: ไอคอนยังไม่โหลดเพราะยังไม่มีเฟรมที่แสดงแล้ว
+game.renderer.draw_game(game)
+t_frame = time.perf_counter()
+
+game._poll_startup()   # เฟรมถัดไป: โหลดไอคอน
+t_icons = time.perf_counter()
+game.renderer.start_deferred_loading()
+while not game.renderer.fonts_ready and time.perf_counter() - t_frame < 10:
+    game._poll_startup()
+    time.sleep(0.001)
+t_fonts = time.perf_counter()
+deadline = time.perf_counter() + 10
+while not game.engine_pool.is_ready("play") and not game.engine_pool.failures and time.perf_counter() < deadline:
+    time.sleep(0.005)
+t_engine = time.perf_counter()
+
+print(json.dumps({
+    "import": t_import - t0, "init": t_init - t_import, "first_frame": t_frame - t0,
+    "icons_ready": t_icons - t0, "fonts_ready": t_fonts - t0, "engine_ready": t_engine - t0,
+    "engine_ok": game.engine_pool.is_ready("play"),
+}))
+game.analysis_worker.close()
+game.engine_pool.close()
+"""
+
+
+def run_once():
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    out = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, env=env,
+                         cwd=os.path.dirname(os.path.abspath(__file__)), timeout=60)
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if not lines: raise RuntimeError(out.stderr)
+    return json.loads(lines[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    results = [run_once() for _ in range(runs)]
+    print(f"Startup over {runs} runs (median ms)")
+    for key in ("import", "init", "first_frame", "icons_ready", "fonts_ready", "engine_ready"):
+        print(f"  {key:<12} {statistics.median(r[key] for r in results) * 1000:8.1f}")
+    if not all(r["engine_ok"] for r in results):
+        print("  (engine did not start: engine_ready is the time until the pool gave up)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import pygame
+import chess
 from piece import (
     DEFAULT_SQUARE_SIZE,
     Pawn, Rook, Knight, Bishop, Queen, King
@@ -11,6 +12,8 @@ DARK = (181, 136, 99)
 HIGHLIGHT_SELECTED = (246, 246, 105)
 HIGHLIGHT_MOVE = (106, 190, 48)
 
+PIECE_CLASSES = {"pawn": Pawn, "rook": Rook, "knight": Knight, "bishop": Bishop, "queen": Queen, "king": King}
+
 
 def _to_view_coords(row: int, col: int, flipped: bool):
     if not flipped:
@@ -22,6 +25,8 @@ class Board:
     def __init__(self, square_size: int = DEFAULT_SQUARE_SIZE):
         self.square_size = square_size
         self.grid = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        self._background = None
+        self._background_key = None
         self.init_start_position()
 
     def set_square_size(self, new_size: int):
@@ -64,6 +69,27 @@ class Board:
                 y = offset_y + view_row * s
                 pygame.draw.rect(screen, color, (x, y, s, s))
 
+    def draw_background(self, screen, offset_x: int, offset_y: int, font, flipped: bool = False,
+                        color=(50, 50, 50), bg_color=(30, 30, 30)):
+        """วาดช่องกระดาน + พิกัด จาก Surface ที่ render ไว้แล้ว (render ใหม่เมื่อขนาด/การพลิก/ธีมเปลี่ยนเท่านั้น)"""
+        key = (self.square_size, flipped, tuple(color), tuple(bg_color), id(font))
+        if self._background is None or self._background_key != key:
+            self._background = self._render_background(font, flipped, color, bg_color)
+            self._background_key = key
+        surface, pad_left = self._background
+        screen.blit(surface, (offset_x - pad_left, offset_y))
+
+    def _render_background(self, font, flipped, color, bg_color):
+        s = self.square_size
+        label_w = max(font.size(ch)[0] for ch in "12345678")
+        label_h = max(font.size(ch)[1] for ch in "abcdefgh")
+        pad_left = label_w + 6
+        surface = pygame.Surface((pad_left + 8 * s, 8 * s + label_h + 2)).convert()
+        surface.fill(bg_color)
+        self.draw_squares(surface, pad_left, 0, flipped)
+        self.draw_coordinates(surface, pad_left, 0, font, flipped, color)
+        return surface, pad_left
+
     def draw_highlights(self, screen, offset_x, offset_y, selected, valid_moves, checked_king, flipped: bool = False):
         s = self.square_size
 
@@ -159,6 +185,53 @@ class Board:
                     self.grid[r][c] = PieceClass(color, self.square_size)
                     c += 1
 
+    def sync_with(self, new_board, prev_board=None, squares=None):
+        """อัปเดตกระดานภาพให้ตรงกับ chess.Board โดยแตะเฉพาะช่องที่เปลี่ยน และนำตัวหมากเดิมกลับมาใช้ซ้ำ
+
+        - prev_board: ตำแหน่งก่อนหน้า (grid ต้องตรงกับตำแหน่งนี้) ใช้ bitboard หาช่องที่ต่างกัน
+        - squares: ระบุช่อง (chess square) ที่รู้อยู่แล้วว่าเปลี่ยน
+        ถ้าไม่ระบุทั้งสองอย่างจะเทียบทั้ง 64 ช่อง (ไม่มีการสร้างหมากใหม่ถ้าไม่จำเป็น)
+        คืนค่าเป็น list ของ (row, col) ที่ถูกแก้ไข
+        """
+        if squares is None:
+            if prev_board is not None:
+                mask = 0
+                for color in chess.COLORS:
+                    for piece_type in chess.PIECE_TYPES:
+                        mask |= prev_board.pieces_mask(piece_type, color) ^ new_board.pieces_mask(piece_type, color)
+                squares = chess.scan_forward(mask)
+            else:
+                squares = chess.SQUARES
+
+        spare = {}
+        placements = []
+        changed = []
+        for sq in squares:
+            r, c = 7 - chess.square_rank(sq), chess.square_file(sq)
+            wanted = new_board.piece_at(sq)
+            current = self.grid[r][c]
+            if wanted is None:
+                if current is None: continue
+            else:
+                color = "white" if wanted.color == chess.WHITE else "black"
+                kind = chess.piece_name(wanted.piece_type)
+                if current is not None and current.color == color and current.kind == kind: continue
+                placements.append((r, c, color, kind))
+            if current is not None:
+                spare.setdefault((current.color, current.kind), []).append(current)
+            self.grid[r][c] = None
+            changed.append((r, c))
+
+        for r, c, color, kind in placements:
+            reusable = spare.get((color, kind))
+            if reusable:
+                piece = reusable.pop()
+                piece.set_size(self.square_size)
+            else:
+                piece = PIECE_CLASSES[kind](color, self.square_size)
+            self.grid[r][c] = piece
+        return changed
+
     def to_screen(self, row, col, offset_x, offset_y, flipped: bool):
         s = self.square_size
         view_row, view_col = _to_view_coords(row, col, flipped)
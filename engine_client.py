@@ -130,15 +130,136 @@
 #     def __del__(self):
 #         self.close()
 import os
+import threading
+import time
 import chess
 import chess.engine
 import random
 from pathlib import Path
 
+from eval_cache import CACHE_MIN_DEPTH
+
+PONDER_MAX_TIME = 120  # วินาทีสูงสุดที่ Engine คิดล่วงหน้าระหว่างรอผู้เล่น
+
 # ==========================================
 # OOP ในโมดูลนี้: Superclass, Subclass, Inheritance, Polymorphism, Encapsulation
 # ==========================================
 
+def _parse_info(info):
+    """แปลง InfoDict ของ python-chess เป็น dict ที่ Game/GameReviewer ใช้ (คะแนนจากมุมมองฝั่งขาวเสมอ)"""
+    if not info or "score" not in info: return None
+    score_obj = info["score"].pov(chess.WHITE)
+    mate = score_obj.mate()
+    cp = score_obj.score() if mate is None else None
+    pv = info.get("pv", [])
+    best_move = pv[0] if pv else None
+    return {"cp": cp, "mate": mate, "best_move": best_move, "pv": pv, "depth": info.get("depth")}
+
+
+def _parse_multipv(infos):
+    """MultiPV: ใช้บรรทัดแรกเป็นผลหลัก และเก็บทุกบรรทัดไว้ใน "lines" (move, cp, mate)"""
+    lines = []
+    for info in infos:
+        parsed = _parse_info(info)
+        if parsed and parsed["best_move"]:
+            lines.append({"move": parsed["best_move"], "cp": parsed["cp"], "mate": parsed["mate"]})
+    result = _parse_info(infos[0]) if infos else None
+    if result: result["lines"] = lines
+    return result
+
+
+def _elo_config(options, elo):
+    """UCI options ที่ทำให้ Engine เล่นที่ระดับ elo (UCI_Elo ถ้ามี ไม่เช่นนั้นใช้ Skill Level)"""
+    config = {}
+
+    if "UCI_LimitStrength" in options and "UCI_Elo" in options:
+        min_elo = options["UCI_Elo"].min
+        max_elo = options["UCI_Elo"].max
+        target_elo = max(min_elo, min(elo, max_elo))
+        config["UCI_LimitStrength"] = True
+        config["UCI_Elo"] = target_elo
+
+    elif "Skill Level" in options:
+        skill = int((elo - 100) / (3200 - 100) * 20)
+        config["Skill Level"] = max(0, min(20, skill))
+
+    return config
+
+
+def _instant_move(board, elo, book=None, tablebase=None, time_manager=None):
+    """ตาที่ตอบได้ทันทีโดยไม่ต้องค้นหา (None = ต้องถาม Engine)
+
+    ลำดับ: หนังสือเปิดเกม -> Syzygy tablebase -> ตาบังคับ (เดินได้ตาเดียว เมื่อใช้ time_manager)
+    ใช้ร่วมกันใน EngineClient, AsyncEngineClient และ PooledEngine ให้ทุก client ตัดสินแบบเดียวกัน
+    """
+    if board.is_game_over(): return None
+    if book is not None:
+        move = book.choose(board, elo)
+        if move: return move
+    if tablebase is not None:
+        move = tablebase.best_move(board)
+        if move: return move
+    if time_manager is not None:
+        legal = list(board.legal_moves)
+        if len(legal) == 1: return legal[0]
+    return None
+
+
+# ---------- AnalysisStream: ผลวิเคราะห์ที่ยกเลิกกลางทางได้ ----------
+class AnalysisStream:
+    def __init__(self, handle, board=None, eval_cache=None):
+        self._handle = handle
+        self._board = board
+        self._eval_cache = eval_cache
+
+    def stop(self):
+        try:
+            self._handle.stop()
+        except Exception:
+            pass
+
+    def __iter__(self):
+        """Streaming: คืนผลทีละรอบเมื่อ Engine ค้นหาลึกขึ้น (depth/score/PV เปลี่ยน) จนกว่าจะจบหรือถูก stop()"""
+        last = None
+        try:
+            for info in self._handle:
+                if "pv" not in info: continue
+                parsed = _parse_info(info)
+                if parsed is None or not parsed["pv"]: continue
+                key = (parsed["depth"], parsed["cp"], parsed["mate"], parsed["best_move"])
+                if key == last: continue
+                last = key
+                if self._eval_cache is not None: self._eval_cache.put(self._board, parsed)
+                yield parsed
+        except Exception:
+            return
+
+    def result(self):
+        """รอจนการค้นหาจบ (หรือถูก stop) แล้วคืนผลล่าสุดที่ Engine รายงาน"""
+        try:
+            self._handle.wait()
+            parsed = _parse_info(self._handle.info)
+        except Exception:
+            return None
+        if parsed and self._eval_cache is not None: self._eval_cache.put(self._board, parsed)
+        return parsed
+
+
+# ---------- ResolvedAnalysis: ผลที่รู้แน่นอนแล้ว (เช่นจาก tablebase) ในรูปแบบเดียวกับ AnalysisStream ----------
+class ResolvedAnalysis:
+    def __init__(self, info):
+        self._info = info
+
+    def stop(self):
+        pass
+
+    def __iter__(self):
+        yield self._info
+
+    def result(self):
+        return self._info
+
+
 # ---------- 1. Superclass (คลาสแม่) ----------
 # BasePlayer เป็นคลาสแม่ กำหนด interface ร่วม: ทุก Player ต้องมี choose_move(board)
 class BasePlayer:
@@ -153,7 +274,8 @@ class BasePlayer:
 # ---------- 2. Subclass + Inheritance (คลาสลูก + การสืบทอด) ----------
 # EngineClient สืบทอดจาก BasePlayer ได้ name และ choose_move(); แล้ว Override choose_move()
 class EngineClient(BasePlayer):
-    def __init__(self, engine_path=None, elo=1200, think_time=0.2):
+    def __init__(self, engine_path=None, elo=1200, think_time=0.2, eval_cache=None, options=None, auto_restart=True,
+                 book=None, tablebase=None, time_manager=None, ponder=False):
         # Inheritance: เรียก Constructor ของ Superclass ก่อน
         super().__init__("Stockfish Engine AI")
 
@@ -164,6 +286,22 @@ class EngineClient(BasePlayer):
         self.engine_path = str(engine_path)
         self.think_time = float(think_time)
         self.elo = elo
+        self.eval_cache = eval_cache  # EvalCache ที่แชร์ระหว่าง Game และ GameReviewer (optional)
+        self.options = dict(options or {})  # UCI options ที่ตั้งทุกครั้งที่เปิด Engine เช่น {"Threads": 1, "Hash": 16}
+        # auto_restart=False: เมื่อ Engine ตายจะ raise EngineTerminatedError ให้ผู้เรียก (เช่น EnginePool) สลับตัวสำรองเอง
+        # แทนการเปิด process ใหม่ค้างอยู่ในจังหวะนั้น
+        self.auto_restart = auto_restart
+        self.book = book  # OpeningBook (optional): ตาเปิดเกมเลือกจากหนังสือโดยไม่ต้องค้นหา
+        self.tablebase = tablebase  # Tablebase (optional): ตำแหน่งหมากน้อยตอบจาก Syzygy ทันที
+        self.time_manager = time_manager  # ThinkTimeScheduler (optional): แทน think_time คงที่ตอนเล่น
+        # Pondering: หลังเดินแล้วให้ Engine คิดต่อบนตำแหน่งที่คาดว่าผู้เล่นจะตอบ (ใช้เวลาที่ผู้เล่นคิด)
+        self.ponder = ponder
+        self._ponder = None  # (fen ของตำแหน่งที่คาดไว้, handle ของ analysis)
+        self._ponder_lock = threading.Lock()
+        self._ponder_epoch = 0  # เพิ่มทุกครั้งที่ stop_pondering() ใช้ตรวจการคิดล่วงหน้าที่ถูกยกเลิกระหว่างเริ่ม
+        # การค้นหาของ analyse_position ที่กำลังทำอยู่ (ให้ thread อื่นสั่ง stop_search ได้ เช่น scheduler แย่ง Engine)
+        self._search = None
+        self._search_stopped = False
 
         # Encapsulation: _engine, _opened เป็น state ภายใน (โดย convention ขึ้นต้น _ = private)
         self._engine = None
@@ -182,8 +320,11 @@ class EngineClient(BasePlayer):
             self._opened = True
         except Exception as e:
             print(f"Failed to start engine: {e}")
+            return
+        self._apply_options()
 
     def close(self):
+        self.stop_pondering()
         if self._opened and self._engine:
             try:
                 self._engine.quit()
@@ -192,32 +333,55 @@ class EngineClient(BasePlayer):
         self._engine = None
         self._opened = False
 
+    def is_alive(self):
+        """process ของ Engine ยังทำงานอยู่หรือไม่ (ไม่ส่งคำสั่งใดๆ จึงเรียกได้แม้ Engine กำลังค้นหา)"""
+        if not self._opened or not self._engine: return False
+        try:
+            return not self._engine.protocol.returncode.done()
+        except Exception:
+            return False
+
+    def ping(self, timeout=2.0):
+        """Health check: ส่ง isready แล้วรอ readyok (ใช้กับ Engine ที่ว่างอยู่เท่านั้น)"""
+        if not self.is_alive(): return False
+        try:
+            self._engine.ping()
+            return True
+        except Exception:
+            return False
+
+    def set_options(self, options):
+        self.options.update(options)
+        if self._opened: self._apply_options()
+
     def set_elo(self, elo):
         self.elo = int(elo)
         if self._opened:
+            self.stop_pondering()
             self._apply_elo_to_engine()
 
     # ==========================================
     # 3. Encapsulation - การซ่อนรายละเอียดภายใน
     # ==========================================
+    def _move_limit(self, board, clock=None):
+        """(ตาบังคับ, Limit) ของการคิดหนึ่งตา: ใช้ time_manager ถ้ามี ไม่เช่นนั้นใช้ think_time คงที่"""
+        if self.time_manager is None: return None, chess.engine.Limit(time=self.think_time)
+        return self.time_manager.plan(board, self.elo, clock)
+
+    def _apply_options(self):
+        """ตั้ง UCI options เฉพาะตัวที่ Engine รองรับ"""
+        if not self._engine or not self.options: return
+        supported = {k: v for k, v in self.options.items() if k in self._engine.options}
+        try:
+            if supported: self._engine.configure(supported)
+        except Exception as e:
+            print(f"Warning: Could not configure engine options: {e}")
+
     def _apply_elo_to_engine(self):
         """Private Method: จัดการตั้งค่าความเก่งภายใน Engine ไม่ให้ภายนอกเรียกใช้โดยตรง"""
         if not self._engine: return
 
-        options = self._engine.options
-        config = {}
-
-        if "UCI_LimitStrength" in options and "UCI_Elo" in options:
-            min_elo = options["UCI_Elo"].min
-            max_elo = options["UCI_Elo"].max
-            target_elo = max(min_elo, min(self.elo, max_elo))
-            config["UCI_LimitStrength"] = True
-            config["UCI_Elo"] = target_elo
-
-        elif "Skill Level" in options:
-            skill = int((self.elo - 100) / (3200 - 100) * 20)
-            config["Skill Level"] = max(0, min(20, skill))
-
+        config = _elo_config(self._engine.options, self.elo)
         if config:
             try:
                 self._engine.configure(config)
@@ -227,34 +391,184 @@ class EngineClient(BasePlayer):
     # ==========================================
     # 4. Polymorphism - การเขียนทับฟังก์ชัน (Overriding)
     # ==========================================
-    def choose_move(self, board):
-        """เขียนทับ Choose Move ของคลาสแม่ เพื่อใช้ AI ในการตัดสินใจเดินหมาก"""
+    def choose_move(self, board, clock=None):
+        """เขียนทับ Choose Move ของคลาสแม่ เพื่อใช้ AI ในการตัดสินใจเดินหมาก
+
+        clock: เวลาที่เหลือบนนาฬิกา {"white_clock", "black_clock", "white_inc", "black_inc"} (ใช้กับ time_manager)
+        """
+        move = _instant_move(board, self.elo, self.book, self.tablebase, self.time_manager)
+        if move or board.is_game_over():
+            # ไม่ต้องค้นหา: การคิดล่วงหน้าที่ค้างอยู่ (ถ้ามี) ไม่ได้ใช้แล้ว หยุดก่อนคืนค่า
+            self.stop_pondering()
+            return move
+        _, limit = self._move_limit(board, clock)   # ตาบังคับถูกตอบไปแล้วใน _instant_move
+        with self._ponder_lock:
+            epoch = self._ponder_epoch
+        pondered = self._take_ponder(board)
         if not self._opened: self.open()
-        if board.is_game_over(): return None
 
-        limit = chess.engine.Limit(time=self.think_time)
         try:
-            result = self._engine.play(board, limit)
+            # ponderhit: Engine คิดตำแหน่งนี้ไว้แล้ว ให้คิดต่ออีกตามเวลาปกติแล้วใช้ผล (ไม่เริ่มค้นหาใหม่)
+            result = self._finish_ponder(pondered, limit) if pondered else None
+            if result is None: result = self._engine.play(board, limit)
+            self._start_ponder(board, result, epoch)
             return result.move
         except chess.engine.EngineTerminatedError:
             self.close()
+            if not self.auto_restart: raise
             self.open()
             return self._engine.play(board, limit).move
         except:
             return None
 
-    def analyse_position(self, board, think_time=None):
+    # ==========================================
+    # Pondering
+    # ==========================================
+    def stop_pondering(self):
+        """ยกเลิกการคิดล่วงหน้า (เรียกเมื่อ Undo/ย้อนประวัติ/เริ่มเกมใหม่ หรือก่อนสั่งงานอื่นกับ Engine)"""
+        with self._ponder_lock:
+            ponder, self._ponder = self._ponder, None
+            self._ponder_epoch += 1   # _start_ponder ที่กำลังเริ่มอยู่จะเห็นว่าถูกยกเลิกแล้ว
+        if ponder:
+            try:
+                ponder[1].stop()
+            except Exception:
+                pass
+
+    def _take_ponder(self, board):
+        """คืน handle ถ้าตำแหน่งตรงกับที่คิดไว้ล่วงหน้า (ponderhit) ไม่เช่นนั้นยกเลิกแล้วคืน None (ponder miss)"""
+        with self._ponder_lock:
+            ponder, self._ponder = self._ponder, None
+        if not ponder: return None
+        fen, handle = ponder
+        if fen == board.fen(): return handle
+        try:
+            handle.stop()
+        except Exception:
+            pass
+        return None
+
+    def _start_ponder(self, board, result, epoch):
+        # epoch: ค่า _ponder_epoch ตอนเริ่มคิดตานี้ ถ้า stop_pondering() ถูกเรียกระหว่างนั้น (Undo/ย้อนประวัติ)
+        # ตำแหน่งที่จะคิดล่วงหน้าไม่เกิดขึ้นแล้ว จึงไม่เริ่ม หรือหยุดทันทีถ้าเพิ่งเริ่มไป
+        if not self.ponder or not result or not result.move or not result.ponder: return
+        ponder_board = board.copy()
+        ponder_board.push(result.move)
+        if not ponder_board.is_legal(result.ponder): return
+        ponder_board.push(result.ponder)
+        if ponder_board.is_game_over(): return
+        with self._ponder_lock:
+            if self._ponder_epoch != epoch: return
+        try:
+            handle = self._engine.analysis(ponder_board, chess.engine.Limit(time=PONDER_MAX_TIME))
+        except Exception:
+            return
+        with self._ponder_lock:
+            cancelled = self._ponder_epoch != epoch
+            if not cancelled: self._ponder = (ponder_board.fen(), handle)
+        if cancelled:
+            try:
+                handle.stop()
+            except Exception:
+                pass
+
+    def _finish_ponder(self, handle, limit):
+        time.sleep(limit.time if limit and limit.time else self.think_time)
+        try:
+            handle.stop()
+            best = handle.wait()
+        except Exception:
+            return None
+        return best if best and best.move else None
+
+    def analyse_position(self, board, think_time=None, min_depth=CACHE_MIN_DEPTH, multipv=1):
+        """วิเคราะห์ตำแหน่ง ถ้ามีผลใน eval_cache ที่ลึกอย่างน้อย min_depth จะคืนทันทีโดยไม่เรียก Engine
+
+        multipv > 1: ผลจะมี "lines" = ตาเดินที่ดีที่สุด multipv ตาพร้อมคะแนน (ค้นหาครั้งเดียว)
+        """
+        if self.tablebase is not None:
+            resolved = self.tablebase.analyse(board, multipv)
+            if resolved: return resolved
+        if self.eval_cache is not None:
+            cached = self.eval_cache.get(board, min_depth, multipv)
+            if cached: return cached
+
+        self.stop_pondering()
         if not self._opened: self.open()
         limit = chess.engine.Limit(time=think_time or self.think_time)
         try:
-            info = self._engine.analyse(board, limit, info=chess.engine.INFO_ALL)
-            score_obj = info["score"].pov(chess.WHITE)
-            mate = score_obj.mate()
-            cp = score_obj.score() if mate is None else None
-            pv = info.get("pv", [])
-            best_move = pv[0] if pv else None
-
-            return {"cp": cp, "mate": mate, "best_move": best_move}
+            result = self._search_position(board, limit, multipv)
+        except chess.engine.EngineTerminatedError:
+            self.close()
+            if not self.auto_restart: raise
+            # Engine ตายกลางทาง: เปิดใหม่แล้วลองอีกครั้งเดียว (ตัวที่อยู่ใน EnginePool ใช้ auto_restart=False แทน)
+            self.open()
+            try:
+                result = self._search_position(board, limit, multipv)
+            except:
+                return None
+        except:
+            return None
+        if result and self.eval_cache is not None: self.eval_cache.put(board, result)
+        return result
+
+    def _search_position(self, board, limit, multipv):
+        """ค้นหาหนึ่งครั้งแบบหยุดได้ด้วย stop_search() คืน None ถ้าถูกหยุดกลางทาง"""
+        if not self._engine: return None
+        handle = self._engine.analysis(board, limit, multipv=multipv if multipv > 1 else None,
+                                       info=chess.engine.INFO_ALL)
+        with self._ponder_lock:
+            self._search, self._search_stopped = handle, False
+        try:
+            handle.wait()
+        finally:
+            with self._ponder_lock:
+                self._search, stopped = None, self._search_stopped
+        # ถูกสั่งหยุดกลางทาง: ผลยังตื้นเกินกว่าจะใช้หรือเก็บลง cache
+        if stopped: return None
+        return _parse_multipv(handle.multipv) if multipv > 1 else _parse_info(handle.info)
+
+    def stop_search(self):
+        """หยุด analyse_position ที่กำลังค้นหาอยู่ (เรียกจาก thread อื่น) คืน True ถ้ามีการค้นหาให้หยุด
+
+        analyse_position ที่ถูกหยุดจะคืน None และไม่เก็บผลลง eval_cache
+        """
+        with self._ponder_lock:
+            handle = self._search
+            if handle is not None: self._search_stopped = True
+        if handle is None: return False
+        try:
+            handle.stop()
+        except Exception:
+            pass
+        return True
+
+    def start_analysis(self, board, think_time=None, infinite=False):
+        """เริ่มวิเคราะห์แบบไม่ block คืน AnalysisStream ที่สั่ง stop() ได้เมื่อตำแหน่งเปลี่ยน
+
+        infinite=True: ค้นหาลึกขึ้นเรื่อยๆ จนกว่าจะถูก stop() (think_time ถ้ากำหนด = เพดานเวลา)
+        """
+        if self.tablebase is not None:
+            resolved = self.tablebase.analyse(board)
+            if resolved: return ResolvedAnalysis(resolved)
+        self.stop_pondering()
+        if not self._opened: self.open()
+        if not self._engine: return None
+        if infinite:
+            limit = chess.engine.Limit(time=think_time) if think_time else None
+        else:
+            limit = chess.engine.Limit(time=think_time or self.think_time)
+        try:
+            return AnalysisStream(self._engine.analysis(board, limit, info=chess.engine.INFO_ALL), board, self.eval_cache)
+        except chess.engine.EngineTerminatedError:
+            self.close()
+            if not self.auto_restart: raise
+            self.open()
+            try:
+                return AnalysisStream(self._engine.analysis(board, limit, info=chess.engine.INFO_ALL), board,
+                                      self.eval_cache)
+            except:
+                return None
         except:
             return None
 
@@ -0,0 +1,246 @@
+import threading
+
+import chess.engine
+
+from engine_client import BasePlayer, EngineClient, ResolvedAnalysis, _instant_move
+from eval_cache import CACHE_MIN_DEPTH
+
+ENGINE_READY_TIMEOUT = 30.0   # วินาทีที่ยอมรอ Engine ตัวแรกของ role ก่อนถือว่าใช้ไม่ได้
+HEALTH_CHECK_INTERVAL = 2.0   # วินาทีระหว่างการตรวจสุขภาพ Engine
+STANDBY_ENGINES = 1           # จำนวน Engine สำรองที่เปิดรอไว้
+
+
+# ==========================================
+# EnginePool - เปิด Engine ล่วงหน้าใน background และมีตัวสำรอง (warm standby)
+# ==========================================
+# - แต่ละ role (play, analysis, review) ได้ Engine ของตัวเอง พร้อม config
+#   (elo, think_time, eval_cache, book, tablebase, time_manager, ponder, options)
+# - Game ไม่ต้องรอ popen ตอนเริ่มโปรแกรม: get(role) คืน PooledEngine ทันที แล้ว Engine จริงจะตามมาเมื่อพร้อม
+# - Engine ตาย (EngineTerminatedError หรือ health check ไม่ผ่าน) จะสลับเป็นตัวสำรองที่เปิดไว้แล้วทันที
+#   และเปิดตัวสำรองใหม่แทนใน background ผู้เล่นจึงไม่ต้องรอ Engine restart
+class EnginePool:
+    def __init__(self, roles, engine_path=None, standby=STANDBY_ENGINES, health_interval=HEALTH_CHECK_INTERVAL):
+        self.engine_path = engine_path
+        self.standby_target = standby
+        self.health_interval = health_interval
+
+        self._roles = {role: dict(config) for role, config in roles.items()}
+        self._active = {}      # role -> EngineClient ที่ใช้งานอยู่
+        self._standby = []     # EngineClient ที่เปิดรอไว้ ยังไม่มี role
+        self._spawning = 0
+        self.failures = 0      # จำนวนครั้งติดกันที่เปิด Engine ไม่สำเร็จ
+        self._proxies = {}
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="engine-pool", daemon=True)
+        self._thread.start()
+
+    # ---------- API สำหรับผู้ใช้ pool ----------
+    def get(self, role, **config):
+        """คืน PooledEngine ของ role (ไม่ block) ถ้ายังไม่มี role นี้จะเริ่มเปิด Engine ให้ใน background"""
+        with self._cond:
+            if role not in self._roles:
+                self._roles[role] = config
+                self._cond.notify_all()
+            if role not in self._proxies:
+                self._proxies[role] = PooledEngine(self, role)
+            return self._proxies[role]
+
+    def is_ready(self, role):
+        with self._cond:
+            return role in self._active
+
+    def acquire(self, role, timeout=ENGINE_READY_TIMEOUT):
+        """รอจน role มี Engine พร้อมใช้ แล้วคืน EngineClient (None ถ้าหมดเวลาหรือ pool ปิดแล้ว)"""
+        with self._cond:
+            # ถ้าเปิด Engine ไม่สำเร็จ (เช่นไม่มีไฟล์ Engine) ไม่ต้องรอจนหมดเวลา
+            self._cond.wait_for(lambda: role in self._active or not self._running or self.failures, timeout)
+            return self._active.get(role)
+
+    def configure(self, role, **config):
+        """เปลี่ยน config ของ role (เช่น elo) ให้มีผลกับ Engine ปัจจุบันและตัวที่จะมาแทนในอนาคต"""
+        with self._cond:
+            self._roles.setdefault(role, {}).update(config)
+            engine = self._active.get(role)
+        if engine: self._apply(engine, config)
+
+    def replace(self, role, dead):
+        """สลับ Engine ที่ตายของ role เป็นตัวสำรอง คืน Engine ตัวใหม่ (หรือ None ถ้ายังไม่มีตัวสำรอง)"""
+        with self._cond:
+            if self._active.get(role) is not dead:
+                return self._active.get(role)  # thread อื่นสลับให้แล้ว
+            del self._active[role]
+            self._promote_standby(role)
+            self._cond.notify_all()
+            engine = self._active.get(role)
+        dead.close()
+        return engine
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            engines = list(self._active.values()) + self._standby
+            self._active.clear()
+            self._standby = []
+            self._cond.notify_all()
+        for engine in engines: engine.close()
+        self._thread.join(timeout=1.0)
+
+    # ---------- ภายใน pool ----------
+    def _promote_standby(self, role):
+        # เรียกขณะถือ _cond อยู่
+        while self._standby:
+            engine = self._standby.pop(0)
+            if engine.is_alive():
+                self._apply(engine, self._roles[role])
+                self._active[role] = engine
+                return True
+            engine.close()
+        return False
+
+    def _apply(self, engine, config):
+        if "think_time" in config: engine.think_time = float(config["think_time"])
+        if "eval_cache" in config: engine.eval_cache = config["eval_cache"]
+        if "book" in config: engine.book = config["book"]
+        if "tablebase" in config: engine.tablebase = config["tablebase"]
+        if "time_manager" in config: engine.time_manager = config["time_manager"]
+        if "ponder" in config: engine.ponder = config["ponder"]
+        if "options" in config: engine.set_options(config["options"])
+        if "elo" in config: engine.set_elo(config["elo"])
+
+    def _spawn(self):
+        try:
+            return EngineClient(self.engine_path, auto_restart=False)
+        except Exception as e:
+            print(f"Warning: Could not start pooled engine: {e}")
+            return None
+
+    def _needed(self):
+        """role ที่ยังไม่มี Engine + จำนวนตัวสำรองที่ขาด (เรียกขณะถือ _cond)"""
+        missing = [role for role in self._roles if role not in self._active]
+        return len(missing) + max(0, self.standby_target - len(self._standby)) - self._spawning
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: not self._running or self._needed() > 0, self.health_interval)
+                if not self._running: return
+                need = self._needed()
+                if need > 0: self._spawning += 1
+
+            if need <= 0:
+                self._health_check()
+                continue
+
+            # เปิด Engine นอก lock (popen ใช้เวลา) แล้วมอบให้ role ที่ยังรออยู่ก่อน ที่เหลือเก็บเป็นตัวสำรอง
+            engine = self._spawn()
+            with self._cond:
+                self._spawning -= 1
+                if not self._running:
+                    if engine: engine.close()
+                    return
+                if engine is None or not engine.is_alive():
+                    self.failures += 1
+                    if engine: engine.close()
+                    self._cond.notify_all()
+                else:
+                    self.failures = 0
+                    self._standby.append(engine)
+                    for role in self._roles:
+                        if role not in self._active and not self._promote_standby(role): break
+                    self._cond.notify_all()
+
+            if self.failures:
+                # เปิดไม่ได้: เว้นระยะก่อนลองใหม่ ไม่วนเปิดถี่ๆ
+                with self._cond:
+                    self._cond.wait_for(lambda: not self._running, min(30.0, self.health_interval * self.failures))
+
+    def _health_check(self):
+        with self._cond:
+            active = list(self._active.items())
+            standby = list(self._standby)
+
+        # Engine ที่ใช้งานอยู่: ตรวจแค่ว่า process ยังอยู่ (ส่ง isready ระหว่างค้นหาจะไปยกเลิกงานที่ค้างอยู่)
+        for role, engine in active:
+            if not engine.is_alive(): self.replace(role, engine)
+
+        # Engine สำรองว่างอยู่: ping ได้เต็มที่
+        for engine in standby:
+            if engine.ping(): continue
+            with self._cond:
+                if engine in self._standby: self._standby.remove(engine)
+                self._cond.notify_all()
+            engine.close()
+
+
+# ==========================================
+# PooledEngine - ตัวแทน (proxy) ของ Engine ใน pool ตาม role
+# ==========================================
+# Polymorphism: เป็น BasePlayer เหมือน EngineClient จึงใช้แทนกันได้ทั้งใน Game, AnalysisWorker และ GameReviewer
+# ทุกคำสั่งจะรอ Engine ของ role ให้พร้อม (ถูกเรียกจาก thread เบื้องหลังอยู่แล้ว) และถ้า Engine ตายกลางคำสั่ง
+# จะสลับเป็นตัวสำรองแล้วทำคำสั่งเดิมซ้ำหนึ่งครั้ง
+class PooledEngine(BasePlayer):
+    def __init__(self, pool, role):
+        super().__init__(f"Pooled Engine ({role})")
+        self._pool = pool
+        self.role = role
+
+    @property
+    def eval_cache(self):
+        return self._pool._roles.get(self.role, {}).get("eval_cache")
+
+    @property
+    def elo(self):
+        return self._pool._roles.get(self.role, {}).get("elo")
+
+    @property
+    def ready(self):
+        return self._pool.is_ready(self.role)
+
+    def set_elo(self, elo):
+        self._pool.configure(self.role, elo=int(elo))
+
+    def choose_move(self, board, clock=None):
+        # ตาในหนังสือเปิดเกม/tablebase ไม่ต้องรอ Engine (แม้ Engine ยังเปิดไม่เสร็จ)
+        config = self._pool._roles.get(self.role, {})
+        move = _instant_move(board, self.elo, config.get("book"), config.get("tablebase"), config.get("time_manager"))
+        if move: return move
+        return self._call("choose_move", board, clock)
+
+    def analyse_position(self, board, think_time=None, min_depth=CACHE_MIN_DEPTH, multipv=1):
+        resolved = self._tablebase_result(board, multipv)
+        if resolved: return resolved
+        cache = self.eval_cache
+        if cache is not None:
+            cached = cache.get(board, min_depth, multipv)
+            if cached: return cached
+        return self._call("analyse_position", board, think_time=think_time, min_depth=min_depth, multipv=multipv)
+
+    def start_analysis(self, board, think_time=None, infinite=False):
+        resolved = self._tablebase_result(board)
+        if resolved: return ResolvedAnalysis(resolved)
+        return self._call("start_analysis", board, think_time=think_time, infinite=infinite)
+
+    def stop_pondering(self):
+        # ไม่รอ Engine: ถ้ายังไม่มี Engine ก็ไม่มีอะไรให้หยุด
+        with self._pool._cond:
+            engine = self._pool._active.get(self.role)
+        if engine: engine.stop_pondering()
+
+    def _tablebase_result(self, board, multipv=1):
+        tablebase = self._pool._roles.get(self.role, {}).get("tablebase")
+        return tablebase.analyse(board, multipv) if tablebase is not None else None
+
+    def close(self):
+        # Engine เป็นของ pool: ปิดผ่าน EnginePool.close()
+        pass
+
+    def _call(self, method, *args, **kwargs):
+        engine = self._pool.acquire(self.role)
+        for _ in range(2):
+            if engine is None: return None
+            try:
+                return getattr(engine, method)(*args, **kwargs)
+            except chess.engine.EngineTerminatedError:
+                engine = self._pool.replace(self.role, engine) or self._pool.acquire(self.role)
+        return None
@@ -0,0 +1,346 @@
+import heapq
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from engine_client import BasePlayer
+from eval_cache import CACHE_MIN_DEPTH
+
+# ประเภทงาน (เลขน้อย = สำคัญกว่า)
+INTERACTIVE = 0     # AI ตอบตาเดินของผู้เล่นที่กำลังรออยู่
+LIVE_EVAL = 1       # Eval Bar / Best Move Hint ของตำแหน่งบนกระดาน
+BATCH = 2           # Game Review หลายเกม ทำเมื่อ Engine ว่าง
+CLASS_NAMES = {INTERACTIVE: "interactive", LIVE_EVAL: "live_eval", BATCH: "batch"}
+
+# latency budget (วินาที จากตอนส่งงานจนได้ผล) ของแต่ละประเภท None = ไม่มีกำหนด
+LATENCY_BUDGET = {INTERACTIVE: 2.0, LIVE_EVAL: 1.5, BATCH: None}
+LATENCY_WINDOW = 2000   # เก็บ latency ล่าสุดกี่งานต่อประเภทไว้คำนวณ p50/p99
+
+_DONE = object()
+
+
+class _Job:
+    __slots__ = ("fn", "priority", "deadline", "seq", "future", "preemptible", "drop_late", "submitted",
+                 "preempted", "started")
+
+    def __init__(self, fn, priority, deadline, seq, preemptible, drop_late):
+        self.fn = fn
+        self.priority = priority
+        self.deadline = deadline
+        self.seq = seq
+        self.future = Future()
+        self.preemptible = preemptible
+        self.drop_late = drop_late
+        self.submitted = time.perf_counter()
+        self.preempted = False
+        self.started = False
+
+    def key(self):
+        # ประเภทก่อน, ภายในประเภทเดียวกันใครใกล้ deadline ก่อนได้ก่อน (EDF), แล้วตามลำดับที่ส่งมา
+        return self.priority, self.deadline if self.deadline is not None else float("inf"), self.seq
+
+
+# ==========================================
+# EngineScheduler - คิวงานตามความสำคัญที่อยู่หน้า EngineClient
+# ==========================================
+# - Engine แต่ละตัวมี worker thread หนึ่งตัว หยิบงานที่สำคัญที่สุดจากคิวกลาง
+# - งาน INTERACTIVE/LIVE_EVAL มาถึงตอนที่ Engine ไม่ว่าง: แย่ง Engine จากงาน BATCH ที่กำลังค้นหา
+#   ด้วย EngineClient.stop_search() แล้วงาน BATCH นั้นกลับเข้าคิว (ค้นหาใหม่ภายหลัง เสียไม่เกิน think_time เดียว)
+# - deadline: งานที่ตั้ง drop_late (ค่าเริ่มต้นของ LIVE_EVAL) และเลย deadline ก่อนได้เริ่ม จะถูกทิ้ง (ผล = None)
+#   เพราะตำแหน่งนั้นไม่ได้อยู่บนกระดานแล้ว งานประเภทอื่นนับเป็น deadline miss ใน metrics()
+# - งานคือฟังก์ชัน fn(engine) ที่ทำงานบน Engine ที่ได้มา: ใช้ผ่าน ScheduledEngine (BasePlayer) ได้เลย
+class EngineScheduler:
+    def __init__(self, engines, budgets=None, preempt=True):
+        self.engines = list(engines)
+        self.budgets = dict(LATENCY_BUDGET, **(budgets or {}))
+        self.preempt = preempt
+        self._cond = threading.Condition()
+        self._queue = []
+        self._depth = dict.fromkeys(CLASS_NAMES, 0)   # จำนวนงานในคิวแยกตามประเภท
+        self._running = {}      # index ของ Engine -> งานที่กำลังทำ
+        self._seq = itertools.count()
+        self._closed = False
+
+        self._completed = dict.fromkeys(CLASS_NAMES, 0)
+        self._missed = dict.fromkeys(CLASS_NAMES, 0)
+        self._expired = dict.fromkeys(CLASS_NAMES, 0)
+        self._latencies = {c: [] for c in CLASS_NAMES}
+        self._preemptions = 0
+        self._max_depth = dict.fromkeys(CLASS_NAMES, 0)
+
+        self._threads = [threading.Thread(target=self._worker, args=(i,), name=f"engine-scheduler-{i}", daemon=True)
+                         for i in range(len(self.engines))]
+        for thread in self._threads: thread.start()
+
+    # ---------- API ----------
+    def submit(self, fn, priority=BATCH, deadline=None, preemptible=None, drop_late=None):
+        """ส่งงาน fn(engine) คืน concurrent.futures.Future ของผลลัพธ์
+
+        deadline: วินาทีนับจากตอนนี้ (None = ใช้ latency budget ของประเภทงาน)
+        preemptible: ยอมให้ถูกแย่ง Engine ได้ (ค่าเริ่มต้น: เฉพาะ BATCH) fn ที่ถูกแย่งต้องคืน None
+        drop_late: ทิ้งงานถ้าเลย deadline แล้วยังไม่ได้เริ่ม (ค่าเริ่มต้น: เฉพาะ LIVE_EVAL)
+        """
+        budget = self.budgets.get(priority) if deadline is None else deadline
+        job = _Job(fn, priority, time.perf_counter() + budget if budget is not None else None, next(self._seq),
+                   priority == BATCH if preemptible is None else preemptible,
+                   priority == LIVE_EVAL if drop_late is None else drop_late)
+        with self._cond:
+            if self._closed: raise RuntimeError("scheduler is closed")
+            self._push(job)
+            self._max_depth[priority] = max(self._max_depth[priority], self._depth[priority])
+            self._cond.notify()
+        if self.preempt and priority != BATCH: self._preempt(priority)
+        return job.future
+
+    def player(self, priority=INTERACTIVE, **config):
+        """BasePlayer ที่ส่งทุกคำสั่งผ่าน scheduler นี้ด้วยความสำคัญ priority"""
+        return ScheduledEngine(self, priority, **config)
+
+    def queue_depth(self):
+        with self._cond:
+            return {name: self._depth[priority] for priority, name in CLASS_NAMES.items()}
+
+    def metrics(self):
+        with self._cond:
+            running = dict.fromkeys(CLASS_NAMES.values(), 0)
+            for job in self._running.values(): running[CLASS_NAMES[job.priority]] += 1
+            result = {"engines": len(self.engines), "running": running, "queue": self.queue_depth(),
+                      "preemptions": self._preemptions}
+            for priority, name in CLASS_NAMES.items():
+                latencies = sorted(self._latencies[priority])
+                result[name] = {
+                    "completed": self._completed[priority],
+                    "deadline_missed": self._missed[priority],
+                    "expired": self._expired[priority],
+                    "max_queue": self._max_depth[priority],
+                    "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                    "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 1)
+                    if latencies else None,
+                }
+            return result
+
+    def close(self, close_engines=False):
+        with self._cond:
+            self._closed = True
+            pending, self._queue = self._queue, []
+            self._depth = dict.fromkeys(CLASS_NAMES, 0)
+            running = list(self._running.items())
+            self._cond.notify_all()
+        for _, job in pending:
+            # งานที่เคยเริ่มแล้วถูกแย่ง Engine กลับเข้าคิว (future เป็น RUNNING แล้ว cancel ไม่ได้): ปิดด้วยผล None
+            # แบบเดียวกับงานที่ถูกหยุด ไม่ให้ผู้ที่รอ result() ค้างตลอดไป
+            if job.started:
+                job.future.set_result(None)
+            else:
+                job.future.cancel()
+        for index, _ in running: self._stop(index)
+        for thread in self._threads: thread.join(timeout=2.0)
+        if close_engines:
+            for engine in self.engines: engine.close()
+
+    # ---------- ภายใน (เรียกขณะถือ _cond) ----------
+    def _push(self, job):
+        heapq.heappush(self._queue, (job.key(), job))
+        self._depth[job.priority] += 1
+
+    def _pop(self):
+        _, job = heapq.heappop(self._queue)
+        self._depth[job.priority] -= 1
+        return job
+
+    def _preempt(self, priority):
+        # stop_search() คืน False เมื่องานที่เลือกยังไม่ได้เริ่มค้นหา (หรือเป็นคำสั่งที่หยุดไม่ได้) งานนั้นจะทำจนจบตามปกติ
+        # จึงล้างสถานะ preempted (ไม่นับเป็น Engine ที่กำลังว่าง) แล้วลองแย่งจากงานอื่นแทน
+        tried = set()
+        while True:
+            with self._cond:
+                victim = self._pick_victim(priority, tried)
+            if victim is None: return
+            index, job = victim
+            if self._stop(index): return
+            with self._cond:
+                if job.preempted:
+                    job.preempted = False
+                    self._preemptions -= 1
+            tried.add(index)
+
+    def _pick_victim(self, priority, exclude=()):
+        # ถ้ายังมี Engine ว่างหรือมีงานที่ถูกแย่งไว้แล้วพอสำหรับงานด่วนในคิว ไม่ต้องแย่งเพิ่ม
+        if priority == BATCH: return None
+        urgent = self._depth[INTERACTIVE] + self._depth[LIVE_EVAL]
+        freeing = sum(1 for j in self._running.values() if j.preempted)
+        idle = len(self.engines) - len(self._running)
+        if urgent <= idle + freeing: return None
+        candidates = [(j.priority, j.seq, i) for i, j in self._running.items()
+                      if j.preemptible and not j.preempted and j.priority > priority and i not in exclude]
+        if not candidates: return None
+        _, _, index = max(candidates)   # งานที่สำคัญน้อยที่สุด และส่งมาหลังสุด
+        job = self._running[index]
+        job.preempted = True
+        self._preemptions += 1
+        return index, job
+
+    def _stop(self, index):
+        stop = getattr(self.engines[index], "stop_search", None)
+        return bool(stop()) if stop else False
+
+    def _worker(self, index):
+        engine = self.engines[index]
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if self._closed: return
+                job = self._pop()
+                if not job.started:
+                    if not job.future.set_running_or_notify_cancel(): continue
+                    job.started = True
+                if job.drop_late and job.deadline is not None and time.perf_counter() > job.deadline:
+                    self._expired[job.priority] += 1
+                    job.future.set_result(None)
+                    continue
+                job.preempted = False
+                self._running[index] = job
+
+            result, error = None, None
+            try:
+                result = job.fn(engine)
+            except BaseException as e:
+                error = e
+
+            with self._cond:
+                del self._running[index]
+                if job.preempted and error is None and result is None and not self._closed:
+                    # ถูกแย่ง Engine: กลับเข้าคิวด้วยลำดับเดิม (ได้ทำต่อก่อนงาน BATCH ที่มาทีหลัง)
+                    self._push(job)
+                    self._cond.notify()
+                    continue
+                done = time.perf_counter()
+                self._completed[job.priority] += 1
+                latencies = self._latencies[job.priority]
+                latencies.append(done - job.submitted)
+                if len(latencies) > LATENCY_WINDOW: del latencies[:len(latencies) - LATENCY_WINDOW]
+                if job.deadline is not None and done > job.deadline: self._missed[job.priority] += 1
+
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+
+# ==========================================
+# ScheduledEngine - BasePlayer ที่ส่งคำสั่งผ่าน EngineScheduler
+# ==========================================
+# Polymorphism: ใช้แทน EngineClient ได้ใน GameReviewer, AnalysisWorker, Game และ server
+# - *_async() คืน Future ทันที (เหมือน AsyncEngineClient) งานไปรอในคิวของ scheduler ไม่ต้องมี thread รอ
+# - ค่าของผู้ใช้แต่ละราย (elo, think_time) ถูกตั้งให้ Engine ที่ได้งานไปก่อนเริ่มค้นหา เพราะ Engine ถูกแบ่งกันใช้
+class ScheduledEngine(BasePlayer):
+    def __init__(self, scheduler, priority=INTERACTIVE, elo=3000, think_time=None, eval_cache=None, deadline=None):
+        super().__init__(f"Scheduled Engine ({CLASS_NAMES[priority]})")
+        self.scheduler = scheduler
+        self.priority = priority
+        self.elo = int(elo)
+        self.think_time = think_time
+        self.eval_cache = eval_cache
+        self.deadline = deadline
+
+    def set_elo(self, elo):
+        self.elo = int(elo)
+
+    def choose_move_async(self, board, clock=None):
+        board = board.copy()
+        return self._submit(lambda engine: self._prepare(engine).choose_move(board, clock))
+
+    def analyse_position_async(self, board, think_time=None, min_depth=CACHE_MIN_DEPTH, multipv=1):
+        if self.eval_cache is not None:
+            cached = self.eval_cache.get(board, min_depth, multipv)
+            if cached:
+                future = Future()
+                future.set_result(cached)
+                return future
+        board = board.copy()
+        think_time = think_time or self.think_time
+        return self._submit(lambda engine: self._analyse(engine, board, think_time, min_depth, multipv))
+
+    def choose_move(self, board, clock=None):
+        return self.choose_move_async(board, clock).result()
+
+    def analyse_position(self, board, think_time=None, min_depth=CACHE_MIN_DEPTH, multipv=1):
+        return self.analyse_position_async(board, think_time, min_depth, multipv).result()
+
+    def start_analysis(self, board, think_time=None, infinite=False):
+        stream = ScheduledAnalysis()
+        board = board.copy()
+        stream.future = self._submit(lambda engine: stream.run(self._prepare(engine), board, think_time, infinite))
+        stream.future.add_done_callback(lambda _: stream.finish())
+        return stream
+
+    def stop_pondering(self):
+        # Engine ไม่ได้เป็นของผู้ใช้คนใดคนหนึ่ง จึงไม่มีการคิดล่วงหน้าให้หยุด
+        pass
+
+    def close(self):
+        # Engine เป็นของ scheduler: ปิดผ่าน EngineScheduler.close()
+        pass
+
+    def _submit(self, fn):
+        return self.scheduler.submit(fn, self.priority, self.deadline)
+
+    def _analyse(self, engine, board, think_time, min_depth, multipv):
+        result = self._prepare(engine).analyse_position(board, think_time=think_time, min_depth=min_depth,
+                                                        multipv=multipv)
+        if result and self.eval_cache is not None: self.eval_cache.put(board, result)
+        return result
+
+    def _prepare(self, engine):
+        if getattr(engine, "elo", self.elo) != self.elo: engine.set_elo(self.elo)
+        if self.think_time is not None: engine.think_time = self.think_time
+        return engine
+
+
+# ---------- ScheduledAnalysis: AnalysisStream ที่รอคิว Engine ก่อนเริ่ม ----------
+class ScheduledAnalysis:
+    def __init__(self):
+        self.future = None
+        self._items = queue.Queue()
+        self._lock = threading.Lock()
+        self._stream = None
+        self._stopped = False
+
+    def run(self, engine, board, think_time, infinite):
+        with self._lock:
+            if self._stopped: return None
+        stream = engine.start_analysis(board, think_time=think_time, infinite=infinite)
+        if stream is None: return None
+        with self._lock:
+            self._stream = stream
+            stopped = self._stopped
+        if stopped: stream.stop()
+        last = None
+        for info in stream:
+            self._items.put(info)
+            last = info
+        return last
+
+    def finish(self):
+        self._items.put(_DONE)
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            stream = self._stream
+        if stream is not None: stream.stop()
+        if self.future is not None: self.future.cancel()   # ยังรอคิวอยู่: ไม่ต้องเริ่มเลย
+
+    def __iter__(self):
+        while True:
+            item = self._items.get()
+            if item is _DONE: return
+            yield item
+
+    def result(self):
+        try:
+            return self.future.result()
+        except Exception:
+            return None
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import chess
+import chess.polyglot
+
+EVAL_CACHE_SIZE = 100_000
+# depth ขั้นต่ำที่ analyse_position ยอมใช้ผลจาก cache แทนการค้นหาใหม่ (ค่าเริ่มต้นของ min_depth)
+# ผลจาก Eval Bar ที่ถูก stop หลังค้นหาไม่กี่ ms (depth 1-5) จึงไม่ถูกใช้เป็นผลรีวิว
+CACHE_MIN_DEPTH = 10
+
+
+# ==========================================
+# EvalCache - แคชผลวิเคราะห์ตาม Zobrist hash ของตำแหน่ง (Transposition-keyed)
+# ==========================================
+# ตำแหน่งเดียวกันไม่ว่าจะมาจากลำดับการเดินไหน จะได้ key เดียวกัน
+# ใช้ร่วมกันระหว่าง Game (Eval Bar) และ GameReviewer ผ่าน EngineClient.eval_cache
+# - get() คืนผลเมื่อ depth ที่เก็บไว้ลึกพอ (และมี MultiPV lines ครบตามที่ขอ ที่ลึกพอเช่นกัน)
+# - put() เก็บคะแนน/PV จากผลที่ลึกที่สุด และเก็บ MultiPV lines แยก (lines_depth) จากผลที่มี lines มากที่สุด
+#   ผล single-PV ที่ลึกกว่าจาก Eval Bar จึงไม่ทับ lines ของรีวิว และผลรีวิวก็ไม่ทับคะแนนที่ลึกกว่า
+# - get(multipv > 1) คืนผลของการค้นหาเดียวกับ lines เสมอ (best_move/คะแนนจาก lines[0]) ให้ best_move ตรงกับ lines
+# - LRU eviction เมื่อเกิน max_entries และบันทึก/โหลดจากไฟล์ JSON ได้ (optional)
+class EvalCache:
+    def __init__(self, max_entries=EVAL_CACHE_SIZE, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    @staticmethod
+    def key(board):
+        return chess.polyglot.zobrist_hash(board)
+
+    def get(self, board, min_depth=1, multipv=1):
+        key = self.key(board)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry["depth"] or 0) < min_depth or (
+                    multipv > 1 and (len(entry["lines"]) < multipv or (entry["lines_depth"] or 0) < min_depth)):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return _lines_snapshot(entry) if multipv > 1 else _copy_entry(entry)
+
+    def put(self, board, info):
+        if not info or not info.get("pv"): return
+        key = self.key(board)
+        entry = {
+            "cp": info.get("cp"),
+            "mate": info.get("mate"),
+            "best_move": info.get("best_move"),
+            "pv": list(info["pv"]),
+            "depth": info.get("depth"),
+            "lines": [dict(line) for line in info.get("lines", [])],
+        }
+        entry["lines_depth"] = entry["depth"] if entry["lines"] else None
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None: entry = _merge_entries(old, entry)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---------- Persistence ----------
+    def save(self, path=None):
+        path = path or self.path
+        if not path: return
+        with self._lock:
+            data = {format(key, "016x"): _entry_to_json(entry) for key, entry in self._entries.items()}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path=None):
+        path = path or self.path
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load eval cache {path}: {e}")
+            return
+        with self._lock:
+            for hex_key, raw in data.items():
+                self._entries[int(hex_key, 16)] = _entry_from_json(raw)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _merge_entries(old, new):
+    """คะแนน/PV จากผลที่ลึกกว่า + MultiPV lines จากผลที่มี lines มากกว่า (เท่ากัน: ลึกกว่า)"""
+    merged = dict(new) if (new["depth"] or 0) >= (old["depth"] or 0) else dict(old)
+    old_rank = (len(old["lines"]), old["lines_depth"] or 0)
+    new_rank = (len(new["lines"]), new["lines_depth"] or 0)
+    source = new if new_rank >= old_rank else old
+    merged["lines"], merged["lines_depth"] = source["lines"], source["lines_depth"]
+    return merged
+
+
+def _lines_snapshot(entry):
+    """ผลของการค้นหาที่ให้ lines: ถ้า lines มาจากการค้นหาอื่น (ตื้นกว่า) ใช้ lines[0] เป็น best_move/คะแนน"""
+    result = _copy_entry(entry)
+    top = entry["lines"][0]
+    if entry["lines_depth"] == entry["depth"] and entry["best_move"] == top["move"]: return result
+    result.update(cp=top["cp"], mate=top["mate"], best_move=top["move"], pv=[top["move"]],
+                  depth=entry["lines_depth"])
+    return result
+
+
+def _copy_entry(entry):
+    result = dict(entry)
+    result["pv"] = list(entry["pv"])
+    result["lines"] = [dict(line) for line in entry["lines"]]
+    return result
+
+
+def _entry_to_json(entry):
+    return {
+        "cp": entry["cp"], "mate": entry["mate"], "depth": entry["depth"], "lines_depth": entry["lines_depth"],
+        "pv": [m.uci() for m in entry["pv"]],
+        "lines": [{"move": line["move"].uci(), "cp": line["cp"], "mate": line["mate"]} for line in entry["lines"]],
+    }
+
+
+def _entry_from_json(raw):
+    pv = [chess.Move.from_uci(m) for m in raw.get("pv", [])]
+    # ไฟล์ cache เก่าไม่มี lines_depth: lines มาจากการค้นหาเดียวกับคะแนน
+    lines_depth = raw.get("lines_depth", raw.get("depth") if raw.get("lines") else None)
+    return {
+        "cp": raw.get("cp"), "mate": raw.get("mate"), "depth": raw.get("depth"), "lines_depth": lines_depth,
+        "best_move": pv[0] if pv else None, "pv": pv,
+        "lines": [{"move": chess.Move.from_uci(line["move"]), "cp": line["cp"], "mate": line["mate"]}
+                  for line in raw.get("lines", [])],
+    }
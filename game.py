@@ -1,27 +1,48 @@
 import pygame
 import chess
-import chess.pgn
 import threading
-import pyperclip
 import math
 
 from settings import *
 from board import Board
+from game_session import GameSession
 from renderer import GameRenderer
-from engine_client import EngineClient
+from engine_pool import EnginePool
+from analysis_worker import AnalysisWorker
+from eval_cache import EvalCache
+from opening_book import OpeningBook
+from tablebase import Tablebase
+from time_manager import ThinkTimeScheduler
+
+def _session_attr(name):
+    # ให้โค้ดเดิมและ renderer ใช้ game.board_logic / game.move_history_san ฯลฯ ได้เหมือนเดิม แต่เก็บจริงใน GameSession
+    return property(lambda self: getattr(self.session, name), lambda self, value: setattr(self.session, name, value))
+
 
 # ==========================================
 # Encapsulation (การห่อหุ้มข้อมูล)
 # ==========================================
+# กติกา/ประวัติการเดินอยู่ใน GameSession (ไม่ใช้ pygame) ส่วน Game ดูแลหน้าจอ, event, อนิเมชัน และ Engine
 class Game:
+    board_logic = _session_attr("board")
+    start_fen = _session_attr("start_fen")
+    positions = _session_attr("positions")
+    move_history_san = _session_attr("move_history_san")
+    move_history_obj = _session_attr("move_history_obj")
+    current_move_idx = _session_attr("current_move_idx")
+    game_over = _session_attr("game_over")
+    game_result_msg = _session_attr("game_result_msg")
+    in_check = _session_attr("in_check")
+
     def __init__(self):
-        pygame.init()
+        # เปิดเฉพาะ module ที่ใช้ (ไม่มีเสียง จึงไม่ต้องรอ init mixer/audio)
+        pygame.display.init()
+        pygame.font.init()
         self.screen = pygame.display.set_mode(WINDOW_SIZE, pygame.RESIZABLE)
         pygame.display.set_caption("Chess Trainer - Fantasy Editor")
 
         self.renderer = GameRenderer(self.screen)
         self.board_visual = Board(DEFAULT_SQUARE_SIZE)
-        self.board_logic = chess.Board()
 
         self._init_game_state()
         self._init_engine()
@@ -37,22 +58,17 @@ class Game:
         self.is_dark_mode = True
         self.board_flipped = False
 
-        # [NEW] ตัวแปรจำภาพกระดานเริ่มต้น (เพื่อแก้บั๊ก Undo ในกระดาน Custom)
-        self.start_fen = chess.STARTING_FEN
+        # กระดาน, start_fen (แก้บั๊ก Undo ในกระดาน Custom), ประวัติการเดิน และผลเกม
+        self.session = GameSession()
 
         self.selected_square = None
         self.valid_moves = []
-        self.move_history_san = []
-        self.move_history_obj = []
-        self.current_move_idx = 0
-
-        self.game_over = False
-        self.game_result_msg = ""
-        self.in_check = False
         self.checked_king_pos = None
         self.best_move_text = ""
         self.eval_cp = None
         self.eval_mate = None
+        self.eval_depth = None
+        self.eval_tablebase = False
         self.is_promoting = False
         self.promotion_data = {}
 
@@ -79,6 +95,14 @@ class Game:
         self.shake_offset = (0, 0)
         self.shake_timer = 0
 
+        # Dirty-rect rendering (opt-in): เก็บบริเวณที่ต้องวาดใหม่ ("board", "panel", "eval" หรือ Rect)
+        self.dirty_rendering = DIRTY_RECT_RENDERING
+        self.full_redraw = True
+        self.dirty_regions = set()
+        self.dirty_rects = []
+        # AnalysisWorker เรียก mark_dirty จาก thread ของตัวเอง: เพิ่ม/สลับชุด dirty ภายใต้ lock เดียวกัน
+        self._dirty_lock = threading.Lock()
+
     def _init_engine(self):
         self.engine_enabled = False
         self.engine_color = chess.BLACK
@@ -87,10 +111,21 @@ class Game:
         self.elo_dropdown_open = False
         self.elo_options = [300, 600, 900, 1200, 1500, 1800, 2100, 2400, 2700, 3000]
 
-        # Polymorphism: EngineClient เป็น BasePlayer ใช้ choose_move(board) ได้เหมือนกัน ไม่ต้องรู้ว่าเป็น AI
-        self.engine = EngineClient(elo=self.engine_elo, think_time=0.5)
-        self.analysis_engine = EngineClient(elo=3000, think_time=0.1)
+        # Engine ถูกเปิดใน background โดย EnginePool หน้าต่างจึงขึ้นได้ทันทีโดยไม่ต้องรอ Stockfish
+        # Polymorphism: PooledEngine เป็น BasePlayer ใช้ choose_move(board) ได้เหมือนกัน ไม่ต้องรู้ว่าเป็น AI
+        self.eval_cache = EvalCache(path=EVAL_CACHE_PATH)
+        self.opening_book = OpeningBook(BOOK_PATH)
+        self.tablebase = Tablebase(SYZYGY_DIR)
+        self.engine_pool = EnginePool({
+            "play": {"elo": self.engine_elo, "think_time": 0.5, "book": self.opening_book, "tablebase": self.tablebase,
+                     "time_manager": ThinkTimeScheduler(base_time=0.5), "ponder": True},
+            "analysis": {"elo": 3000, "think_time": 0.1, "eval_cache": self.eval_cache, "tablebase": self.tablebase},
+        })
+        self.engine = self.engine_pool.get("play")
+        self.analysis_engine = self.engine_pool.get("analysis")
         self.show_eval = False
+        self._analysis_fen = None
+        self.analysis_worker = AnalysisWorker(self.analysis_engine, self._on_analysis_result, max_time=ANALYSIS_MAX_TIME)
 
     def recalculate_layout(self):
         self.window_width, self.window_height = self.screen.get_size()
@@ -107,39 +142,20 @@ class Game:
         self.panel_x = self.board_x + bsize + 25
 
     def get_board_error(self):
-        wk = len(self.board_logic.pieces(chess.KING, chess.WHITE))
-        bk = len(self.board_logic.pieces(chess.KING, chess.BLACK))
-        if wk != 1 or bk != 1: return "Need exactly 1 King per side!"
-
-        p1 = self.board_logic.pieces(chess.PAWN, chess.WHITE)
-        p2 = self.board_logic.pieces(chess.PAWN, chess.BLACK)
-        if (p1 | p2) & (chess.BB_RANK_1 | chess.BB_RANK_8):
-            return "Pawns can't be on Rank 1 or 8!"
-
-        return ""
+        return self.session.board_error()
 
     def reset_game(self, fen=None):
-        if fen:
-            self.board_logic = chess.Board(fen)
-        else:
-            self.board_logic.reset()
-
+        self._stop_pondering()
         # [NEW] อัปเดตภาพจำเริ่มต้นทุกครั้งที่กดเริ่มเกมใหม่
-        self.start_fen = self.board_logic.fen()
+        self.session.reset(fen)
 
-        self.board_visual.load_from_fen(self.board_logic.board_fen())
+        self.board_visual.sync_with(self.board_logic)
         self.turn_color = "white" if self.board_logic.turn == chess.WHITE else "black"
         self.board_flipped = False
         if getattr(self, 'engine_enabled', False) and self.engine_color == chess.WHITE:
             self.board_flipped = True
-        self.move_history_san = []
-        self.move_history_obj = []
-        self.current_move_idx = 0
-        self.game_over = False
-        self.game_result_msg = ""
         self.selected_square = None
         self.valid_moves.clear()
-        self.in_check = False
         self.checked_king_pos = None
         self.is_promoting = False
         self.engine_locked = False
@@ -148,30 +164,118 @@ class Game:
         self.best_move_text = ""
         self.eval_cp = None
         self.eval_mate = None
+        self.eval_depth = None
+        self.eval_tablebase = False
         self.check_game_status()
         self.analyze_board()
         self.trigger_engine_move()
 
     def run(self):
         while self.running:
-            for event in pygame.event.get():
+            if self.dirty_rendering and not self.needs_redraw():
+                # หน้าจอนิ่ง: หลับรอ event แทนการวาดซ้ำ 60 ครั้งต่อวินาที
+                events = [pygame.event.wait(IDLE_WAIT_MS)] + pygame.event.get()
+            else:
+                events = pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.VIDEORESIZE:
                     self.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
                     self.recalculate_layout()
+                    self.mark_all_dirty()
                 elif event.type == pygame.USEREVENT:
-                    if hasattr(event, 'engine_move'): self.process_move(event.engine_move, animate=True)
+                    if hasattr(event, 'engine_move'): self._apply_engine_move(event)
+                elif event.type == pygame.NOEVENT:
+                    continue
                 else:
+                    self._mark_event_dirty(event)
                     self.handle_event(event)
+            self._poll_startup()
             self.update_shake()
             self.update_animation()
             self.renderer.draw_game(self)
+            self.renderer.start_deferred_loading()  # หลังเฟรมแรก: เริ่มโหลดฟอนต์ระบบใน background
             self.clock.tick(60)
-        self.engine.close()
-        self.analysis_engine.close()
+        self.analysis_worker.close()
+        self.engine_pool.close()
+        self.eval_cache.save()
         pygame.quit()
 
+    # ==========================================
+    # Staged startup - ของที่โหลดตามมาหลังเฟรมแรก
+    # ==========================================
+    def _poll_startup(self):
+        if self.renderer.poll_deferred(): self.mark_all_dirty()
+        status = self.engine_status_text()
+        if status != getattr(self, '_engine_status', None):
+            self._engine_status = status
+            self.mark_dirty("panel")
+
+    def engine_status_text(self):
+        """ข้อความสถานะ Engine ระหว่างที่ EnginePool ยังเปิด Engine ไม่เสร็จ ("" = พร้อมแล้วหรือยังไม่ได้ใช้)"""
+        waiting = (self.engine_enabled and not self.engine.ready) or (self.show_eval and not self.analysis_engine.ready)
+        if not waiting: return ""
+        return "Engine unavailable" if self.engine_pool.failures else "Engine starting..."
+
+    # ==========================================
+    # Dirty regions - ใช้เมื่อเปิด DIRTY_RECT_RENDERING
+    # ==========================================
+    def mark_dirty(self, *regions):
+        with self._dirty_lock:
+            for region in regions:
+                if isinstance(region, str):
+                    self.dirty_regions.add(region)
+                else:
+                    self.dirty_rects.append(pygame.Rect(region))
+
+    def mark_all_dirty(self):
+        with self._dirty_lock:
+            self.full_redraw = True
+
+    def mark_squares_dirty(self, squares, pad=0):
+        s = self.square_size
+        rects = []
+        for r, c in squares:
+            x, y = self.board_visual.to_screen(r, c, self.board_x, self.board_y, self.board_flipped)
+            rects.append(pygame.Rect(x, y, s, s).inflate(pad * 2, pad * 2))
+        with self._dirty_lock:
+            self.dirty_rects.extend(rects)
+
+    def needs_redraw(self):
+        with self._dirty_lock:
+            dirty = self.full_redraw or bool(self.dirty_regions) or bool(self.dirty_rects)
+        return dirty or self.animation is not None or self.shake_timer > 0
+
+    def take_dirty(self):
+        """คืน (full_redraw, regions, rects) ที่สะสมไว้แล้วล้างทันทีในจังหวะเดียว
+        mark ที่มาจาก thread อื่นหลังจากนี้จะอยู่ในชุดใหม่ (ไม่หายไประหว่างวาด)"""
+        with self._dirty_lock:
+            dirty = (self.full_redraw, self.dirty_regions, self.dirty_rects)
+            self.full_redraw = False
+            self.dirty_regions = set()
+            self.dirty_rects = []
+        return dirty
+
+    def _mark_event_dirty(self, event):
+        if not self.dirty_rendering: return
+        if event.type != pygame.MOUSEMOTION:
+            # คลิก / ปุ่มคีย์บอร์ด / scroll เกิดไม่บ่อยและเปลี่ยน state ได้ทุกส่วน
+            self.mark_all_dirty()
+            return
+        x, y = event.pos
+        px, py = x - event.rel[0], y - event.rel[1]
+        if self.is_promoting:
+            self.mark_all_dirty()
+        elif self.is_dragging and self.dragging_piece:
+            s = self.square_size
+            self.mark_dirty("board", (px - s // 2, py - s // 2, s, s), (x - s // 2, y - s // 2, s, s))
+        elif self.right_click_start or self.is_dragging_scrollbar:
+            self.mark_dirty("board" if self.right_click_start else "panel")
+        elif x >= self.panel_x or px >= self.panel_x:
+            # hover ของปุ่มใน panel
+            self.mark_dirty("panel")
+
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:
@@ -231,10 +335,8 @@ class Game:
                 piece = chess.Piece.from_symbol(self.edit_tool)
                 self.board_logic.set_piece_at(chess_sq, piece)
 
-            self.board_visual.load_from_fen(self.board_logic.board_fen())
-            self.move_history_san = []
-            self.move_history_obj = []
-            self.current_move_idx = 0
+            self.board_visual.sync_with(self.board_logic, squares=[chess_sq])
+            self.session.clear_history()
             self.check_game_status()
             self.analyze_board()
             return
@@ -251,8 +353,7 @@ class Game:
             self.selected_square = (r, c)
             self.valid_moves = []
             src = chess.square(c, 7 - r)
-            for m in self.board_logic.legal_moves:
-                if m.from_square == src: self.valid_moves.append(self._chess_sq_to_rowcol(m.to_square))
+            self.valid_moves = [self._chess_sq_to_rowcol(sq) for sq in self.session.legal_targets(src)]
         elif (r, c) in self.valid_moves:
             self._execute_move(r, c)
         else:
@@ -278,17 +379,18 @@ class Game:
     def _execute_move(self, r, c):
         start = self.selected_square
         if start is None: return
-        p = self.board_visual.get_piece(*start)
-        if p and p.kind == "pawn" and ((p.color == "white" and r == 0) or (p.color == "black" and r == 7)):
+        src = chess.square(start[1], 7 - start[0])
+        dst = chess.square(c, 7 - r)
+        index = self.session.legal_index
+        if index.is_promotion(src, dst):
+            color = "white" if self.board_logic.turn == chess.WHITE else "black"
             self.is_promoting = True;
-            self.promotion_data = {"from": start, "to": (r, c), "color": p.color}
+            self.promotion_data = {"from": start, "to": (r, c), "color": color}
             self.selected_square = None;
             self.valid_moves = [];
             return
-        src = self.rowcol_to_uci(*start);
-        dst = self.rowcol_to_uci(r, c)
-        move = chess.Move.from_uci(src + dst)
-        if move in self.board_logic.legal_moves: self.process_move(move, animate=True)
+        move = index.find(src, dst)
+        if move: self.process_move(move, animate=True)
         self.selected_square = None;
         self.valid_moves = []
 
@@ -302,11 +404,7 @@ class Game:
         if not is_replay:
             self.user_arrows = [];
             self.user_highlights = []
-            san = self.board_logic.san(move)
-            self.board_logic.push(move)
-            self.move_history_san.append(san)
-            self.move_history_obj.append(move)
-            self.current_move_idx = len(self.move_history_obj)
+            self.session.push(move)
             self.pgn_scroll_y = 999999
 
         self.turn_color = "black" if self.board_logic.turn == chess.BLACK else "white"
@@ -327,50 +425,47 @@ class Game:
             self._on_move_complete()
 
     def _visual_move(self, piece, sr, sc, dr, dc, move, is_ep=False):
+        touched = [(sr, sc), (dr, dc)]
         if piece.kind == "king" and abs(sc - dc) == 2:
             is_kingside = (dc == 6)
             rk_src = 7 if is_kingside else 0
             rk_dst = 5 if is_kingside else 3
             self.board_visual.move_piece(sr, sc, dr, dc)
             self.board_visual.move_piece(sr, rk_src, sr, rk_dst)
+            touched += [(sr, rk_src), (sr, rk_dst)]
         elif is_ep:
             self.board_visual.move_piece(sr, sc, dr, dc)
             self.board_visual.remove_piece(sr, dc)
+            touched.append((sr, dc))
         elif move.promotion:
             self.board_visual.move_piece(sr, sc, dr, dc)
-            self.board_visual.load_from_fen(self.board_logic.board_fen())
+            self.board_visual.sync_with(self.board_logic, squares=[move.to_square])
         else:
             self.board_visual.move_piece(sr, sc, dr, dc)
+        self.mark_squares_dirty(touched)
+        self.mark_dirty("panel", "eval")
 
     def undo_move(self):
         if self.current_move_idx <= 0 or self.edit_mode: return
         self.animation = None
         steps = 2 if self.engine_enabled and len(self.move_history_obj) >= 2 else 1
-        target_idx = max(0, self.current_move_idx - steps)
-        self.move_history_obj = self.move_history_obj[:target_idx]
-        self.move_history_san = self.move_history_san[:target_idx]
-        self.current_move_idx = target_idx
+        self.session.truncate(self.current_move_idx - steps)
         self._hard_reset_board()
 
     def jump_to_move(self, target_idx):
         if getattr(self, 'animation', None) or getattr(self, 'edit_mode', False): return
-        target_idx = max(0, min(target_idx, len(self.move_history_obj)))
-        self.current_move_idx = target_idx
-        self._hard_reset_board()
-
-    def _hard_reset_board(self):
-        # [FIXED] โหลดกระดานจากภาพจำเริ่มต้น ไม่ใช่ล้างกระดานทิ้งทั้งหมด
-        self.board_logic = chess.Board(self.start_fen)
-        for i in range(self.current_move_idx):
-            self.board_logic.push(self.move_history_obj[i])
-        self.board_visual.load_from_fen(self.board_logic.board_fen())
+        self._hard_reset_board(target_idx)
+
+    def _hard_reset_board(self, target_idx=None):
+        self._stop_pondering()
+        # ใช้ snapshot ใน PositionHistory แทนการ replay ตั้งแต่ start_fen ทุกครั้ง
+        prev_board = self.board_logic.copy(stack=False)
+        self.session.seek(self.current_move_idx if target_idx is None else target_idx)
+        self.board_visual.sync_with(self.board_logic, prev_board)
         self.turn_color = "white" if self.board_logic.turn == chess.WHITE else "black"
-        self.game_over = False
-        self.game_result_msg = ""
         self.selected_square = None
         self.valid_moves = []
         self.user_arrows = []
-        self.in_check = False
         self.checked_king_pos = None
         if self.current_move_idx == 0: self.engine_locked = False
         self.check_game_status()
@@ -378,6 +473,7 @@ class Game:
 
     def update_shake(self):
         if self.shake_timer > 0:
+            if self.shake_pos: self.mark_squares_dirty([self.shake_pos], pad=8)
             self.shake_timer -= 1
             offset = math.sin(self.shake_timer * 1.5) * 4
             self.shake_offset = (offset, 0)
@@ -393,6 +489,9 @@ class Game:
             ex, ey = self.animation["end_pos"]
             cur_x = sx + (ex - sx) * progress
             cur_y = sy + (ey - sy) * progress
+            s = self.square_size
+            old_x, old_y = self.animation["current_pos"]
+            self.mark_dirty((old_x - 1, old_y - 1, s + 2, s + 2), (cur_x - 1, cur_y - 1, s + 2, s + 2))
             self.animation["current_pos"] = (cur_x, cur_y)
             if t >= 1.0:
                 self.animation = None
@@ -405,85 +504,91 @@ class Game:
         self.trigger_engine_move()
 
     def check_game_status(self):
+        if self.checked_king_pos: self.mark_squares_dirty([self.checked_king_pos], pad=12)
+        self.mark_dirty("panel")
+        self.session.check_status()
         if self.get_board_error() != "":
-            self.in_check = False
-            self.game_over = False
             self.checked_king_pos = None
             return
 
-        self.in_check = self.board_logic.is_check()
-
-        try:
-            if self.board_logic.is_checkmate():
-                self.game_over = True
-                w = "Black" if self.board_logic.turn == chess.WHITE else "White"
-                self.game_result_msg = f"Checkmate! {w} wins."
-            elif self.board_logic.is_stalemate():
-                self.game_over = True;
-                self.game_result_msg = "Draw (Stalemate)"
-            elif self.board_logic.can_claim_threefold_repetition():
-                self.game_over = True;
-                self.game_result_msg = "Draw (Repetition)"
-        except Exception:
-            pass
-
         self.checked_king_pos = self.get_king_pos() if self.in_check else None
+        if self.checked_king_pos: self.mark_squares_dirty([self.checked_king_pos], pad=12)
         if self.in_check: self.shake_pos = self.checked_king_pos; self.shake_timer = 25
 
     def analyze_board(self):
-        if not getattr(self, 'show_eval', False) or self.edit_mode: return
+        if not getattr(self, 'show_eval', False) or self.edit_mode:
+            self._analysis_fen = None
+            self.analysis_worker.cancel()
+            return
 
         if self.get_board_error() != "":
+            self._analysis_fen = None
+            self.analysis_worker.cancel()
             self.eval_cp = None
             self.eval_mate = None
+            self.eval_depth = None
+            self.eval_tablebase = False
             self.best_move_text = "Fantasy Check"
             return
 
-        def task():
-            try:
-                current_fen = self.board_logic.fen()
-                temp_board = chess.Board(current_fen)
-                info = self.analysis_engine.analyse_position(temp_board)
-                if info:
-                    self.eval_cp = info.get("cp")
-                    self.eval_mate = info.get("mate")
-                    if "pv" in info and len(info["pv"]) > 0:
-                        best_move = info["pv"][0]
-                        self.best_move_text = temp_board.san(best_move)
-                    else:
-                        self.best_move_text = ""
-            except Exception as e:
-                pass
+        # ส่งให้ worker ตัวเดียว ตำแหน่งเก่าที่ยังค้างอยู่จะถูกยกเลิกอัตโนมัติ
+        # ผลจะทยอยมาทีละ depth (streaming) จนกว่าตำแหน่งจะเปลี่ยน
+        self._analysis_fen = self.board_logic.fen()
+        self.analysis_worker.submit(self.board_logic)
 
-        threading.Thread(target=task, daemon=True).start()
+    def _on_analysis_result(self, fen, info):
+        # เรียกจาก thread ของ AnalysisWorker: ใช้ผลเฉพาะเมื่อยังเป็นตำแหน่งเดียวกับที่กระดานแสดงอยู่
+        if fen != self._analysis_fen: return
+        try:
+            best_move = info["pv"][0] if info.get("pv") else None
+            best_text = chess.Board(fen).san(best_move) if best_move else ""
+        except Exception:
+            best_text = ""
+        self.eval_cp = info.get("cp")
+        self.eval_mate = info.get("mate")
+        self.eval_depth = info.get("depth")
+        self.eval_tablebase = info.get("tablebase", False)
+        self.best_move_text = best_text
+        self.mark_dirty("eval", "panel")
 
     def trigger_engine_move(self):
         if getattr(self, 'animation', None) or getattr(self, 'edit_mode', False): return
-        if self.get_board_error() != "": return
-        if self.current_move_idx < len(self.move_history_obj): return
-        if getattr(self, 'engine_enabled', False) and not self.game_over and self.board_logic.turn == getattr(self,
-                                                                                                              'engine_color',
-                                                                                                              chess.BLACK):
+        if not self.session.can_move(): return
+        if getattr(self, 'engine_enabled', False) and self.board_logic.turn == getattr(self, 'engine_color', chess.BLACK):
             self.make_engine_move()
 
+    def _stop_pondering(self):
+        # ตำแหน่งที่ AI คิดล่วงหน้าไว้จะไม่เกิดขึ้นแล้ว (Undo/ย้อนประวัติ/เกมใหม่/ปิดบอท): ปล่อย CPU คืน
+        stop = getattr(self.engine, "stop_pondering", None)
+        if stop: stop()
+
     def make_engine_move(self):
+        # ส่งสำเนาให้ thread เพราะ board_logic ถูก push/pop ในที่เดิมตอนเลื่อนดูประวัติ
+        board = self.board_logic.copy()
+
         def task():
             # Polymorphism: เรียก choose_move() โดยไม่สนว่า engine เป็น EngineClient หรือ BasePlayer อื่น
-            m = self.engine.choose_move(self.board_logic)
-            if m: pygame.event.post(pygame.event.Event(pygame.USEREVENT, {'engine_move': m}))
+            m = self.engine.choose_move(board)
+            self._post_engine_move(m, board)
 
         threading.Thread(target=task, daemon=True).start()
 
+    def _post_engine_move(self, move, board):
+        # ติดป้าย FEN ของตำแหน่งที่ AI คิดไว้ คำตอบที่มาถึงหลัง Undo/ย้อนประวัติ/เกมใหม่ จะถูกทิ้งใน _apply_engine_move
+        if move: pygame.event.post(pygame.event.Event(pygame.USEREVENT, {'engine_move': move, 'fen': board.fen()}))
+
+    def _apply_engine_move(self, event):
+        move = event.engine_move
+        if getattr(event, 'fen', None) != self.board_logic.fen(): return
+        if not self.session.can_move() or not self.board_logic.is_legal(move): return
+        self.process_move(move, animate=True)
+
     # [FIXED] ให้ Copy PGN แล้วติดโครงสร้างกระดาน Custom ไปด้วย
     def copy_pgn(self):
         try:
-            game_pgn = chess.pgn.Game()
-            if self.start_fen != chess.STARTING_FEN:
-                game_pgn.setup(chess.Board(self.start_fen))
-            node = game_pgn
-            for move in self.move_history_obj:
-                node = node.add_variation(move)
-            pyperclip.copy(str(game_pgn))
+            # import ตอนใช้ครั้งแรก: ไม่ต้องจ่ายเวลาโหลดตอนเปิดโปรแกรม
+            import pyperclip
+            pyperclip.copy(self.session.pgn())
         except:
             pass
 
@@ -529,6 +634,7 @@ class Game:
             if not self.edit_mode:
                 self.engine_enabled = not self.engine_enabled
                 if self.engine_enabled: self.trigger_engine_move()
+                else: self._stop_pondering()
 
         if b.get("review_toggle") and b["review_toggle"].collidepoint(x, y):
             if not self.edit_mode:
@@ -544,7 +650,7 @@ class Game:
 
             if b.get("clear_board") and b["clear_board"].collidepoint(x, y):
                 self.board_logic.clear()
-                self.board_visual.load_from_fen(self.board_logic.board_fen())
+                self.board_visual.sync_with(self.board_logic)
                 self.check_game_status()
 
             if b.get("start_pos") and b["start_pos"].collidepoint(x, y):
@@ -561,12 +667,13 @@ class Game:
             if b.get("edit_toggle_done") and b["edit_toggle_done"].collidepoint(x, y):
                 self._update_castling_rights()
                 self.edit_mode = False
-                self.start_fen = self.board_logic.fen()  # บันทึก Snapshot!
+                self.session.set_start_position()  # บันทึก Snapshot!
                 self.check_game_status()
                 self.analyze_board()
             return
 
         if b.get("edit_toggle_main") and b["edit_toggle_main"].collidepoint(x, y):
+            self._stop_pondering()
             self.edit_mode = True
             self.engine_enabled = False
             self.show_eval = False
@@ -587,7 +694,7 @@ class Game:
         if b.get("flip") and b["flip"].collidepoint(x, y): self.board_flipped = not self.board_flipped
         if b.get("undo") and b["undo"].collidepoint(x, y): self.undo_move()
         if b.get("resign") and b["resign"].collidepoint(x, y):
-            if not getattr(self, 'game_over', False): self.game_over = True; self.game_result_msg = "Resigned."
+            self.session.resign()
 
         if b.get("prev") and b["prev"].collidepoint(x, y): self.jump_to_move(self.current_move_idx - 1)
         if b.get("next") and b["next"].collidepoint(x, y): self.jump_to_move(self.current_move_idx + 1)
@@ -622,11 +729,11 @@ class Game:
             for name, rect in self.promotion_data["rects"].items():
                 if rect.collidepoint(pos):
                     d = self.promotion_data
-                    src = self.rowcol_to_uci(*d["from"])
-                    dst = self.rowcol_to_uci(*d["to"])
-                    char = {"queen": "q", "rook": "r", "bishop": "b", "knight": "n"}[name]
-                    move = chess.Move.from_uci(f"{src}{dst}{char}")
-                    if move in self.board_logic.legal_moves: self.process_move(move, animate=True)
+                    src = chess.square(d["from"][1], 7 - d["from"][0])
+                    dst = chess.square(d["to"][1], 7 - d["to"][0])
+                    kind = {"queen": chess.QUEEN, "rook": chess.ROOK, "bishop": chess.BISHOP, "knight": chess.KNIGHT}[name]
+                    move = self.session.legal_index.find(src, dst, kind)
+                    if move: self.process_move(move, animate=True)
                     self.is_promoting = False
                     self.promotion_data = {}
                     clicked_on_piece = True
@@ -0,0 +1,223 @@
+import chess
+
+from history import PositionHistory
+
+# ตำแหน่งเดิมจะเกิดครั้งที่ 3 ได้เร็วที่สุดหลังเดินแบบย้อนกลับได้ (ไม่กิน/ไม่เดินเบี้ย) ติดกัน 8 ply
+# ถ้า halfmove clock ยังน้อยกว่านี้ ข้าม can_claim_threefold_repetition (ซึ่งลองเดินทุกตาที่ถูกกติกา) ได้เลย
+REPETITION_MIN_PLIES = 8
+
+
+# ==========================================
+# LegalMoveIndex - ตาที่ถูกกติกาของตำแหน่งหนึ่ง จัดกลุ่มตามช่องต้นทาง
+# ==========================================
+# สร้างครั้งเดียวต่อตำแหน่ง (ไล่ board.legal_moves รอบเดียว) แล้วการคลิก/ลาก/เลือกโปรโมท และจุดแนะนำบนกระดาน
+# ถามจาก dict แทนการสร้างตาเดินใหม่ทั้งกระดานทุก event
+# by_from[from_square][to_square] = [Move, ...] ตาโปรโมททั้ง 4 แบบอยู่ในลิสต์ของช่องปลายทางเดียวกัน
+class LegalMoveIndex:
+    __slots__ = ("by_from", "count", "_enemy", "_pawns", "_ep_square")
+
+    def __init__(self, board):
+        by_from = self.by_from = {}
+        self.count = 0
+        for move in board.legal_moves:
+            targets = by_from.get(move.from_square)
+            if targets is None: targets = by_from[move.from_square] = {}
+            moves = targets.get(move.to_square)
+            if moves is None: targets[move.to_square] = [move]
+            else: moves.append(move)
+            self.count += 1
+        # ข้อมูลสำหรับ is_capture (ตรวจตอนถาม ไม่ต้องเสียเวลาตอนสร้าง)
+        self._enemy = board.occupied_co[not board.turn]
+        self._pawns = board.pawns & board.occupied_co[board.turn]
+        self._ep_square = board.ep_square
+
+    def targets(self, from_square):
+        """ช่องปลายทางที่หมากบน from_square เดินไปได้"""
+        return list(self.by_from.get(from_square, ()))
+
+    def moves(self, from_square, to_square):
+        """ตาเดินทั้งหมดจาก from_square ไป to_square (มากกว่า 1 ตาเฉพาะการโปรโมท)"""
+        return self.by_from.get(from_square, {}).get(to_square, [])
+
+    def find(self, from_square, to_square, promotion=None):
+        """ตาเดินที่ถูกกติกาจาก from_square ไป to_square (promotion = ชนิดหมากที่โปรโมท) ไม่มีคืน None"""
+        for move in self.moves(from_square, to_square):
+            if move.promotion == promotion: return move
+        return None
+
+    def is_promotion(self, from_square, to_square):
+        moves = self.moves(from_square, to_square)
+        return bool(moves) and moves[0].promotion is not None
+
+    def is_capture(self, from_square, to_square):
+        # รวม en passant ที่ช่องปลายทางไม่มีหมากอยู่
+        if to_square not in self.by_from.get(from_square, ()): return False
+        if self._enemy & chess.BB_SQUARES[to_square]: return True
+        return to_square == self._ep_square and bool(self._pawns & chess.BB_SQUARES[from_square])
+
+    def __contains__(self, move):
+        return move in self.moves(move.from_square, move.to_square)
+
+    def __len__(self):
+        return self.count
+
+
+# ==========================================
+# GameSession - สถานะกติกาของหนึ่งเกม (ไม่ใช้ pygame)
+# ==========================================
+# Encapsulation: กระดาน, ประวัติการเดิน, ตำแหน่งที่กำลังดู และผลเกม อยู่ในคลาสเดียว
+# Game (หน้าจอ pygame) ห่อคลาสนี้ไว้แล้วดูแลแค่ภาพ/อนิเมชัน/event
+# ส่วน server หรือ benchmark สร้าง GameSession หลายพันตัวใน process เดียวได้โดยไม่ต้องมีหน้าจอ
+class GameSession:
+    def __init__(self, fen=None):
+        self.board = chess.Board()
+        self.positions = PositionHistory()
+        self._legal_index = None
+        self.reset(fen)
+
+    def reset(self, fen=None):
+        """เริ่มเกมใหม่จาก fen (None = ตำแหน่งเริ่มต้น)"""
+        self.board = chess.Board(fen) if fen else chess.Board()
+        self.start_fen = self.board.fen()
+        self.positions.reset(self.start_fen, self.board)
+        self.move_history_san = []
+        self.move_history_obj = []
+        self.current_move_idx = 0
+        self.game_over = False
+        self.game_result_msg = ""
+        self.in_check = False
+        self.check_status()
+
+    def clear_history(self):
+        # ใช้ตอนแก้ไขกระดาน (Edit Mode): ตำแหน่งเปลี่ยนไปแล้ว ประวัติเดิมใช้ไม่ได้
+        self.move_history_san = []
+        self.move_history_obj = []
+        self.current_move_idx = 0
+
+    # ---------- สถานะ ----------
+    @property
+    def at_latest(self):
+        return self.current_move_idx == len(self.move_history_obj)
+
+    @property
+    def turn(self):
+        return self.board.turn
+
+    @property
+    def legal_index(self):
+        """LegalMoveIndex ของตำแหน่งปัจจุบัน (สร้างตอนถามครั้งแรกหลังกระดานเปลี่ยน)"""
+        if self._legal_index is None: self._legal_index = LegalMoveIndex(self.board)
+        return self._legal_index
+
+    def board_error(self):
+        wk = len(self.board.pieces(chess.KING, chess.WHITE))
+        bk = len(self.board.pieces(chess.KING, chess.BLACK))
+        if wk != 1 or bk != 1: return "Need exactly 1 King per side!"
+
+        p1 = self.board.pieces(chess.PAWN, chess.WHITE)
+        p2 = self.board.pieces(chess.PAWN, chess.BLACK)
+        if (p1 | p2) & (chess.BB_RANK_1 | chess.BB_RANK_8):
+            return "Pawns can't be on Rank 1 or 8!"
+
+        return ""
+
+    def check_status(self):
+        """อัปเดต in_check / game_over / game_result_msg ตามตำแหน่งปัจจุบัน"""
+        # ทุกทางที่กระดานเปลี่ยน (push, seek, reset, แก้ไขกระดานใน Edit Mode) ผ่านตรงนี้: index เดิมใช้ไม่ได้แล้ว
+        self._legal_index = None
+        if self.board_error() != "":
+            self.in_check = False
+            self.game_over = False
+            return
+
+        self.in_check = self.board.is_check()
+        try:
+            if self.board.is_checkmate():
+                self.game_over = True
+                w = "Black" if self.board.turn == chess.WHITE else "White"
+                self.game_result_msg = f"Checkmate! {w} wins."
+            elif self.board.is_stalemate():
+                self.game_over = True
+                self.game_result_msg = "Draw (Stalemate)"
+            elif (self.board.halfmove_clock >= REPETITION_MIN_PLIES - 1
+                  and self.board.can_claim_threefold_repetition()):
+                self.game_over = True
+                self.game_result_msg = "Draw (Repetition)"
+        except Exception:
+            pass
+
+    def can_move(self):
+        """เดินต่อได้หรือไม่ (ไม่จบเกม, กระดานถูกกติกา และอยู่ที่ตาล่าสุด ไม่ใช่กำลังดูประวัติ)"""
+        return not self.game_over and self.at_latest and self.board_error() == ""
+
+    def legal_targets(self, square):
+        """ช่องปลายทางที่หมากบน square เดินไปได้"""
+        return self.legal_index.targets(square)
+
+    # ---------- การเดิน ----------
+    def push(self, move):
+        """เดิน move ที่ตาล่าสุด คืน SAN (โยน ValueError ถ้าไม่ถูกกติกา)"""
+        if not self.board.is_legal(move): raise chess.IllegalMoveError(f"illegal move {move} in {self.board.fen()}")
+        san = self.board.san(move)
+        self.board.push(move)
+        self.positions.on_push(self.board)
+        self.move_history_san.append(san)
+        self.move_history_obj.append(move)
+        self.current_move_idx = len(self.move_history_obj)
+        self.check_status()
+        return san
+
+    def push_uci(self, uci):
+        return self.push(chess.Move.from_uci(uci))
+
+    def play_engine_move(self, engine, clock=None):
+        """ให้ผู้เล่น (BasePlayer) เดินที่ตำแหน่งปัจจุบันแบบ blocking คืนตาที่เดิน (None ถ้าไม่มี)"""
+        move = engine.choose_move(self.board.copy(), clock) if clock else engine.choose_move(self.board.copy())
+        if move is None or not self.can_move() or not self.board.is_legal(move): return None
+        self.push(move)
+        return move
+
+    def seek(self, target_idx):
+        """เลื่อนไปดูตำแหน่งหลังตาที่ target_idx (ไม่ลบประวัติ)"""
+        self.current_move_idx = max(0, min(target_idx, len(self.move_history_obj)))
+        self.board = self.positions.seek(self.board, self.move_history_obj, self.current_move_idx)
+        self.game_over = False
+        self.game_result_msg = ""
+        self.check_status()
+
+    def truncate(self, length):
+        """ลบประวัติหลังตาที่ length (ยังไม่ย้ายกระดาน เรียก seek ต่อ)"""
+        length = max(0, length)
+        self.move_history_obj = self.move_history_obj[:length]
+        self.move_history_san = self.move_history_san[:length]
+        self.positions.truncate(length)
+        self.current_move_idx = min(self.current_move_idx, length)
+
+    def undo(self, steps=1):
+        """ย้อน steps ตาจากตำแหน่งที่ดูอยู่ และลบประวัติหลังจากนั้น"""
+        target_idx = max(0, self.current_move_idx - steps)
+        self.truncate(target_idx)
+        self.seek(target_idx)
+
+    def resign(self):
+        if not self.game_over:
+            self.game_over = True
+            self.game_result_msg = "Resigned."
+
+    def set_start_position(self):
+        # จบ Edit Mode: ตำแหน่งบนกระดานตอนนี้กลายเป็นจุดเริ่มต้นใหม่ของเกม
+        self.start_fen = self.board.fen()
+        self.board = chess.Board(self.start_fen)
+        self.positions.reset(self.start_fen, self.board)
+        self.clear_history()
+        self.check_status()
+
+    def pgn(self):
+        import chess.pgn
+        game = chess.pgn.Game()
+        if self.start_fen != chess.STARTING_FEN:
+            game.setup(chess.Board(self.start_fen))
+        node = game
+        for move in self.move_history_obj:
+            node = node.add_variation(move)
+        return str(game)
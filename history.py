@@ -0,0 +1,75 @@
+import chess
+
+CHECKPOINT_INTERVAL = 16
+
+
+# ==========================================
+# PositionHistory - คลังตำแหน่งสำหรับย้อน/เดินหน้าประวัติการเดิน
+# ==========================================
+# เก็บ snapshot ของกระดานทุกๆ CHECKPOINT_INTERVAL ตา และเลื่อนกระดานสดด้วย push/pop สำหรับการก้าวทีละตา
+# ทำให้ jump_to_move / undo_move ไปถึงตาไหนก็ได้โดย replay ไม่เกิน CHECKPOINT_INTERVAL ตา
+# snapshot เก็บ move stack ย้อนไปถึงตาที่กินหรือเดินเบี้ยล่าสุด (halfmove clock) ซึ่งพอสำหรับตรวจ Repetition
+# และทำให้การ copy ใช้เวลาจำกัด ไม่โตตามความยาวเกม
+class PositionHistory:
+    def __init__(self, start_fen=chess.STARTING_FEN, checkpoint_interval=CHECKPOINT_INTERVAL):
+        self.checkpoint_interval = max(1, int(checkpoint_interval))
+        self.reset(start_fen)
+
+    def reset(self, start_fen, board=None):
+        """เริ่มประวัติใหม่จาก start_fen (board = กระดานสดที่อยู่ตำแหน่งเริ่มต้น ถ้ามี)"""
+        self.start_fen = start_fen
+        self._checkpoints = {0: chess.Board(start_fen)}
+        self._live = board
+        self._live_idx = 0 if board is not None else None
+
+    def on_push(self, board):
+        """เรียกหลัง push() หนึ่งตาบนกระดานสด เพื่อเลื่อน index และเก็บ checkpoint"""
+        if board is not self._live or self._live_idx is None:
+            self._live = None
+            self._live_idx = None
+            return
+        self._live_idx += 1
+        self._store_checkpoint(board, self._live_idx)
+
+    def truncate(self, length):
+        """ทิ้ง checkpoint ที่อยู่เกินความยาวประวัติใหม่ (เช่นหลัง Undo)"""
+        for idx in [k for k in self._checkpoints if k > length]:
+            del self._checkpoints[idx]
+
+    def seek(self, board, moves, target_idx):
+        """คืนกระดานที่ตำแหน่ง target_idx ของ moves
+
+        ถ้า board คือกระดานสดและอยู่ใกล้เป้าหมาย จะ push/pop บนกระดานเดิม
+        ไม่เช่นนั้นจะ copy จาก checkpoint ที่ใกล้ที่สุดแล้ว replay ไม่เกิน checkpoint_interval ตา
+        """
+        if board is self._live and self._live_idx is not None:
+            delta = target_idx - self._live_idx
+            if 0 <= delta <= self.checkpoint_interval:
+                self._replay(board, moves, self._live_idx, target_idx)
+                return board
+            if -self.checkpoint_interval <= delta < 0 and len(board.move_stack) >= -delta:
+                for _ in range(-delta):
+                    board.pop()
+                self._live_idx = target_idx
+                return board
+
+        base_idx = max(k for k in self._checkpoints if k <= target_idx)
+        board = _snapshot(self._checkpoints[base_idx])
+        self._live = board
+        self._replay(board, moves, base_idx, target_idx)
+        return board
+
+    def _replay(self, board, moves, from_idx, to_idx):
+        for i in range(from_idx, to_idx):
+            board.push(moves[i])
+            self._store_checkpoint(board, i + 1)
+        self._live_idx = to_idx
+
+    def _store_checkpoint(self, board, idx):
+        if idx % self.checkpoint_interval == 0 and idx not in self._checkpoints:
+            self._checkpoints[idx] = _snapshot(board)
+
+
+def _snapshot(board):
+    # ตำแหน่งก่อนตาที่กิน/เดินเบี้ยซ้ำไม่ได้อีก จึงไม่ต้อง copy move stack ส่วนนั้น
+    return board.copy(stack=board.halfmove_clock)
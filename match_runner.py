@@ -0,0 +1,220 @@
+"""Match Runner: ให้ EngineClient แข่งกันเองแบบ headless (ไม่ใช้ pygame) เพื่อตรวจว่าระดับ ELO แต่ละขั้นต่างกันจริง
+
+    python match_runner.py --games 200 --workers 16
+    python match_runner.py --levels 1200 1500 1800 --anchor 1500 --think-time 0.1 -o calibration.json
+
+- แต่ละคู่ (ค่าเริ่มต้น: ระดับที่ติดกันใน ELO dropdown) เล่น --games เกม สลับสีทุกคู่ของเปิดเกมที่สุ่มไว้
+- กระจายเกมไปหลาย process (ProcessPoolExecutor) แต่ละ process มี Engine ของตัวเองแบบ Threads=1
+- รายงาน W/D/L, คะแนน, ส่วนต่าง ELO ที่วัดได้ ± ช่วงความเชื่อมั่น 95% และ throughput (games/hour)
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import util as mp_util
+
+import chess
+
+from engine_client import EngineClient
+
+DEFAULT_LEVELS = [300, 600, 900, 1200, 1500, 1800, 2100, 2400, 2700, 3000]  # เท่ากับ ELO dropdown ใน Game
+MATCH_THINK_TIME = 0.05
+MAX_PLIES = 300          # เกมที่ยาวเกินนี้นับเป็นเสมอ
+OPENING_PLIES = 4        # สุ่มตาเปิดเกมเพื่อไม่ให้ทุกเกมเหมือนกัน
+ENGINE_OPTIONS = {"Threads": 1, "Hash": 16}
+Z_95 = 1.96
+
+
+# ==========================================
+# ส่วนที่ทำงานใน process ลูก
+# ==========================================
+_engines = {}
+
+
+def _close_engines():
+    for engine in _engines.values(): engine.close()
+    _engines.clear()
+
+
+def _worker_init():
+    # ปิด Engine ก่อน process ลูกรอ thread ที่ไม่ใช่ daemon (atexit ไม่ถูกเรียกใน process ของ multiprocessing)
+    mp_util.Finalize(None, _close_engines, exitpriority=10)
+
+
+def _engine(engine_path, elo, think_time):
+    # Engine หนึ่งตัวต่อระดับ ELO ต่อ process ใช้ซ้ำข้ามเกม (ไม่ต้อง popen ใหม่ทุกเกม)
+    key = (engine_path, elo)
+    if key not in _engines:
+        _engines[key] = EngineClient(engine_path, elo=elo, think_time=think_time, options=ENGINE_OPTIONS)
+    engine = _engines[key]
+    engine.think_time = think_time
+    return engine
+
+
+def play_game(job):
+    """เล่นหนึ่งเกม คืนผลจากมุมมองของผู้เล่น A (1 = ชนะ, 0.5 = เสมอ, 0 = แพ้)"""
+    t0 = time.perf_counter()
+    white_elo, black_elo = (job["a"], job["b"]) if job["a_white"] else (job["b"], job["a"])
+    players = {
+        chess.WHITE: _engine(job["engine"], white_elo, job["think_time"]),
+        chess.BLACK: _engine(job["engine"], black_elo, job["think_time"]),
+    }
+
+    board = chess.Board()
+    for uci in job["opening"]: board.push_uci(uci)
+    while not board.is_game_over(claim_draw=True) and board.ply() < MAX_PLIES:
+        move = players[board.turn].choose_move(board)
+        if move is None or not board.is_legal(move): break  # Engine ตอบไม่ได้: ไม่นับผล
+        board.push(move)
+
+    outcome = board.outcome(claim_draw=True)
+    if outcome is None and board.ply() < MAX_PLIES:
+        score = None
+    elif outcome is None or outcome.winner is None:
+        score = 0.5
+    else:
+        score = 1.0 if (outcome.winner == chess.WHITE) == job["a_white"] else 0.0
+    return {"pair": job["pair"], "score": score, "plies": board.ply(), "seconds": time.perf_counter() - t0}
+
+
+# ==========================================
+# สถิติ
+# ==========================================
+def elo_from_score(score):
+    if score <= 0: return -math.inf
+    if score >= 1: return math.inf
+    return 400 * math.log10(score / (1 - score))
+
+
+def summarize(scores):
+    """W/D/L, คะแนนเฉลี่ย และส่วนต่าง ELO พร้อมช่วงความเชื่อมั่น 95% (normal approximation ของคะแนนต่อเกม)"""
+    n = len(scores)
+    wins, draws = scores.count(1.0), scores.count(0.5)
+    summary = {"games": n, "wins": wins, "draws": draws, "losses": n - wins - draws}
+    if not n: return summary
+    mean = sum(scores) / n
+    variance = sum((s - mean) ** 2 for s in scores) / n
+    margin = Z_95 * math.sqrt(variance / n)
+    summary.update({
+        "score": mean,
+        "elo_diff": elo_from_score(mean),
+        "elo_low": elo_from_score(max(0.0, mean - margin)),
+        "elo_high": elo_from_score(min(1.0, mean + margin)),
+    })
+    return summary
+
+
+def _fmt_elo(value):
+    return f"{value:+7.0f}" if math.isfinite(value) else ("   +inf" if value > 0 else "   -inf")
+
+
+def pairings(levels, anchor=None):
+    if anchor is not None:
+        return [(level, anchor) for level in levels if level != anchor]
+    return [(levels[i + 1], levels[i]) for i in range(len(levels) - 1)]
+
+
+def random_openings(count, plies, seed):
+    rng = random.Random(seed)
+    openings = []
+    while len(openings) < count:
+        board = chess.Board()
+        for _ in range(plies):
+            board.push(rng.choice(list(board.legal_moves)))
+        if not board.is_game_over(): openings.append([m.uci() for m in board.move_stack])
+    return openings
+
+
+def build_jobs(args):
+    jobs = []
+    openings = random_openings((args.games + 1) // 2, args.opening_plies, args.seed)
+    for a, b in pairings(args.levels, args.anchor):
+        for i in range(args.games):
+            jobs.append({
+                "pair": (a, b), "a": a, "b": b, "a_white": i % 2 == 0, "opening": openings[i // 2],
+                "engine": args.engine, "think_time": args.think_time,
+            })
+    return jobs
+
+
+def report(results, elapsed, args):
+    print()
+    print(f"{'A':>6} vs {'B':<6} {'games':>6} {'W':>5} {'D':>5} {'L':>5} {'score':>6}  {'Elo A-B':>7}  {'95% CI':>17}")
+    summaries = {}
+    for pair in pairings(args.levels, args.anchor):
+        s = summarize(results.get(pair, []))
+        summaries[pair] = s
+        if not s["games"]: continue
+        print(f"{pair[0]:>6} vs {pair[1]:<6} {s['games']:>6} {s['wins']:>5} {s['draws']:>5} {s['losses']:>5} "
+              f"{s['score']:6.1%}  {_fmt_elo(s['elo_diff'])}  [{_fmt_elo(s['elo_low'])}, {_fmt_elo(s['elo_high'])}]")
+
+    # ค่า ELO โดยประมาณของแต่ละระดับ: ยึดระดับต่ำสุด (หรือ anchor) ที่ค่าตั้งไว้ แล้วบวกส่วนต่างที่วัดได้
+    estimated = {}
+    if args.anchor is not None:
+        estimated[args.anchor] = args.anchor
+        for (a, b), s in summaries.items():
+            if s["games"]: estimated[a] = args.anchor + s["elo_diff"]
+    else:
+        estimated[args.levels[0]] = args.levels[0]
+        for (a, b), s in summaries.items():
+            if s["games"] and b in estimated: estimated[a] = estimated[b] + s["elo_diff"]
+    print()
+    print("Estimated strength (nominal -> measured):")
+    for level in args.levels:
+        if level in estimated:
+            value = estimated[level]
+            print(f"  {level:>5} -> {value:7.0f}" if math.isfinite(value) else f"  {level:>5} -> {value}")
+
+    total = sum(len(v) for v in results.values())
+    print(f"\n{total} games in {elapsed:.1f} s = {total / elapsed * 3600:.0f} games/hour on {args.workers} workers")
+    return summaries, estimated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play engine-vs-engine matches between ELO levels.")
+    parser.add_argument("--levels", type=int, nargs="+", default=DEFAULT_LEVELS)
+    parser.add_argument("--anchor", type=int, help="play every level against this level instead of its neighbour")
+    parser.add_argument("--games", type=int, default=100, help="games per pairing")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parallel game processes")
+    parser.add_argument("--think-time", type=float, default=MATCH_THINK_TIME, help="seconds per move")
+    parser.add_argument("--opening-plies", type=int, default=OPENING_PLIES)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--engine", help="path to a UCI engine (default: bundled Stockfish)")
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    args = parser.parse_args(argv)
+    args.levels = sorted(set(args.levels))
+
+    jobs = build_jobs(args)
+    results = {}
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_worker_init) as executor:
+        futures = [executor.submit(play_game, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                game = future.result()
+            except Exception as e:
+                print(f"Warning: game failed: {e}", file=sys.stderr)
+                continue
+            if game["score"] is not None: results.setdefault(game["pair"], []).append(game["score"])
+            if done % 50 == 0 or done == len(jobs):
+                elapsed = time.perf_counter() - t0
+                print(f"{done}/{len(jobs)} games, {done / elapsed * 3600:.0f} games/hour", file=sys.stderr)
+    elapsed = time.perf_counter() - t0
+
+    summaries, estimated = report(results, elapsed, args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "pairs": [{"a": a, "b": b, **s} for (a, b), s in summaries.items()],
+                "estimated": {str(k): v for k, v in estimated.items()},
+                "games_per_hour": sum(len(v) for v in results.values()) / elapsed * 3600,
+                "think_time": args.think_time, "workers": args.workers,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
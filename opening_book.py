@@ -0,0 +1,78 @@
+import os
+import random
+import threading
+
+import chess
+import chess.polyglot
+
+BOOK_MAX_PLY = 40         # ไม่เปิดหนังสือหลังตานี้ แม้ไฟล์จะมีตำแหน่งลึกกว่า
+BOOK_MIN_WEIGHT = 0.02    # ตัดตาเดินที่น้ำหนักต่ำกว่าสัดส่วนนี้ของตาที่ดีที่สุดทิ้ง (ตาเดินแปลกๆ ในหนังสือ)
+
+
+# ==========================================
+# OpeningBook - หนังสือเปิดเกมแบบ Polyglot (.bin) ที่อยู่หน้า Engine
+# ==========================================
+# - choose(): เลือกตาเปิดเกมทันทีโดยไม่ต้องให้ Engine คิด เลือกตาม ELO
+#   ELO ต่ำ: ออกจากหนังสือเร็ว และสุ่มแบบเกลี่ยน้ำหนัก (เล่นตาหลากหลาย/ตารองบ่อยขึ้น)
+#   ELO สูง: อยู่ในหนังสือนานขึ้น และเลือกตามน้ำหนักแบบเน้นตาหลัก
+# - is_book_move(): ใช้ใน GameReviewer เพื่อข้ามการค้นหาตำแหน่งที่เป็นทฤษฎีเปิดเกม
+# ไม่มีไฟล์หนังสือ = ปิดการทำงานเงียบๆ (ทุกเมธอดคืนค่าว่าง)
+class OpeningBook:
+    def __init__(self, path, max_ply=BOOK_MAX_PLY, seed=None):
+        self.path = path
+        self.max_ply = max_ply
+        self._rng = random.Random(seed)
+        self._reader = None
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            try:
+                self._reader = chess.polyglot.open_reader(path)
+            except Exception as e:
+                print(f"Warning: Could not open opening book {path}: {e}")
+
+    @property
+    def enabled(self):
+        return self._reader is not None
+
+    def entries(self, board):
+        """ตาเดินในหนังสือของตำแหน่งนี้ [(move, weight), ...] เรียงจากน้ำหนักมากไปน้อย"""
+        if self._reader is None or board.ply() >= self.max_ply: return []
+        with self._lock:
+            try:
+                found = [(entry.move, entry.weight) for entry in self._reader.find_all(board)]
+            except Exception:
+                return []
+        # ป้องกันไฟล์หนังสือที่มีตาเดินผิดกติกา (เช่น hash ชนกัน)
+        return sorted(((m, w) for m, w in found if board.is_legal(m)), key=lambda e: -e[1])
+
+    def is_book_move(self, board, move):
+        return any(m == move for m, _ in self.entries(board))
+
+    def choose(self, board, elo=None):
+        """เลือกตาเดินจากหนังสือตามระดับ ELO (None = ออกจากหนังสือแล้ว ให้ Engine คิดต่อ)"""
+        if elo is not None and board.ply() >= self.book_depth(elo): return None
+        entries = self.entries(board)
+        if not entries: return None
+
+        top = entries[0][1] or 1
+        entries = [(m, w) for m, w in entries if w >= top * BOOK_MIN_WEIGHT] or entries[:1]
+        sharpness = self.sharpness(elo)
+        weights = [max(w, 1) ** sharpness for _, w in entries]
+        return self._rng.choices([m for m, _ in entries], weights=weights)[0]
+
+    def book_depth(self, elo):
+        # ELO 600 ~ 10 ply, 1500 ~ 19 ply, 2400+ ~ max_ply
+        return min(self.max_ply, 4 + int(elo) // 100)
+
+    @staticmethod
+    def sharpness(elo):
+        # เลขชี้กำลังของน้ำหนัก: < 1 เกลี่ยให้ตารองถูกเลือกบ่อยขึ้น, > 1 เน้นตาหลัก
+        if elo is None: return 1.0
+        return max(0.3, min(2.0, int(elo) / 1500))
+
+    def close(self):
+        with self._lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
@@ -4,6 +4,49 @@ import os
 DEFAULT_SQUARE_SIZE = 80
 ASSET_DIR = "assets/pieces"
 
+
+# ==========================================
+# Sprite Atlas - โหลดรูปหมากครั้งเดียวแล้วแชร์ให้ทุกตัว
+# ==========================================
+# รูปแต่ละ (color, kind) ถูก decode จากดิสก์ครั้งเดียว และแต่ละ (color, kind, size) ถูก scale ครั้งเดียว
+# หมากทุกตัวถือแค่ reference ไปยัง Surface ใน atlas นี้ ไม่ต้องโหลด PNG ใหม่ทุกครั้งที่สร้างกระดาน
+class SpriteAtlas:
+    _base_images = {}
+    _scaled_images = {}
+    disk_reads = 0
+
+    @classmethod
+    def get_base(cls, color: str, kind: str):
+        key = (color, kind)
+        image = cls._base_images.get(key)
+        if image is None:
+            image_path = os.path.join(ASSET_DIR, f"{color}_{kind}.png")
+            try:
+                cls.disk_reads += 1
+                image = pygame.image.load(image_path).convert_alpha()
+            except FileNotFoundError:
+                # Fallback if image missing
+                print(f"Warning: Image not found at {image_path}")
+                image = pygame.Surface((DEFAULT_SQUARE_SIZE, DEFAULT_SQUARE_SIZE))
+                image.fill((255, 0, 0))
+            cls._base_images[key] = image
+        return image
+
+    @classmethod
+    def get(cls, color: str, kind: str, square_size: int):
+        key = (color, kind, square_size)
+        image = cls._scaled_images.get(key)
+        if image is None:
+            image = pygame.transform.smoothscale(cls.get_base(color, kind), (square_size, square_size))
+            cls._scaled_images[key] = image
+        return image
+
+    @classmethod
+    def clear(cls):
+        cls._base_images.clear()
+        cls._scaled_images.clear()
+
+
 # ==========================================
 # Superclass (คลาสแม่) - Inheritance
 # ==========================================
@@ -15,14 +58,7 @@ class ChessPiece:
 
         # Auto-generate image path
         self.image_path = os.path.join(ASSET_DIR, f"{color}_{kind}.png")
-
-        try:
-            self.base_image = pygame.image.load(self.image_path).convert_alpha()
-        except FileNotFoundError:
-            # Fallback if image missing
-            print(f"Warning: Image not found at {self.image_path}")
-            self.base_image = pygame.Surface((square_size, square_size))
-            self.base_image.fill((255, 0, 0))
+        self.base_image = SpriteAtlas.get_base(color, kind)
 
         # Encapsulation: เก็บ state ภายใน (image, size) ไม่ให้ภายนอกแก้โดยตรง ใช้ set_size() แทน
         self.image = None
@@ -33,10 +69,7 @@ class ChessPiece:
         if self.size == square_size:
             return
         self.size = square_size
-        self.image = pygame.transform.smoothscale(
-            self.base_image,
-            (square_size, square_size)
-        )
+        self.image = SpriteAtlas.get(self.color, self.kind, square_size)
 
     # Polymorphism: เมธอด draw() ใช้ได้กับทุก subclass (Pawn, Rook, ...) โดยไม่ต้องรู้ชนิดหมาก
     def draw(self, screen, x, y):
@@ -71,4 +104,4 @@ class Queen(ChessPiece):
 
 class King(ChessPiece):
     def __init__(self, color, square_size):
-        super().__init__(color, "king", square_size)
\ No newline at end of file
+        super().__init__(color, "king", square_size)
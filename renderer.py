@@ -1,43 +1,132 @@
 import pygame
 import os
+import threading
 import chess
+from collections import OrderedDict
 from settings import *
 
+TEXT_CACHE_SIZE = 512
+
+
+# ==========================================
+# TextCache - เก็บ Surface ของข้อความที่ render แล้ว (LRU)
+# ==========================================
+# ข้อความส่วนใหญ่ในหน้าจอ (หัวข้อ, ปุ่ม, ตาเดินใน PGN) ไม่เปลี่ยนระหว่างเฟรม จึงไม่ต้อง rasterize ใหม่ 60 ครั้งต่อวินาที
+class TextCache:
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+
+# ฟอนต์ทั้งหมดของ UI: attribute -> (ชื่อ SysFont, ขนาด, ตัวหนา, ขนาดของฟอนต์ default ระหว่างรอ/เมื่อโหลดไม่ได้)
+FONT_SPECS = {
+    "font_ui": ("segoe ui", 15, False, 20),
+    "font_ui_bold": ("segoe ui", 15, True, 20),
+    "font_title": ("segoe ui", 26, True, 28),
+    "font_pgn": ("consolas", 14, False, 20),
+    "font_arrow": ("segoe ui symbol", 20, False, 24),
+    "font_mate": ("arial", 28, True, 32),
+    "font_icon": ("segoe ui symbol", 20, False, 22),
+    "font_piece_large": ("segoe ui symbol", 60, False, 60),
+    "font_score": ("segoe ui", 12, True, 18),
+    "font_piece_btn": ("segoe ui symbol", 32, False, 40),
+}
+
 
 class GameRenderer:
     def __init__(self, screen):
         self.screen = screen
         self.theme = THEME_DARK
         self.icons = {}
+        self.text_cache = TextCache()
+        self._hint_overlay = None
+        self._hint_key = None
+        self._marks_overlay = None
+        self._marks_key = None
+        self.fonts_ready = False
+        self.icons_ready = False
+        self._system_fonts = None
+        self._font_thread = None
+        self.frames_presented = 0
         self._init_fonts()
-        self._load_all_icons()
 
     def set_theme(self, is_dark):
         self.theme = THEME_DARK if is_dark else THEME_LIGHT
 
+    # ==========================================
+    # Staged startup: วาดเฟรมแรกด้วยฟอนต์ default ก่อน แล้วค่อยโหลดของที่ช้าตามมา
+    # ==========================================
+    # การหาไฟล์ฟอนต์ระบบต้องสแกนฟอนต์ทั้งเครื่องในครั้งแรก (ช้าหลายร้อย ms บางเครื่องเป็นวินาที) จึงทำใน background thread
+    # แต่สร้าง pygame.font.Font ใน main thread เท่านั้น: SDL_ttf/FreeType ใช้จากหลาย thread พร้อมกันไม่ได้
+    # ไอคอนต้อง convert_alpha() กับหน้าจอจริง จึงโหลดใน main thread หลังจากแสดงเฟรมแรกไปแล้ว
     def _init_fonts(self):
+        for attr, (_, size, _, fallback_size) in FONT_SPECS.items():
+            setattr(self, attr, pygame.font.Font(None, fallback_size))
+
+    def start_deferred_loading(self):
+        if self._font_thread is None:
+            self._font_thread = threading.Thread(target=self._load_system_fonts, name="font-loader", daemon=True)
+            self._font_thread.start()
+
+    def _load_system_fonts(self):
+        # background thread: หาแค่ path ของไฟล์ฟอนต์ (เหมือนที่ SysFont ทำ) ยังไม่สร้าง Font
         try:
-            self.font_ui = pygame.font.SysFont("segoe ui", 15)
-            self.font_ui_bold = pygame.font.SysFont("segoe ui", 15, bold=True)
-            self.font_title = pygame.font.SysFont("segoe ui", 26, bold=True)
-            self.font_pgn = pygame.font.SysFont("consolas", 14)
-            self.font_arrow = pygame.font.SysFont("segoe ui symbol", 20)
-            self.font_mate = pygame.font.SysFont("arial", 28, bold=True)
-            self.font_icon = pygame.font.SysFont("segoe ui symbol", 20)
-            self.font_piece_large = pygame.font.SysFont("segoe ui symbol", 60)
-            self.font_score = pygame.font.SysFont("segoe ui", 12, bold=True)
-            self.font_piece_btn = pygame.font.SysFont("segoe ui symbol", 32)
-        except:
-            self.font_ui = pygame.font.Font(None, 20)
-            self.font_ui_bold = pygame.font.Font(None, 20)
-            self.font_title = pygame.font.Font(None, 28)
-            self.font_pgn = pygame.font.Font(None, 20)
-            self.font_arrow = pygame.font.Font(None, 24)
-            self.font_mate = pygame.font.Font(None, 32)
-            self.font_icon = pygame.font.Font(None, 22)
-            self.font_piece_large = pygame.font.Font(None, 60)
-            self.font_score = pygame.font.Font(None, 18)
-            self.font_piece_btn = pygame.font.Font(None, 40)
+            paths = {}
+            for attr, (name, size, bold, _) in FONT_SPECS.items():
+                path = pygame.font.match_font(name, bold=bold)
+                # ไม่มีไฟล์ตัวหนาแยก: ทำตัวหนาเอง (SysFont ก็ทำแบบนี้)
+                fake_bold = bold and (path is None or path == pygame.font.match_font(name))
+                paths[attr] = (path, size, fake_bold)
+        except Exception as e:
+            print(f"Warning: Could not find system fonts: {e}")
+            paths = {}
+        self._system_fonts = paths
+
+    def _create_system_fonts(self, paths):
+        for attr, (path, size, fake_bold) in paths.items():
+            try:
+                font = pygame.font.Font(path, size)
+                if fake_bold: font.set_bold(True)
+                setattr(self, attr, font)
+            except Exception as e:
+                print(f"Warning: Could not load font {path}: {e}")
+
+    def poll_deferred(self):
+        """เรียกทุกเฟรมจาก main thread: ใส่ของที่โหลดเสร็จแล้ว คืน True ถ้าต้องวาดหน้าจอใหม่ทั้งหมด"""
+        changed = False
+        if not self.icons_ready and self.frames_presented > 0:
+            self._load_all_icons()
+            self.icons_ready = True
+            changed = True
+        if not self.fonts_ready and self._system_fonts is not None:
+            self._create_system_fonts(self._system_fonts)
+            self.fonts_ready = True
+            self._system_fonts = None
+            self.text_cache.clear()  # surface เก่าถูก render ด้วยฟอนต์ default
+            changed = True
+        return changed
 
     def _load_all_icons(self):
         def load(name, size):
@@ -53,8 +142,45 @@ class GameRenderer:
         self.icons['search'] = load("search.png", (24, 24))
 
     def draw_game(self, game):
+        if not game.dirty_rendering:
+            game.take_dirty()
+            self._draw_scene(game)
+            pygame.display.flip()
+            self.frames_presented += 1
+            return True
+
+        # Dirty-rect mode: วาดใหม่เฉพาะบริเวณที่เปลี่ยน และไม่ทำอะไรเลยถ้าไม่มีอะไรเปลี่ยน
+        rects = self._collect_dirty_rects(game, *game.take_dirty())
+        if not rects: return False
+        clip = rects[0].unionall(rects[1:])
+        self.screen.set_clip(clip)
+        self._draw_scene(game)
+        self.screen.set_clip(None)
+        pygame.display.update(rects)
+        self.frames_presented += 1
+        return True
+
+    def _collect_dirty_rects(self, game, full_redraw, regions, dirty_rects):
+        screen_rect = self.screen.get_rect()
+        if full_redraw: return [screen_rect]
+        rects = [self._region_rect(game, name) for name in regions]
+        rects.extend(dirty_rects)
+        return [r.clip(screen_rect) for r in rects if r.colliderect(screen_rect)]
+
+    def _region_rect(self, game, name):
+        bsize = game.square_size * 8
+        if name == "board":
+            return pygame.Rect(game.board_x, game.board_y, bsize, bsize).inflate(16, 16)
+        if name == "panel":
+            return pygame.Rect(game.panel_x, 0, game.panel_w, game.window_height)
+        if name == "eval":
+            return pygame.Rect(game.board_x - 60, game.board_y - 4, 50, bsize + 48)
+        return self.screen.get_rect()
+
+    def _draw_scene(self, game):
         self.screen.fill(self.theme["bg_main"])
-        game.board_visual.draw_squares(self.screen, game.board_x, game.board_y, game.board_flipped)
+        game.board_visual.draw_background(self.screen, game.board_x, game.board_y, self.font_pgn, game.board_flipped,
+                                          color=self.theme["text_main"], bg_color=self.theme["bg_main"])
 
         if game.in_check and game.checked_king_pos:
             self._draw_check_square(game)
@@ -82,16 +208,11 @@ class GameRenderer:
             self._draw_fallen_king(game)
             self._draw_checkmate_badge(game)
 
-        game.board_visual.draw_coordinates(self.screen, game.board_x, game.board_y, self.font_pgn, game.board_flipped,
-                                           color=self.theme["text_main"])
-
         self._draw_eval_bar_enhanced(game)
         self._draw_panel(game)
 
         if game.is_promoting: self._draw_promotion_popup(game)
 
-        pygame.display.flip()
-
     def _draw_eval_bar_enhanced(self, game):
         if not game.show_eval or game.edit_mode: return
         if game.eval_cp is None and game.eval_mate is None: return
@@ -119,10 +240,15 @@ class GameRenderer:
         else:
             score_text = f"{score / 100.0:+.1f}"
 
-        txt_surf = self.font_score.render(score_text, True, self.theme["text_main"])
+        txt_surf = self.text_cache.render(self.font_score, score_text, self.theme["text_main"])
         txt_rect = txt_surf.get_rect(midtop=(bx + bw // 2, by + bh + 5))
         self.screen.blit(txt_surf, txt_rect)
 
+        depth_text = "TB" if game.eval_tablebase else (f"d{game.eval_depth}" if game.eval_depth else "")
+        if depth_text:
+            d_surf = self.text_cache.render(self.font_score, depth_text, self.theme["text_light"])
+            self.screen.blit(d_surf, d_surf.get_rect(midtop=(bx + bw // 2, txt_rect.bottom + 1)))
+
     def _draw_panel(self, game):
         theme = self.theme
         rect = pygame.Rect(game.panel_x, 0, game.panel_w, game.window_height)
@@ -260,9 +386,15 @@ class GameRenderer:
             game.dropdown_data = None  # ล้างทิ้งกรณีปิดบอท
             y += 10
 
-        if game.show_eval and game.best_move_text:
+        engine_status = game.engine_status_text()
+        if engine_status:
+            self._draw_text(engine_status, x + 5, y - 25, self.font_ui_bold, theme["text_light"])
+        elif game.show_eval and game.best_move_text:
             txt_col = (20, 20, 20) if self.theme["name"] == "Light" else (255, 215, 0)
-            bst_surf = self.font_ui_bold.render(f"Best: {game.best_move_text}", True, txt_col)
+            best_text = f"Best: {game.best_move_text}"
+            if game.eval_tablebase: best_text += "  (tablebase)"
+            elif game.eval_depth: best_text += f"  (depth {game.eval_depth})"
+            bst_surf = self.text_cache.render(self.font_ui_bold, best_text, txt_col)
             self.screen.blit(bst_surf, (x + 5, y - 25))
 
         st_rect = pygame.Rect(x, y, cw, 42)
@@ -306,7 +438,7 @@ class GameRenderer:
         y += 55
 
         mh_text = "Move History (Click to Copy PGN)"
-        mh_surf = self.font_ui_bold.render(mh_text, True, theme["text_main"])
+        mh_surf = self.text_cache.render(self.font_ui_bold, mh_text, theme["text_main"])
         self.screen.blit(mh_surf, (x, y))
 
         click_rect = pygame.Rect(x, y, cw, 25)
@@ -351,7 +483,7 @@ class GameRenderer:
         game.pgn_scroll_y = max(0, min(game.pgn_scroll_y, game.max_scroll_y))
 
         old_clip = self.screen.get_clip()
-        self.screen.set_clip(content)
+        self.screen.set_clip(content.clip(old_clip))
         start_y = content.top - game.pgn_scroll_y
         game.pgn_click_zones = []
 
@@ -409,7 +541,7 @@ class GameRenderer:
         pygame.draw.circle(self.screen, (0, 0, 0, 80), (bx + 2, by + 2), 16)
         pygame.draw.circle(self.screen, self.theme["mate_badge"], (bx, by), 16)
         pygame.draw.circle(self.screen, (255, 255, 255), (bx, by), 16, 2)
-        txt = self.font_mate.render("#", True, (255, 255, 255))
+        txt = self.text_cache.render(self.font_mate, "#", (255, 255, 255))
         tr = txt.get_rect(center=(bx, by))
         self.screen.blit(txt, tr)
 
@@ -421,39 +553,66 @@ class GameRenderer:
         pygame.draw.rect(self.screen, col, (x, y, game.square_size, game.square_size))
 
     def _draw_highlights_layer(self, game):
-        if game.selected_square and not game.edit_mode:
-            s = game.square_size
-            overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-            for r, c in game.valid_moves:
-                x, y = game.board_visual.to_screen(r, c, game.board_x, game.board_y, game.board_flipped)
-                cx, cy = x + s // 2, y + s // 2
-                piece = game.board_visual.get_piece(r, c)
-                if piece:
-                    pygame.draw.circle(overlay, self.theme["capture_hint"], (cx, cy), s // 2 - 2, 6)
-                else:
-                    pygame.draw.circle(overlay, self.theme["move_hint"], (cx, cy), s // 6)
-            self.screen.blit(overlay, (0, 0))
-
-        overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-        for r, c in game.user_highlights:
-            x, y = game.board_visual.to_screen(r, c, game.board_x, game.board_y, game.board_flipped)
-            pygame.draw.rect(overlay, self.theme["highlight_green"], (x, y, game.square_size, game.square_size))
-
-        for start, end in game.user_arrows:
-            self._draw_arrow(overlay, game, start, end, self.theme["arrow_green"])
+        s = game.square_size
+        flipped = game.board_flipped
+        theme = self.theme["name"]
 
+        # Overlay มีขนาดเท่ากระดานเท่านั้น และวาดเนื้อหาใหม่เฉพาะเมื่อ state ที่เกี่ยวข้องเปลี่ยน
+        if game.selected_square and not game.edit_mode:
+            # จุดแนะนำ/วงกินหมากจาก legal index ของตำแหน่ง (นับ en passant เป็นการกินด้วย)
+            index = game.session.legal_index
+            sr, sc = game.selected_square
+            src = chess.square(sc, 7 - sr)
+            targets = tuple((r, c, index.is_capture(src, chess.square(c, 7 - r))) for r, c in game.valid_moves)
+            key = (s, flipped, theme, targets)
+            if key != self._hint_key:
+                self._hint_overlay = self._reset_overlay(self._hint_overlay, s * 8)
+                for r, c, is_capture in targets:
+                    x, y = game.board_visual.to_screen(r, c, 0, 0, flipped)
+                    cx, cy = x + s // 2, y + s // 2
+                    if is_capture:
+                        pygame.draw.circle(self._hint_overlay, self.theme["capture_hint"], (cx, cy), s // 2 - 2, 6)
+                    else:
+                        pygame.draw.circle(self._hint_overlay, self.theme["move_hint"], (cx, cy), s // 6)
+                self._hint_key = key
+            self.screen.blit(self._hint_overlay, (game.board_x, game.board_y))
+
+        preview = None
         if game.right_click_start:
             mx, my = pygame.mouse.get_pos()
             if game.board_x <= mx < game.board_x + game.square_size * 8 and game.board_y <= my < game.board_y + game.square_size * 8:
                 curr = game.screen_to_board(mx, my)
                 if curr != game.right_click_start:
-                    self._draw_arrow(overlay, game, game.right_click_start, curr, self.theme["arrow_green"])
-        self.screen.blit(overlay, (0, 0))
+                    preview = (game.right_click_start, curr)
+
+        if not game.user_highlights and not game.user_arrows and preview is None: return
+
+        key = (s, flipped, theme, tuple(game.user_highlights), tuple(game.user_arrows), preview)
+        if key != self._marks_key:
+            self._marks_overlay = self._reset_overlay(self._marks_overlay, s * 8)
+            for r, c in game.user_highlights:
+                x, y = game.board_visual.to_screen(r, c, 0, 0, flipped)
+                pygame.draw.rect(self._marks_overlay, self.theme["highlight_green"], (x, y, s, s))
+
+            for start, end in game.user_arrows:
+                self._draw_arrow(self._marks_overlay, game, start, end, self.theme["arrow_green"])
+
+            if preview:
+                self._draw_arrow(self._marks_overlay, game, preview[0], preview[1], self.theme["arrow_green"])
+            self._marks_key = key
+        self.screen.blit(self._marks_overlay, (game.board_x, game.board_y))
+
+    def _reset_overlay(self, overlay, size):
+        if overlay is None or overlay.get_size() != (size, size):
+            return pygame.Surface((size, size), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 0))
+        return overlay
 
     def _draw_arrow(self, surface, game, start, end, color):
+        # พิกัดบน overlay ขนาดกระดาน (มุมซ้ายบนของกระดาน = 0, 0)
         s = game.square_size
-        sx, sy = game.board_visual.to_screen(start[0], start[1], game.board_x, game.board_y, game.board_flipped)
-        ex, ey = game.board_visual.to_screen(end[0], end[1], game.board_x, game.board_y, game.board_flipped)
+        sx, sy = game.board_visual.to_screen(start[0], start[1], 0, 0, game.board_flipped)
+        ex, ey = game.board_visual.to_screen(end[0], end[1], 0, 0, game.board_flipped)
         start_vec = pygame.Vector2(sx + s / 2, sy + s / 2)
         end_vec = pygame.Vector2(ex + s / 2, ey + s / 2)
         arrow = end_vec - start_vec
@@ -534,11 +693,11 @@ class GameRenderer:
         return r
 
     def _draw_text(self, text, x, y, font, color):
-        s = font.render(text, True, color)
+        s = self.text_cache.render(font, text, color)
         self.screen.blit(s, (x, y))
 
     def _draw_text_centered(self, text, rect, font, color):
-        s = font.render(text, True, color)
+        s = self.text_cache.render(font, text, color)
         self.screen.blit(s, s.get_rect(center=rect.center))
 
     def _draw_icon_centered(self, name, center, color=None):
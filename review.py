@@ -1,39 +1,121 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import chess
+import chess.polyglot
+
+from engine_client import EngineClient
+from engine_scheduler import BATCH
+
+REVIEW_THINK_TIME = 0.05
+REVIEW_MULTIPV = 3
+MATE_SCORE = 2000
+REVIEW_ENGINE_OPTIONS = {"Threads": 1, "Hash": 16}  # Engine ต่อ process ใน pool: 1 thread ต่อ 1 core
+
 
 class GameReviewer:
-    def __init__(self, engine_client):
+    def __init__(self, engine_client, think_time=REVIEW_THINK_TIME, book=None):
         self.engine = engine_client
+        self.think_time = think_time
+        self.book = book  # OpeningBook (optional): ตาที่อยู่ในหนังสือเปิดเกมถูกจัดเป็น "book" โดยไม่ต้องค้นหา
 
-    def analyze_game(self, move_history):
+    def analyze_game(self, move_history, start_board=None):
         if not self.engine:
             return []
+        return self.analyze_games([move_history], [start_board])[0]
 
-        board = chess.Board()
-        results = []
+    def analyze_games(self, games, start_boards=None):
+        """รีวิวหลายเกมพร้อมกัน คืน list ผลการจำแนกตาเดินของแต่ละเกม (ลำดับเดียวกับ games)
 
-        # เริ่มต้นประเมินคะแนนจากกระดานว่าง
-        prev_eval = self._get_eval(board)
+        start_boards: กระดานเริ่มต้นของแต่ละเกม (None = ตำแหน่งเริ่มต้นปกติ) เช่นเกมจาก PGN ที่มี FEN header
+        """
+        if not self.engine:
+            return [[] for _ in games]
+        start_boards = start_boards or [None] * len(games)
 
-        for move in move_history:
-            # 1. หา Best Move ของ Engine ในตานั้นๆ
-            best_info = self.engine.analyse_position(board, think_time=0.05)
-            engine_best = best_info.get("best_move") if best_info else None
+        # 1. วิเคราะห์ทุกตำแหน่ง (ก่อนเดินตาแรก ... หลังเดินตาสุดท้าย) ตำแหน่งละครั้งเดียว
+        #    ผลของตำแหน่งก่อนเดินให้ทั้ง Best Move (MultiPV) และคะแนนที่ใช้คำนวณ Loss ของตาก่อนหน้า
+        #    ตำแหน่งก่อนตาที่เป็นทฤษฎีเปิดเกม (book) ไม่ต้องค้นหา: ตาเหล่านั้นไม่ต้องใช้ Best Move หรือ Loss
+        all_boards = [self._positions(start or chess.Board(), moves) for moves, start in zip(games, start_boards)]
+        book_lengths = [self._book_length(moves, boards) for moves, boards in zip(games, all_boards)]
+        flat = [board if i >= book_len else None
+                for boards, book_len in zip(all_boards, book_lengths) for i, board in enumerate(boards)]
+        flat_infos = self._analyse_many(flat)
 
-            # 2. จำลองการเดินหมาก
+        # 2. แบ่งผลกลับเป็นรายเกม แล้วจำแนกประเภทตาเดินจากผลชุดเดียวกัน ไม่ต้องค้นหาเพิ่ม
+        results, start = [], 0
+        for moves, boards, book_len in zip(games, all_boards, book_lengths):
+            infos = flat_infos[start:start + len(boards)]
+            start += len(boards)
+            results.append(self._classify(moves, boards, infos, book_len))
+        return results
+
+    def _book_length(self, moves, boards):
+        """จำนวนตาแรกของเกมที่อยู่ในหนังสือเปิดเกมติดต่อกัน"""
+        if self.book is None: return 0
+        for i, move in enumerate(moves):
+            if not self.book.is_book_move(boards[i], move): return i
+        return len(moves)
+
+    def _analyse_many(self, boards):
+        """วิเคราะห์ทุกตำแหน่งใน boards คืนผลตามลำดับเดิม (ตำแหน่งซ้ำกันค้นหาครั้งเดียว, None = ข้าม)"""
+        infos = [None] * len(boards)
+        for key, indices in self._unique_positions(boards).items():
+            info = self._analyse(boards[indices[0]])
+            for i in indices: infos[i] = info
+        return infos
+
+    def _unique_positions(self, boards):
+        # เกมในทัวร์นาเมนต์มักเปิดด้วยตำแหน่งเดียวกัน: รวมตำแหน่งซ้ำ (Zobrist) ให้ค้นหาแค่ครั้งเดียว
+        unique = {}
+        for i, board in enumerate(boards):
+            if board is None or board.is_game_over(): continue
+            unique.setdefault(chess.polyglot.zobrist_hash(board), []).append(i)
+        return unique
+
+    def _positions(self, start_board, move_history):
+        # เก็บ move stack ย้อนถึงตากิน/เดินเบี้ยล่าสุด ให้ Engine ยังเห็นการเดินซ้ำ (Repetition)
+        board = start_board.copy()
+        boards = [board.copy(stack=board.halfmove_clock)]
+        for move in move_history:
             board.push(move)
-            curr_eval = self._get_eval(board)
+            boards.append(board.copy(stack=board.halfmove_clock))
+        return boards
+
+    def _analyse(self, board, engine=None):
+        if board.is_game_over(): return None
+        engine = engine or self.engine
+        return engine.analyse_position(board, think_time=self.think_time, multipv=REVIEW_MULTIPV)
+
+    def _classify(self, move_history, boards, infos, book_len=0):
+        evals = [self._eval(board, info) for board, info in zip(boards, infos)]
+        results = []
+
+        for i, move in enumerate(move_history):
+            if i < book_len:
+                # ทฤษฎีเปิดเกม: คะแนนมีเฉพาะตาสุดท้ายของหนังสือ (ตำแหน่งถัดไปถูกวิเคราะห์แล้ว)
+                score = evals[i + 1] if i + 1 >= book_len else None
+                results.append({"move": move, "class": "book", "score": score, "best_move": None, "loss": 0})
+                continue
+
+            info = infos[i]
+            engine_best = info.get("best_move") if info else None
+            prev_eval, curr_eval = evals[i], evals[i + 1]
 
             # 3. คำนวณความเสียหาย (Loss) โดยเทียบกับคะแนนก่อนเดิน
             # คะแนนเป็นมุมมองของ White เสมอ
-            if board.turn == chess.BLACK:  # ตาที่ผ่านมาคือ White เดิน
+            if boards[i].turn == chess.WHITE:
                 diff = prev_eval - curr_eval
-            else:  # ตาที่ผ่านมาคือ Black เดิน
+            else:
                 diff = curr_eval - prev_eval
 
             # 4. จำแนกประเภทตาเดิน (Move Classification)
-            move_class = "book"
-            if move == engine_best:
+            gap = self._multipv_gap(info, move, boards[i].turn)
+            if move == engine_best or gap == 0:
                 move_class = "best"
+            elif gap is not None and gap <= 20:
+                move_class = "excellent"
             elif diff <= 20:
                 move_class = "excellent"
             elif diff <= 50:
@@ -48,21 +130,91 @@ class GameReviewer:
             results.append({
                 "move": move,
                 "class": move_class,
-                "score": curr_eval
+                "score": curr_eval,
+                "best_move": engine_best,
+                "loss": diff
             })
 
-            prev_eval = curr_eval
-
         return results
 
-    def _get_eval(self, board):
-        """Helper function เพื่อดึงคะแนน CP หรือ Mate"""
-        info = self.engine.analyse_position(board, think_time=0.05)
-        if not info: return 0
+    def _multipv_gap(self, info, move, turn):
+        """ระยะห่าง (centipawn) ระหว่างตาที่เดินกับตาที่ดีที่สุด ถ้าตานั้นอยู่ใน MultiPV lines"""
+        lines = info.get("lines", []) if info else []
+        if not lines: return None
+        sign = 1 if turn == chess.WHITE else -1
+        best = sign * self._line_score(lines[0])
+        for line in lines:
+            if line["move"] == move:
+                return best - sign * self._line_score(line)
+        return None
+
+    def _line_score(self, line):
+        if line.get("mate") is not None:
+            return MATE_SCORE if line["mate"] > 0 else -MATE_SCORE
+        return line.get("cp") or 0
+
+    def _eval(self, board, info):
+        """คะแนน CP (มุมมองฝั่งขาว) ของตำแหน่ง; ตำแหน่งจบเกมคำนวณเองโดยไม่ใช้ Engine"""
+        if board.is_checkmate():
+            return -MATE_SCORE if board.turn == chess.WHITE else MATE_SCORE
+        if info is None: return 0
 
         mate = info.get("mate")
         cp = info.get("cp")
 
         if mate is not None:
-            return 2000 if mate > 0 else -2000
-        return cp if cp is not None else 0
\ No newline at end of file
+            return MATE_SCORE if mate > 0 else -MATE_SCORE
+        return cp if cp is not None else 0
+
+
+# ==========================================
+# ParallelGameReviewer - รีวิวด้วย Engine หลาย process พร้อมกัน
+# ==========================================
+# Inheritance: ใช้ขั้นตอนของ GameReviewer ทั้งหมด (_positions, _classify) แต่ Override _analyse_many
+# ให้กระจายตำแหน่งไปยัง pool ของ EngineClient (ค่าเริ่มต้น = จำนวน CPU, Engine ละ 1 thread)
+# ผลกลับมาไม่เรียงลำดับ (as_completed) แล้วจัดกลับตาม index ของตำแหน่งก่อนจำแนกตาเดิน
+# scheduler: ใช้ Engine ร่วมกับงานอื่นผ่าน EngineScheduler เป็นงาน BATCH (AI ตอบตาเดิน/Eval Bar แย่ง Engine ได้)
+class ParallelGameReviewer(GameReviewer):
+    def __init__(self, engines=None, workers=None, engine_path=None, eval_cache=None, think_time=REVIEW_THINK_TIME,
+                 book=None, scheduler=None):
+        if scheduler is not None:
+            engines = [scheduler.player(BATCH, eval_cache=eval_cache)] * len(scheduler.engines)
+        if engines is None:
+            workers = workers or os.cpu_count() or 1
+            engines = [EngineClient(engine_path, elo=3000, think_time=think_time, eval_cache=eval_cache,
+                                    options=REVIEW_ENGINE_OPTIONS) for _ in range(workers)]
+            self._owns_engines = True
+        else:
+            self._owns_engines = False
+        super().__init__(engines[0] if engines else None, think_time, book)
+        self.engines = list(engines)
+
+        # Engine ว่างรอใน queue: thread ไหนได้งานก็หยิบ Engine ไปใช้แล้วคืน (1 Engine ต่อ 1 งานในเวลาเดียวกัน)
+        self._idle = queue.Queue()
+        for engine in self.engines: self._idle.put(engine)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.engines)), thread_name_prefix="review")
+
+    def _analyse_many(self, boards):
+        infos = [None] * len(boards)
+        futures = {self._executor.submit(self._analyse_pooled, boards[indices[0]]): indices
+                   for indices in self._unique_positions(boards).values()}
+        for future in as_completed(futures):
+            try:
+                info = future.result()
+            except Exception as e:
+                print(f"Warning: review analysis failed: {e}")
+                info = None
+            for i in futures[future]: infos[i] = info
+        return infos
+
+    def _analyse_pooled(self, board):
+        engine = self._idle.get()
+        try:
+            return self._analyse(board, engine)
+        finally:
+            self._idle.put(engine)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self._owns_engines:
+            for engine in self.engines: engine.close()
@@ -0,0 +1,111 @@
+"""Load test ของ training_server.py: จำลองนักเรียนหลายร้อยคนเล่นพร้อมกัน แล้ววัด latency ต่อตาเดิน
+
+    python training_server.py --engines 4 &
+    python server_load_test.py --clients 200 --moves 20 --think 1.0
+
+- นักเรียนแต่ละคน = การเชื่อมต่อ TCP หนึ่งเส้น + session หนึ่งเกม เดินตาสุ่มที่ถูกกติกาแล้วรอ AI ตอบ
+- --think คือเวลาที่นักเรียนใช้คิดก่อนเดินแต่ละตา (สุ่ม 0.5x-1.5x) 0 = ยิงคำสั่งต่อเนื่องเต็มที่
+- รายงาน latency ฝั่ง client (round trip) และ p50/p99 ที่ server วัดได้เอง
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import chess
+
+from training_server import DEFAULT_PORT, percentile
+
+ELO_LEVELS = [300, 600, 900, 1200, 1500, 1800, 2100, 2400, 2700, 3000]
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._next_id = 1
+
+    @classmethod
+    async def open(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, op, **fields):
+        request = {"id": self._next_id, "op": op, **fields}
+        self._next_id += 1
+        self.writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line: raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.writer.close()
+
+
+async def student(args, index, latencies, counters):
+    rng = random.Random(args.seed * 100003 + index)
+    conn = await Connection.open(args.host, args.port)
+    try:
+        state = await conn.request("new", elo=rng.choice(ELO_LEVELS), color=rng.choice(["white", "black"]))
+        session = state["session"]
+        for _ in range(args.moves):
+            if state.get("game_over"):
+                await conn.request("close", session=session)
+                state = await conn.request("new", elo=rng.choice(ELO_LEVELS))
+                session = state["session"]
+                counters["games"] += 1
+            if args.think: await asyncio.sleep(args.think * rng.uniform(0.5, 1.5))
+
+            move = rng.choice(list(chess.Board(state["fen"]).legal_moves))
+            t0 = time.perf_counter()
+            response = await conn.request("move", session=session, move=move.uci())
+            latencies.append(time.perf_counter() - t0)
+            if "error" in response:
+                counters["errors"] += 1
+                state = await conn.request("state", session=session)
+            else:
+                state = response
+                counters["moves"] += 1
+    finally:
+        conn.close()
+
+
+async def run(args):
+    latencies = []
+    counters = {"moves": 0, "games": 0, "errors": 0}
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(student(args, i, latencies, counters) for i in range(args.clients)),
+                                   return_exceptions=True)
+    elapsed = time.perf_counter() - t0
+    failed = [r for r in results if isinstance(r, Exception)]
+
+    conn = await Connection.open(args.host, args.port)
+    server = await conn.request("stats")
+    conn.close()
+
+    ms = [t * 1000 for t in latencies]
+    print(f"{args.clients} clients, {counters['moves']} moves, {counters['games']} extra games, "
+          f"{counters['errors']} move errors, {len(failed)} clients failed in {elapsed:.1f} s")
+    if failed: print(f"  first failure: {failed[0]!r}")
+    if ms:
+        print(f"client round trip : p50 {percentile(ms, 0.50):8.1f} ms   p99 {percentile(ms, 0.99):8.1f} ms   "
+              f"max {max(ms):8.1f} ms   {len(ms) / elapsed:.1f} moves/s")
+    print(f"server move time  : p50 {server.get('p50_ms')} ms   p99 {server.get('p99_ms')} ms   "
+          f"({server.get('engines')} engines)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for training_server.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--clients", type=int, default=200, help="simulated students (one session each)")
+    parser.add_argument("--moves", type=int, default=20, help="moves per student")
+    parser.add_argument("--think", type=float, default=0.0, help="average seconds a student waits before moving")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,21 @@ DEFAULT_SQUARE_SIZE = 80
 PIECE_IMG_DIR = "assets/pieces"
 ICON_IMG_DIR = "assets/icons"
 
+# --- RENDERING ---
+# Dirty-rect mode: วาดใหม่เฉพาะบริเวณที่เปลี่ยน และหลับรอ event เมื่อหน้าจอนิ่ง (เหมาะกับเครื่องในห้องแล็บที่เปิดทิ้งไว้นาน)
+DIRTY_RECT_RENDERING = False
+IDLE_WAIT_MS = 250
+
+# --- ENGINE ---
+# Live analysis (Eval Bar) ค้นหาลึกขึ้นเรื่อยๆ จนกว่าตำแหน่งจะเปลี่ยน แต่ไม่เกินเวลานี้ต่อตำแหน่ง (None = ไม่จำกัด)
+ANALYSIS_MAX_TIME = 60
+# แคชผลวิเคราะห์ (Zobrist) ที่ Eval Bar และ GameReviewer ใช้ร่วมกัน ตั้งเป็นชื่อไฟล์เพื่อเก็บข้ามการเปิดโปรแกรม
+EVAL_CACHE_PATH = None
+# หนังสือเปิดเกม Polyglot (.bin): AI เดินตาเปิดเกมจากหนังสือทันที และ Game Review ข้ามตาที่เป็นทฤษฎี (ไม่มีไฟล์ = ปิด)
+BOOK_PATH = "engine/book.bin"
+# โฟลเดอร์ Syzygy tablebase (.rtbw/.rtbz): ตำแหน่งหมากน้อยได้ผลแพ้/ชนะ/เสมอและตาเดินที่ถูกต้องทันที (ไม่มีโฟลเดอร์ = ปิด)
+SYZYGY_DIR = "engine/syzygy"
+
 # --- THEME DEFINITIONS ---
 THEME_DARK = {
     "name": "Dark",
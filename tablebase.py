@@ -0,0 +1,160 @@
+import os
+import threading
+from collections import OrderedDict
+
+import chess
+import chess.polyglot
+import chess.syzygy
+
+TB_WIN_CP = 1000       # คะแนน (cp) ของตำแหน่งที่ชนะแน่นอนตาม tablebase แต่ยังหาระยะ Mate ไม่ได้
+# เดินตาม DTZ ไม่เกินจำนวน ply นี้เพื่อหาระยะ Mate (แต่ละ ply probe ทุกตาเดิน) ยาวกว่านี้แสดงเป็น TB_WIN_CP
+# 60 ply ครอบคลุม KQK/KRK ทุกตำแหน่ง และ KBNK เกือบทั้งหมด
+TB_MATE_SEARCH_PLIES = 60
+TB_MATE_CACHE_SIZE = 50_000  # จำนวนตำแหน่งที่จำระยะ Mate ไว้ (ทุกตำแหน่งบนเส้นที่เดินตามไปแล้ว)
+
+
+# ==========================================
+# Tablebase - ตรวจตำแหน่งหมากน้อยด้วย Syzygy ก่อนเรียก Engine
+# ==========================================
+# - ผล WDL (ชนะ/เสมอ/แพ้) และ DTZ ถูกต้องสมบูรณ์ ไม่ต้องค้นหา
+# - Best move: เลือกตาที่ทำให้คู่แข่งแย่ที่สุดตาม (WDL, DTZ) ชนะให้เร็วที่สุด/แพ้ให้ช้าที่สุด
+# - ระยะ Mate สำหรับ Eval Bar: Syzygy เก็บ DTZ (ระยะถึงตากิน/เดินเบี้ย) ไม่ใช่ DTM (ระยะถึง Mate)
+#   จึงเดินตามตาที่ดีที่สุดตาม DTZ จนจบเกม ได้ระยะ Mate ที่บังคับได้จริง (อาจยาวกว่า Mate ที่สั้นที่สุด)
+#   ระยะของทุกตำแหน่งบนเส้นนั้นถูกจำไว้ตาม Zobrist key: ตาถัดไปของเกมเดียวกันมักอยู่บนเส้นเดิม ตอบได้ทันที
+# ไม่มีโฟลเดอร์ tablebase = ปิดการทำงาน (ทุกเมธอดคืน None)
+class Tablebase:
+    def __init__(self, directory):
+        self.directory = directory
+        self.max_pieces = 0
+        self._tables = None
+        self._lock = threading.Lock()
+        self._mate_cache = OrderedDict()   # zobrist key -> ply ถึง Mate (None = หาไม่ได้ภายในเพดาน)
+        self._cache_lock = threading.Lock()
+
+        if directory and os.path.isdir(directory):
+            try:
+                self._tables = chess.syzygy.open_tablebase(directory)
+                names = list(self._tables.wdl) + list(self._tables.dtz)
+                self.max_pieces = max((len(name) - 1 for name in names), default=0)  # "KQvK" = 3 ตัว
+            except Exception as e:
+                print(f"Warning: Could not open Syzygy tablebase {directory}: {e}")
+                self._tables = None
+            if not self.max_pieces: self.close()
+
+    @property
+    def enabled(self):
+        return self._tables is not None
+
+    def covers(self, board):
+        return (self._tables is not None and not board.castling_rights
+                and chess.popcount(board.occupied) <= self.max_pieces)
+
+    def probe(self, board):
+        """(wdl, dtz) ของฝั่งที่ถึงตาเดิน หรือ None ถ้าไม่มีตารางของตำแหน่งนี้"""
+        if not self.covers(board): return None
+        with self._lock:
+            try:
+                return self._tables.probe_wdl(board), self._tables.probe_dtz(board)
+            except (KeyError, chess.syzygy.MissingTableError, IndexError, ValueError):
+                return None
+
+    def ranked_moves(self, board):
+        """ทุกตาเดินเรียงจากดีที่สุด [(move, wdl, dtz)] โดย wdl/dtz เป็นของฝั่งที่เดิน (None ถ้า probe ไม่ได้)"""
+        if not self.covers(board): return None
+        ranked = []
+        for move in board.legal_moves:
+            board.push(move)
+            try:
+                if board.is_checkmate():
+                    ranked.append(((-3, 0), move, 2, 1))
+                    continue
+                result = self.probe(board)
+                if result is None: return None
+                opp_wdl, opp_dtz = result
+                # ผลของคู่แข่งยิ่งต่ำยิ่งดี ถ้าชนะ: DTZ ของคู่แข่งใกล้ 0 ที่สุด ถ้าแพ้: DTZ ของคู่แข่งยาวที่สุด
+                ranked.append(((opp_wdl, -opp_dtz), move, -opp_wdl, -opp_dtz))
+            finally:
+                board.pop()
+        ranked.sort(key=lambda r: r[0])
+        return [(move, wdl, dtz) for _, move, wdl, dtz in ranked]
+
+    def best_move(self, board):
+        ranked = self.ranked_moves(board)
+        return ranked[0][0] if ranked else None
+
+    def analyse(self, board, multipv=1):
+        """ผลแบบเดียวกับ EngineClient.analyse_position (มุมมองฝั่งขาว) หรือ None ถ้าไม่อยู่ใน tablebase"""
+        if board.is_game_over(): return None
+        result = self.probe(board)
+        ranked = self.ranked_moves(board) if result else None
+        if not ranked: return None
+        wdl, dtz = result
+
+        sign = 1 if board.turn == chess.WHITE else -1
+        mate_plies = self._mate_plies(board) if wdl == 2 or wdl == -2 else None
+        if mate_plies is not None:
+            mate = (mate_plies + 1) // 2 if wdl > 0 else -(mate_plies // 2)
+            cp, mate = None, sign * mate
+        else:
+            cp, mate = sign * self._wdl_cp(wdl), None
+
+        best = ranked[0][0]
+        lines = [{"move": move, "cp": sign * self._wdl_cp(move_wdl), "mate": None}
+                 for move, move_wdl, _ in ranked[:max(1, multipv)]]
+        return {"cp": cp, "mate": mate, "best_move": best, "pv": [best], "depth": None,
+                "lines": lines, "wdl": wdl, "dtz": dtz, "tablebase": True}
+
+    def _mate_plies(self, board):
+        """เดินตาม best_move ทั้งสองฝั่งจนจบเกม คืนจำนวน ply ถึง Mate (None ถ้าเกินเพดาน)"""
+        start_key = chess.polyglot.zobrist_hash(board)
+        found, plies = self._cached_mate(start_key)
+        if found: return plies
+
+        line = board.copy(stack=False)
+        visited = [(start_key, 0)]
+        result = None
+        for ply in range(TB_MATE_SEARCH_PLIES):
+            if ply:
+                key = chess.polyglot.zobrist_hash(line)
+                found, plies = self._cached_mate(key)
+                if found:
+                    # มาถึงเส้นที่เคยเดินแล้ว: ระยะที่เหลือรู้อยู่แล้ว
+                    result = ply + plies if plies is not None else None
+                    break
+                visited.append((key, ply))
+            if line.is_checkmate():
+                result = ply
+                break
+            if line.is_game_over(): break
+            move = self.best_move(line)
+            if move is None: break
+            line.push(move)
+
+        with self._cache_lock:
+            if result is not None:
+                for key, ply in visited: self._mate_cache[key] = result - ply
+            else:
+                # ตำแหน่งถัดๆ ไปบนเส้นยังมีเพดานเหลือไม่เท่ากัน จึงจำว่า "หาไม่ได้" เฉพาะตำแหน่งเริ่ม
+                self._mate_cache[start_key] = None
+            while len(self._mate_cache) > TB_MATE_CACHE_SIZE:
+                self._mate_cache.popitem(last=False)
+        return result
+
+    def _cached_mate(self, key):
+        with self._cache_lock:
+            if key not in self._mate_cache: return False, None
+            self._mate_cache.move_to_end(key)
+            return True, self._mate_cache[key]
+
+    @staticmethod
+    def _wdl_cp(wdl):
+        # ±2 = ชนะ/แพ้, ±1 = ชนะ/แพ้แต่ติดกฎ 50 ตา (cursed win / blessed loss) = เสมอ
+        if wdl == 2: return TB_WIN_CP
+        if wdl == -2: return -TB_WIN_CP
+        return 0
+
+    def close(self):
+        with self._lock:
+            if self._tables is not None:
+                self._tables.close()
+                self._tables = None
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from engine_scheduler import EngineScheduler, INTERACTIVE, BATCH
+
+
+class FakeEngine:
+    """Engine จำลอง: งานรอ event จนถูก stop_search() หรือหมดเวลา can_stop=False = ยังไม่ได้เริ่มค้นหา (หยุดไม่ได้)"""
+
+    def __init__(self, can_stop=True):
+        self.can_stop = can_stop
+        self.stopped = threading.Event()
+
+    def stop_search(self):
+        if not self.can_stop: return False
+        self.stopped.set()
+        return True
+
+    def close(self):
+        pass
+
+
+def search(engine, seconds=1.0):
+    # งาน BATCH ที่คืน None เมื่อถูกหยุดกลางทาง (scheduler จะนำกลับเข้าคิว)
+    engine.stopped.clear()
+    return None if engine.stopped.wait(seconds) else "done"
+
+
+def wait_running(scheduler, count, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        with scheduler._cond:
+            if len(scheduler._running) == count: return
+        time.sleep(0.005)
+    raise AssertionError(f"expected {count} running jobs")
+
+
+@pytest.mark.parametrize("can_stop", [(False, True), (True, False)])
+def test_preemption_skips_a_victim_that_cannot_be_stopped(can_stop):
+    scheduler = EngineScheduler([FakeEngine(flag) for flag in can_stop])
+    try:
+        batches = [scheduler.submit(search, BATCH) for _ in can_stop]
+        wait_running(scheduler, 2)
+        t0 = time.perf_counter()
+        assert scheduler.submit(lambda engine: "move", INTERACTIVE).result(timeout=2) == "move"
+        assert time.perf_counter() - t0 < 0.5
+        assert scheduler.metrics()["preemptions"] == 1
+        assert [b.result(timeout=3) for b in batches] == ["done", "done"]
+    finally:
+        scheduler.close()
+
+
+def test_no_victim_can_be_stopped_leaves_no_stale_preemption():
+    scheduler = EngineScheduler([FakeEngine(False), FakeEngine(False)])
+    try:
+        batches = [scheduler.submit(lambda engine: search(engine, 0.3), BATCH) for _ in range(2)]
+        wait_running(scheduler, 2)
+        interactive = scheduler.submit(lambda engine: "move", INTERACTIVE)
+        with scheduler._cond:
+            assert not any(job.preempted for job in scheduler._running.values())
+        assert interactive.result(timeout=2) == "move"
+        assert scheduler.metrics()["preemptions"] == 0
+        assert [b.result(timeout=3) for b in batches] == ["done", "done"]
+    finally:
+        scheduler.close()
+
+
+def test_close_finishes_a_preempted_job_waiting_in_the_queue():
+    engine = FakeEngine()
+    scheduler = EngineScheduler([engine])
+    batch = scheduler.submit(search, BATCH)
+    wait_running(scheduler, 1)
+    release = threading.Event()
+    interactive = scheduler.submit(lambda e: release.wait(2) and "move", INTERACTIVE)
+    # batch ถูกแย่ง Engine แล้วกลับเข้าคิวขณะที่งาน interactive ทำอยู่
+    deadline = time.perf_counter() + 2
+    while scheduler.queue_depth()["batch"] != 1 and time.perf_counter() < deadline: time.sleep(0.005)
+    assert batch.running()
+
+    # ปิด scheduler ขณะที่ batch ยังรออยู่ในคิว (future เป็น RUNNING แล้ว) แล้วค่อยปล่อยงาน interactive ให้จบ
+    threading.Timer(0.1, release.set).start()
+    scheduler.close()
+    assert batch.result(timeout=3) is None
+    assert interactive.result(timeout=3) == "move"
@@ -0,0 +1,58 @@
+import chess
+
+from eval_cache import EvalCache
+
+E4, D4, NF3 = (chess.Move.from_uci(m) for m in ("e2e4", "d2d4", "g1f3"))
+
+
+def result(depth, best, cp, lines=None):
+    info = {"cp": cp, "mate": None, "best_move": best, "pv": [best], "depth": depth}
+    if lines: info["lines"] = [{"move": m, "cp": c, "mate": None} for m, c in lines]
+    return info
+
+
+def test_deeper_single_pv_keeps_review_lines():
+    cache, board = EvalCache(), chess.Board()
+    cache.put(board, result(12, E4, 30, [(E4, 30), (D4, 25), (NF3, 20)]))
+    cache.put(board, result(20, D4, 35))
+
+    single = cache.get(board, min_depth=15)
+    assert (single["best_move"], single["depth"], single["cp"]) == (D4, 20, 35)
+
+    # lines มาจากการค้นหา depth 12: best_move/คะแนนต้องมาจาก lines[0] ชุดเดียวกัน
+    multi = cache.get(board, min_depth=10, multipv=3)
+    assert [line["move"] for line in multi["lines"]] == [E4, D4, NF3]
+    assert (multi["best_move"], multi["pv"], multi["cp"], multi["depth"]) == (E4, [E4], 30, 12)
+
+
+def test_multipv_needs_deep_enough_lines():
+    cache, board = EvalCache(), chess.Board()
+    cache.put(board, result(4, E4, 30, [(E4, 30), (D4, 25)]))
+    cache.put(board, result(20, E4, 32))
+
+    assert cache.get(board, min_depth=10) is not None
+    assert cache.get(board, min_depth=10, multipv=2) is None
+    assert cache.get(board, min_depth=4, multipv=2)["depth"] == 4
+
+
+def test_more_lines_win_and_shallower_search_does_not_replace_score():
+    cache, board = EvalCache(), chess.Board()
+    cache.put(board, result(18, E4, 30, [(E4, 30), (D4, 25)]))
+    cache.put(board, result(10, D4, 40, [(D4, 40), (E4, 35), (NF3, 20)]))
+
+    single = cache.get(board)
+    assert (single["best_move"], single["depth"]) == (E4, 18)
+    multi = cache.get(board, multipv=3)
+    assert (multi["best_move"], multi["depth"], len(multi["lines"])) == (D4, 10, 3)
+
+
+def test_lines_depth_survives_save_and_load(tmp_path):
+    cache, board = EvalCache(), chess.Board()
+    cache.put(board, result(12, E4, 30, [(E4, 30), (D4, 25)]))
+    cache.put(board, result(20, D4, 35))
+    path = str(tmp_path / "cache.json")
+    cache.save(path)
+
+    loaded = EvalCache(path=path)
+    assert loaded.get(board, min_depth=15, multipv=2) is None
+    assert loaded.get(board, min_depth=10, multipv=2)["best_move"] == E4
@@ -0,0 +1,84 @@
+import chess
+import chess.engine
+
+MIN_THINK_TIME = 0.05
+MAX_THINK_TIME = 5.0
+CLOCK_SAFETY = 0.5      # วินาทีที่เผื่อไว้เสมอเมื่อเล่นแบบมีนาฬิกา (ค่าสื่อสารกับ Engine/หน่วงของ UI)
+TYPICAL_MOVES = 30      # จำนวนตาเดินถูกกติกาโดยเฉลี่ย (ใช้ปรับเวลาตามความซับซ้อน)
+
+# ค่าวัสดุ (ไม่นับเบี้ย) ของตำแหน่งเริ่มต้น: ใช้แบ่งช่วงเกม opening / middlegame / endgame
+_PHASE_VALUES = {chess.KNIGHT: 1, chess.BISHOP: 1, chess.ROOK: 2, chess.QUEEN: 4}
+_PHASE_TOTAL = 24
+
+
+# ==========================================
+# ThinkTimeScheduler - จัดสรรเวลาคิดของ AI ต่อตา
+# ==========================================
+# แทน think_time คงที่: ตาบังคับ (เดินได้ตาเดียว) เล่นทันที, ตำแหน่งที่มีทางเลือกมาก/กลางเกมได้เวลามากขึ้น
+# ELO ต่ำคิดสั้น (บอทตอบไว) ELO สูงใช้เวลามากขึ้นในตำแหน่งที่ซับซ้อน
+# ถ้ามีนาฬิกา (clock) จะแบ่งเวลาที่เหลือตามจำนวนตาที่คาดว่ายังเหลือ และส่ง white_clock/black_clock ให้ Engine ด้วย
+class ThinkTimeScheduler:
+    def __init__(self, base_time=0.5, min_time=MIN_THINK_TIME, max_time=MAX_THINK_TIME):
+        self.base_time = float(base_time)
+        self.min_time = float(min_time)
+        self.max_time = float(max_time)
+
+    def plan(self, board, elo=1500, clock=None):
+        """คืน (forced_move, limit): ถ้ามีตาบังคับ forced_move คือตานั้น (ไม่ต้องเรียก Engine) และ limit เป็น None
+
+        clock: dict {"white_clock", "black_clock", "white_inc", "black_inc"} หน่วยวินาที (None = ไม่มีนาฬิกา)
+        """
+        legal = list(board.legal_moves)
+        if len(legal) == 1: return legal[0], None
+
+        budget = self.think_time(board, elo, len(legal), clock)
+        if not clock: return None, chess.engine.Limit(time=budget)
+        return None, chess.engine.Limit(
+            time=budget,
+            white_clock=clock.get("white_clock"), black_clock=clock.get("black_clock"),
+            white_inc=clock.get("white_inc"), black_inc=clock.get("black_inc"),
+        )
+
+    def think_time(self, board, elo=1500, legal_count=None, clock=None):
+        if legal_count is None: legal_count = board.legal_moves.count()
+        factor = self.elo_factor(elo) * self.complexity_factor(legal_count) * self.phase_factor(board)
+        if board.is_check(): factor *= 0.8  # ทางเลือกน้อยกว่าปกติ
+
+        base = self._clock_share(board, clock) if clock else self.base_time
+        upper = self.max_time
+        if clock:
+            # ไม่ใช้เกิน 1/5 ของเวลาที่เหลือ และเผื่อ safety margin เสมอ
+            remaining = self._remaining(board, clock)
+            upper = min(upper, max(0.0, remaining - CLOCK_SAFETY) * 0.2)
+        return max(min(self.min_time, upper), min(upper, base * factor))
+
+    # ---------- ปัจจัยปรับเวลา ----------
+    @staticmethod
+    def elo_factor(elo):
+        # 300 -> 0.25x, 1500 -> 1x, 3000 -> 2x
+        return max(0.25, min(2.0, int(elo) / 1500))
+
+    @staticmethod
+    def complexity_factor(legal_count):
+        # ยิ่งมีทางเลือกมากยิ่งต้องคิดนาน (โตแบบรากที่สอง ไม่ให้กระโดดมากเกินไป)
+        return max(0.5, min(1.5, (legal_count / TYPICAL_MOVES) ** 0.5))
+
+    @staticmethod
+    def phase_factor(board):
+        material = sum(len(board.pieces(piece, color)) * value
+                       for piece, value in _PHASE_VALUES.items() for color in chess.COLORS)
+        phase = min(1.0, material / _PHASE_TOTAL)
+        if board.fullmove_number <= 8 and phase > 0.85: return 0.6   # เปิดเกม: ตาตามหลักการ
+        if phase < 0.3: return 0.8                                    # ท้ายเกม: ตำแหน่งเรียบง่ายกว่า
+        return 1.2                                                    # กลางเกม: จุดที่เวลามีค่าที่สุด
+
+    # ---------- นาฬิกา ----------
+    @staticmethod
+    def _remaining(board, clock):
+        key = "white_clock" if board.turn == chess.WHITE else "black_clock"
+        return float(clock.get(key) or 0.0)
+
+    def _clock_share(self, board, clock):
+        inc_key = "white_inc" if board.turn == chess.WHITE else "black_inc"
+        moves_to_go = max(10, 40 - board.fullmove_number // 2)
+        return self._remaining(board, clock) / moves_to_go + float(clock.get(inc_key) or 0.0) * 0.8
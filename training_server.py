@@ -0,0 +1,329 @@
+"""Training Server: เปิดกระดานฝึกหลายร้อยกระดานบนเครื่องเดียว ให้ทั้งห้องเรียนต่อผ่าน TCP (ไม่ใช้ pygame)
+
+    python training_server.py --port 8765 --engines 4
+    python server_load_test.py --port 8765 --clients 200
+
+โปรโตคอล: JSON หนึ่งบรรทัดต่อหนึ่งคำสั่ง/คำตอบ (ใส่ "id" มาในคำสั่ง จะได้ "id" เดิมกลับในคำตอบ)
+    {"op": "new", "elo": 1200, "color": "white", "fen": null}   เริ่มเกมใหม่ -> {"session": 1, "fen": ...}
+    {"op": "move", "session": 1, "move": "e2e4"}               เดินหนึ่งตา -> {"san": "e4", "reply": "e7e5", "reply_san": "e5", ...}
+    {"op": "undo", "session": 1, "steps": 2}                   ย้อนตา
+    {"op": "elo", "session": 1, "elo": 1800}                   เปลี่ยนความเก่งของ AI ใน session นี้
+    {"op": "hint", "session": 1}                               ตาที่ดีที่สุดและคะแนนของตำแหน่งปัจจุบัน
+    {"op": "review", "session": 1}                             รีวิวทุกตาในเกม (งาน batch: ทำเมื่อ Engine ว่าง)
+    {"op": "state", "session": 1} / {"op": "close", "session": 1}
+    {"op": "stats"}                                            จำนวน session, คิว Engine, latency p50/p99
+ผิดพลาด -> {"error": "..."} (การเชื่อมต่อยังใช้ต่อได้) และ session ของการเชื่อมต่อที่หลุดจะถูกปิดให้อัตโนมัติ
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import chess
+
+from engine_client import EngineClient
+from engine_scheduler import EngineScheduler, INTERACTIVE, LIVE_EVAL
+from game_session import GameSession
+from opening_book import OpeningBook
+from review import ParallelGameReviewer
+from tablebase import Tablebase
+
+DEFAULT_PORT = 8765
+DEFAULT_ELO = 1200
+SERVER_THINK_TIME = 0.3       # วินาทีต่อตาของ AI (ต่ำกว่าใน Game เพราะ Engine ถูกแบ่งกันใช้ทั้งห้อง)
+HINT_THINK_TIME = 0.2
+MAX_SESSIONS = 1000
+LATENCY_WINDOW = 10000        # เก็บ latency ของตาเดินล่าสุดกี่ตาไว้คำนวณ p50/p99
+REPORT_INTERVAL = 10.0
+SERVER_ENGINE_OPTIONS = {"Threads": 1, "Hash": 16}
+
+
+def percentile(values, q):
+    if not values: return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+# ==========================================
+# TrainingSession - GameSession ของนักเรียนหนึ่งคน + ค่าของ AI ฝั่งตรงข้าม
+# ==========================================
+class TrainingSession(GameSession):
+    def __init__(self, session_id, elo=DEFAULT_ELO, player_color=chess.WHITE, fen=None):
+        super().__init__(fen)
+        self.id = session_id
+        self.elo = int(elo)
+        self.player_color = player_color
+        self.lock = asyncio.Lock()   # คำสั่งของ session เดียวกันทำทีละคำสั่ง
+
+    @property
+    def engine_turn(self):
+        return self.can_move() and self.board.turn != self.player_color
+
+    def state(self):
+        return {
+            "session": self.id,
+            "fen": self.board.fen(),
+            "turn": "white" if self.board.turn == chess.WHITE else "black",
+            "moves": len(self.move_history_obj),
+            "elo": self.elo,
+            "game_over": self.game_over,
+            "result": self.game_result_msg,
+        }
+
+
+# ==========================================
+# SharedEngines - Engine จำนวนจำกัดที่ทุก session ใช้ร่วมกัน
+# ==========================================
+# - Engine N ตัว (Threads=1) อยู่หลัง EngineScheduler: AI ตอบตาเดิน (interactive) มาก่อน hint (live eval)
+#   และ review (batch) ซึ่งถูกแย่ง Engine ได้ทุกเมื่อที่มีนักเรียนรอ AI ตอบ
+# - ภายในประเภทเดียวกันคิวเรียงตาม deadline ซึ่งเท่ากับลำดับที่ส่งมา (FIFO) และแต่ละ session มีคำสั่งค้างได้
+#   ทีละคำสั่ง จึงไม่มี session ไหนแซงคิวหรือกิน Engine ทั้งหมดได้ (fair)
+# - ELO ต่อ session: ก่อนคิดจะ set_elo ให้ Engine ตัวที่ได้มา เฉพาะเมื่อค่าต่างจากงานก่อนหน้า
+class SharedEngines:
+    def __init__(self, size, engine_path=None, think_time=SERVER_THINK_TIME, book=None, tablebase=None):
+        self.size = max(1, int(size))
+        self.engine_path = engine_path
+        self.think_time = think_time
+        self.book = book
+        self.tablebase = tablebase
+        self.scheduler = None
+
+    async def start(self):
+        # เปิด Engine ทุกตัวพร้อมกัน (popen ใช้เวลา) แล้วมอบให้ scheduler
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="server-engine") as spawner:
+            engines = await asyncio.gather(*(loop.run_in_executor(spawner, self._spawn) for _ in range(self.size)))
+        self.scheduler = EngineScheduler(engines)
+
+    def _spawn(self):
+        return EngineClient(self.engine_path, think_time=self.think_time, options=SERVER_ENGINE_OPTIONS,
+                            book=self.book, tablebase=self.tablebase)
+
+    async def choose_move(self, board, elo):
+        player = self.scheduler.player(INTERACTIVE, elo=elo, think_time=self.think_time)
+        return await asyncio.wrap_future(player.choose_move_async(board))
+
+    async def analyse(self, board, multipv=1):
+        player = self.scheduler.player(LIVE_EVAL)
+        return await asyncio.wrap_future(player.analyse_position_async(board, HINT_THINK_TIME, 1, multipv))
+
+    async def review(self, moves, start_board):
+        reviewer = ParallelGameReviewer(scheduler=self.scheduler)
+        try:
+            return await asyncio.to_thread(reviewer.analyze_game, moves, start_board)
+        finally:
+            reviewer.close()
+
+    def metrics(self):
+        return self.scheduler.metrics()
+
+    def close(self):
+        if self.scheduler: self.scheduler.close(close_engines=True)
+
+
+# ==========================================
+# TrainingServer - รับคำสั่ง JSON ทีละบรรทัดจากหลายการเชื่อมต่อ
+# ==========================================
+class TrainingServer:
+    def __init__(self, engines, max_sessions=MAX_SESSIONS):
+        self.engines = engines
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.moves = 0
+        self._next_id = 1
+        self._ops = {
+            "new": self._op_new, "move": self._op_move, "undo": self._op_undo, "elo": self._op_elo,
+            "hint": self._op_hint, "review": self._op_review, "state": self._op_state, "close": self._op_close,
+            "stats": self._op_stats,
+        }
+
+    async def handle_client(self, reader, writer):
+        owned = set()   # session ที่การเชื่อมต่อนี้เปิดไว้ (ปิดให้เมื่อหลุด)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict): raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    response = {"error": f"invalid request: {e}"}
+                else:
+                    response = await self.handle(request, owned)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for session_id in owned: self.sessions.pop(session_id, None)
+            writer.close()
+
+    async def handle(self, request, owned):
+        handler = self._ops.get(request.get("op"))
+        try:
+            if handler is None: raise ValueError(f"unknown op {request.get('op')!r}")
+            response = await handler(request, owned)
+        except KeyError as e:
+            response = {"error": f"missing field {e.args[0]!r}"}
+        except (ValueError, TypeError) as e:
+            response = {"error": str(e)}
+        if "id" in request: response["id"] = request["id"]
+        return response
+
+    # ---------- คำสั่ง ----------
+    async def _op_new(self, request, owned):
+        if len(self.sessions) >= self.max_sessions: raise ValueError("server is full")
+        color = chess.BLACK if request.get("color") == "black" else chess.WHITE
+        session = TrainingSession(self._next_id, request.get("elo", DEFAULT_ELO), color, request.get("fen"))
+        self._next_id += 1
+        self.sessions[session.id] = session
+        owned.add(session.id)
+        async with session.lock:
+            response = await self._engine_reply(session)
+            response.update(session.state())
+        return response
+
+    async def _op_move(self, request, owned):
+        session = self._session(request, owned)
+        t0 = time.perf_counter()
+        async with session.lock:
+            if not session.can_move(): raise ValueError("game is over")
+            if session.board.turn != session.player_color: raise ValueError("not your turn")
+            response = {"san": session.push_uci(request["move"])}
+            response.update(await self._engine_reply(session))
+            response.update(session.state())
+        self.latencies.append(time.perf_counter() - t0)
+        self.moves += 1
+        return response
+
+    async def _op_undo(self, request, owned):
+        session = self._session(request, owned)
+        async with session.lock:
+            session.undo(int(request.get("steps", 2)))
+            response = await self._engine_reply(session)
+            response.update(session.state())
+        return response
+
+    async def _op_elo(self, request, owned):
+        session = self._session(request, owned)
+        session.elo = int(request["elo"])
+        return session.state()
+
+    async def _op_hint(self, request, owned):
+        session = self._session(request, owned)
+        board = session.board.copy()
+        if board.is_game_over(): raise ValueError("game is over")
+        info = await self.engines.analyse(board)
+        if not info or not info.get("best_move"): return {"session": session.id, "hint": None}
+        return {"session": session.id, "hint": info["best_move"].uci(), "hint_san": board.san(info["best_move"]),
+                "cp": info.get("cp"), "mate": info.get("mate"), "depth": info.get("depth")}
+
+    async def _op_review(self, request, owned):
+        session = self._session(request, owned)
+        moves = list(session.move_history_obj)
+        board = chess.Board(session.start_fen)
+        review = await self.engines.review(moves, board.copy())
+        result = []
+        for item in review:
+            result.append({"san": board.san(item["move"]), "class": item["class"], "loss": item["loss"]})
+            board.push(item["move"])
+        return {"session": session.id, "review": result}
+
+    async def _op_state(self, request, owned):
+        return self._session(request, owned).state()
+
+    async def _op_close(self, request, owned):
+        session = self._session(request, owned)
+        owned.discard(session.id)
+        self.sessions.pop(session.id, None)
+        return {"session": session.id, "closed": True}
+
+    async def _op_stats(self, request, owned):
+        return self.stats()
+
+    # ---------- ภายใน ----------
+    def _session(self, request, owned):
+        session_id = request.get("session")
+        if session_id not in owned: raise ValueError(f"unknown session {session_id}")
+        return self.sessions[session_id]
+
+    async def _engine_reply(self, session):
+        # เรียกขณะถือ session.lock: ถ้าถึงตา AI ให้ Engine ที่ว่างตัวแรกคิด แล้วเดินลงกระดานของ session
+        if not session.engine_turn: return {}
+        move = await self.engines.choose_move(session.board.copy(), session.elo)
+        if move is None or not session.engine_turn or not session.board.is_legal(move):
+            return {"reply": None}
+        san = session.push(move)
+        return {"reply": move.uci(), "reply_san": san}
+
+    def stats(self):
+        window = list(self.latencies)
+        p50, p99 = percentile(window, 0.50), percentile(window, 0.99)
+        scheduler = self.engines.metrics()
+        return {
+            "sessions": len(self.sessions),
+            "engines": self.engines.size,
+            "engines_busy": sum(scheduler["running"].values()),
+            "queue": scheduler["queue"],
+            "moves": self.moves,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            "scheduler": scheduler,
+        }
+
+    async def report(self, interval):
+        last_moves = 0
+        while True:
+            await asyncio.sleep(interval)
+            s = self.stats()
+            if s["moves"] == last_moves and not s["sessions"]: continue
+            rate = (s["moves"] - last_moves) / interval
+            last_moves = s["moves"]
+            queue = "/".join(str(n) for n in s["queue"].values())
+            print(f"{s['sessions']} sessions, {s['engines_busy']}/{s['engines']} engines busy, queue {queue}, "
+                  f"{rate:.1f} moves/s, p50 {s['p50_ms']} ms, p99 {s['p99_ms']} ms", flush=True)
+
+
+async def serve(args):
+    book = OpeningBook(args.book) if args.book else None
+    tablebase = Tablebase(args.syzygy) if args.syzygy else None
+    engines = SharedEngines(args.engines, args.engine, args.think_time, book, tablebase)
+    await engines.start()
+    server = TrainingServer(engines, args.max_sessions)
+    listener = await asyncio.start_server(server.handle_client, args.host, args.port)
+    reporter = asyncio.create_task(server.report(args.report_interval))
+    print(f"Training server on {args.host}:{args.port} with {engines.size} engines", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        reporter.cancel()
+        engines.close()
+        if book: book.close()
+        if tablebase: tablebase.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many training games over a local JSON-lines TCP API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--engines", type=int, default=os.cpu_count() or 1, help="shared engine processes")
+    parser.add_argument("--engine", help="path to a UCI engine (default: bundled Stockfish)")
+    parser.add_argument("--think-time", type=float, default=SERVER_THINK_TIME, help="seconds per engine move")
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    parser.add_argument("--book", help="Polyglot opening book used for engine replies")
+    parser.add_argument("--syzygy", help="Syzygy tablebase directory used for engine replies")
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL, help="seconds between stats lines")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()